@@ -1,5 +1,6 @@
 """Criteria Engine - 6 Basis-Kriterien für MVP"""
-from typing import Dict, Any, List
+import weakref
+from typing import Dict, Any, List, Optional
 from backend.llm.lm_studio_client import LMStudioClient
 from backend.rag.vector_store import VectorStore
 from backend.utils.logger import setup_logger
@@ -40,15 +41,36 @@ CRITERIA = [
     }
 ]
 
+# Query-Embeddings der (statischen) Kriterien, einmal pro Embedding-Modell berechnet
+_criteria_embeddings: "weakref.WeakKeyDictionary[Any, List[List[float]]]" = weakref.WeakKeyDictionary()
 
-def check_criterion(criterion_id: str, document_text: str, llm: LMStudioClient, vector_store: VectorStore) -> Dict[str, Any]:
-    """Prüfe einzelnes Kriterium"""
-    criterion = next((c for c in CRITERIA if c["id"] == criterion_id), None)
-    if not criterion:
+
+def criteria_embeddings(vector_store: VectorStore) -> List[List[float]]:
+    """Vorberechnete Query-Embeddings aller CRITERIA (Reihenfolge wie CRITERIA)"""
+    embeddings = _criteria_embeddings.get(vector_store.embedder)
+    if embeddings is None:
+        embeddings = vector_store.embed([criterion["prompt"] for criterion in CRITERIA])
+        _criteria_embeddings[vector_store.embedder] = embeddings
+    return embeddings
+
+
+def check_criterion(
+    criterion_id: str,
+    document_text: str,
+    llm: LMStudioClient,
+    vector_store: VectorStore,
+    results: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """Prüfe einzelnes Kriterium (results: bereits abgerufene Chunks, sonst Suche)"""
+    index = next((i for i, c in enumerate(CRITERIA) if c["id"] == criterion_id), None)
+    if index is None:
         return {"id": criterion_id, "result": "ERROR", "reason": "Unbekanntes Kriterium"}
+    criterion = CRITERIA[index]
     
     # Hole relevante Chunks aus RAG
-    results = vector_store.search(criterion["prompt"], top_k=3)
+    if results is None:
+        query_embedding = criteria_embeddings(vector_store)[index]
+        results = vector_store.search_many([criterion["prompt"]], top_k=3, query_embeddings=[query_embedding])[0]
     context = [r["text"] for r in results]
     
     # LLM mit RAG-Kontext
@@ -81,9 +103,16 @@ def check_all_criteria(document_text: str, llm: LMStudioClient, vector_store: Ve
     """Prüfe alle 6 Kriterien"""
     logger.info("Starte Kriterienprüfung für alle 6 Kriterien...")
     
+    # Alle Kriterien in einer Abfrage statt einer pro Kriterium, ohne sie neu zu embedden
+    retrieved = vector_store.search_many(
+        [criterion["prompt"] for criterion in CRITERIA],
+        top_k=3,
+        query_embeddings=criteria_embeddings(vector_store)
+    )
+    
     results = []
-    for criterion in CRITERIA:
-        result = check_criterion(criterion["id"], document_text, llm, vector_store)
+    for criterion, chunks in zip(CRITERIA, retrieved):
+        result = check_criterion(criterion["id"], document_text, llm, vector_store, results=chunks)
         results.append(result)
     
     passed = sum(1 for r in results if r["result"] == "PASSED")
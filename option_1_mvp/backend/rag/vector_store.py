@@ -1,6 +1,6 @@
 """ChromaDB Vector Store mit sentence-transformers"""
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import chromadb
 from chromadb.config import Settings
 from backend.utils.config import get_config_value
@@ -34,8 +34,8 @@ class _FallbackEmbedder:
 class VectorStore:
     """ChromaDB Vector Store für RAG"""
     
-    def __init__(self):
-        chroma_path = get_config_value('rag.chroma_path', 'data/chromadb')
+    def __init__(self, chroma_path: Optional[str] = None):
+        chroma_path = chroma_path or get_config_value('rag.chroma_path', 'data/chromadb')
         Path(chroma_path).mkdir(parents=True, exist_ok=True)
         
         self.client = chromadb.PersistentClient(
@@ -69,45 +69,57 @@ class VectorStore:
         if not texts:
             return
         
-        embeddings_array = self.embedder.encode(texts, show_progress_bar=False)
-        embeddings = embeddings_array.tolist() if hasattr(embeddings_array, 'tolist') else list(embeddings_array)
-        
         self.collection.add(
             documents=texts,
-            embeddings=embeddings,
+            embeddings=self.embed(texts),
             metadatas=metadatas,
             ids=ids
         )
         logger.info(f"✓ {len(texts)} Chunks hinzugefügt (Total: {self.collection.count()})")
     
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings als Listen (ein Batch)"""
+        vectors = self.embedder.encode(texts, show_progress_bar=False)
+        return [vector.tolist() if hasattr(vector, 'tolist') else list(vector) for vector in vectors]
+    
     def search(self, query: str, top_k: int = 0) -> List[Dict[str, Any]]:
         """Suche ähnliche Dokumente"""
+        return self.search_many([query], top_k=top_k)[0]
+    
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 0,
+        query_embeddings: Optional[List[List[float]]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Suche für mehrere Anfragen: ein Embedding-Batch (oder vorberechnete Embeddings), eine Chroma-Abfrage"""
+        if not queries:
+            return []
         if top_k == 0:
             top_k = get_config_value('rag.top_k', 3)
         
-        query_vectors = self.embedder.encode([query])
-        query_embedding = query_vectors[0]
-        if hasattr(query_embedding, 'tolist'):
-            query_embedding = query_embedding.tolist()
-        else:
-            query_embedding = list(query_embedding)
-        results = self.collection.query(query_embeddings=[query_embedding], n_results=top_k)
+        if query_embeddings is None:
+            query_embeddings = self.embed(queries)
+        results = self.collection.query(query_embeddings=query_embeddings, n_results=top_k)
         
-        formatted_results = []
-        if results and results.get('documents') and results['documents'][0]:
-            for i in range(len(results['documents'][0])):
-                result_item = {
-                    'text': results['documents'][0][i],
-                    'id': results['ids'][0][i]
-                }
-                if results.get('metadatas') and results['metadatas'][0]:
-                    result_item['metadata'] = results['metadatas'][0][i]
-                if results.get('distances') and results['distances'][0]:
-                    result_item['distance'] = results['distances'][0][i]
-                formatted_results.append(result_item)
+        all_results = []
+        for row in range(len(queries)):
+            formatted_results = []
+            if results and results.get('documents') and results['documents'][row]:
+                for i in range(len(results['documents'][row])):
+                    result_item = {
+                        'text': results['documents'][row][i],
+                        'id': results['ids'][row][i]
+                    }
+                    if results.get('metadatas') and results['metadatas'][row]:
+                        result_item['metadata'] = results['metadatas'][row][i]
+                    if results.get('distances') and results['distances'][row]:
+                        result_item['distance'] = results['distances'][row][i]
+                    formatted_results.append(result_item)
+            all_results.append(formatted_results)
         
-        logger.info(f"✓ Gefunden: {len(formatted_results)} relevante Chunks")
-        return formatted_results
+        logger.info(f"✓ Gefunden: {sum(len(r) for r in all_results)} relevante Chunks für {len(queries)} Anfragen")
+        return all_results
     
     def clear_all(self):
         """Lösche alle Dokumente"""
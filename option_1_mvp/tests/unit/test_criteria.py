@@ -1,6 +1,6 @@
 """Test: Criteria Engine"""
 import pytest
-from backend.core.criteria import check_criterion, check_all_criteria, CRITERIA
+from backend.core.criteria import check_criterion, check_all_criteria, criteria_embeddings, CRITERIA
 from backend.llm.lm_studio_client import LMStudioClient
 from backend.rag.vector_store import VectorStore
 from backend.rag.chunker import chunk_text
@@ -17,6 +17,21 @@ def test_criteria_structure():
         assert "prompt" in criterion
 
 
+def test_criteria_embeddings_computed_once(tmp_path):
+    """Kriterien-Embeddings werden einmal pro Modell berechnet und wiederverwendet"""
+    store = VectorStore(chroma_path=str(tmp_path / "chromadb"))
+    encoded = []
+    encode = store.embedder.encode
+    store.embedder.encode = lambda texts, **kwargs: encoded.append(len(texts)) or encode(texts, **kwargs)
+    
+    first = criteria_embeddings(store)
+    second = criteria_embeddings(store)
+    
+    assert second is first
+    assert encoded == [len(CRITERIA)]
+    assert first == store.embed([criterion["prompt"] for criterion in CRITERIA])
+
+
 @pytest.mark.integration
 def test_single_criterion_check():
     """Test einzelnes Kriterium"""
@@ -33,6 +33,22 @@ def test_vector_store():
     assert "text" in results[0]
 
 
+def test_vector_store_search_many(tmp_path):
+    """Test Batch-Suche (eine Chroma-Abfrage für mehrere Anfragen)"""
+    store = VectorStore(chroma_path=str(tmp_path / "chromadb"))
+    
+    texts = ["Unternehmen in Thüringen", "Fördersumme 200000 Euro", "KMU Status"]
+    store.add_documents(texts, [{"doc": "test", "chunk": i} for i in range(len(texts))], [f"test_{i}" for i in range(len(texts))])
+    
+    queries = ["Wo ist das Unternehmen?", "Wie hoch ist die Förderung?"]
+    batched = store.search_many(queries, top_k=2)
+    
+    assert len(batched) == 2
+    for query, results in zip(queries, batched):
+        assert [r["id"] for r in results] == [r["id"] for r in store.search(query, top_k=2)]
+    assert store.search_many([]) == []
+
+
 def test_rag_pipeline():
     """Test komplette RAG Pipeline"""
     text = "Das Unternehmen hat seinen Sitz in Erfurt, Thüringen. Die Fördersumme beträgt 150.000 Euro."
@@ -80,5 +80,10 @@ def main():
     print(f"Failed:        {len(results) - len(successful)}")
     print(f"Avg Time:      {avg_time:.2f}s")
 
+    cache_stats = chain.get_stats()["answer_cache"]
+    if cache_stats:
+        print(f"Answer Cache:  {cache_stats['hits']} hits, {cache_stats['bypassed']} bypassed, "
+              f"{cache_stats['saved_llm_seconds']:.2f}s LLM time saved")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: Chunker on a 5 MB single-paragraph text.
+
+Compares the previous list/pop(0) based merging with the current
+index-window merging on texts without paragraph breaks:
+- prose: one paragraph of sentences (split at ". ")
+- unstructured: no separators at all (split per character, e.g. OCR output
+  or tables flattened without whitespace)
+Both implementations must produce identical chunks.
+
+Usage:
+    python examples/chunker_benchmark.py [megabytes] [chunk_size] [chunk_overlap]
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add project root to python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.rag.chunker import Chunker
+
+SENTENCE = "Die Hamburgische Investitions- und Förderbank fördert innovative Vorhaben. "
+
+
+class LegacyChunker(Chunker):
+    """Previous merging: one string per character and list.pop(0) for the overlap."""
+
+    def _merge_characters(self, text):
+        return self._merge_splits(list(text), "")
+
+    def _merge_splits(self, splits, separator):
+        docs = []
+        current_doc = []
+        total = 0
+        separator_len = len(separator)
+        for d in splits:
+            _len = len(d)
+            if total + _len + (separator_len if current_doc else 0) > self.chunk_size:
+                if current_doc:
+                    doc = separator.join(current_doc)
+                    if doc:
+                        docs.append(doc)
+                    while total > self.chunk_overlap or (total + _len + separator_len > self.chunk_size and total > 0):
+                        total -= len(current_doc[0]) + (separator_len if len(current_doc) > 1 else 0)
+                        current_doc.pop(0)
+            current_doc.append(d)
+            total += _len + (separator_len if len(current_doc) > 1 else 0)
+        if current_doc:
+            doc = separator.join(current_doc)
+            if doc:
+                docs.append(doc)
+        return docs
+
+
+def build_texts(size: int) -> dict:
+    unstructured = "".join(chr(ord("a") + i % 26) for i in range(4096))
+    return {
+        "prose": (SENTENCE * (size // len(SENTENCE) + 1))[:size],
+        "unstructured": (unstructured * (size // len(unstructured) + 1))[:size],
+    }
+
+
+def run(chunker: Chunker, text: str):
+    start = time.perf_counter()
+    chunks = [chunk.content for chunk in chunker.split(text)]
+    return chunks, time.perf_counter() - start
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    chunk_overlap = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    print("Chunker Benchmark")
+    print("=" * 60)
+    print(f"Text size: {megabytes} MB, chunk_size={chunk_size}, chunk_overlap={chunk_overlap}")
+    print(f"\n{'Text':<14}{'Chunks':>8}{'Legacy':>10}{'Current':>10}{'Speedup':>9}  Identical")
+
+    for name, text in build_texts(int(megabytes * 1_000_000)).items():
+        legacy_chunks, legacy_time = run(LegacyChunker(chunk_size, chunk_overlap), text)
+        chunks, current_time = run(Chunker(chunk_size, chunk_overlap), text)
+        print(f"{name:<14}{len(chunks):>8}{legacy_time:>9.2f}s{current_time:>9.2f}s"
+              f"{legacy_time / current_time:>8.1f}x  {chunks == legacy_chunks}")
+
+
+if __name__ == "__main__":
+    main()
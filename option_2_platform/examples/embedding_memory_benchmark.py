@@ -0,0 +1,74 @@
+"""
+Benchmark: Python-list vs. numpy-native embedding path.
+
+Simulates the model output for 10k chunks (384-dim, MiniLM) and measures
+what the old .tolist() round-trip cost compared to keeping float32 arrays
+until the Chroma boundary. No model download required.
+"""
+import time
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.rag.embedding_cache import InMemoryEmbeddingCache
+
+NUM_CHUNKS = 10_000
+DIMENSION = 384
+
+
+def measure(func):
+    """Run func once, return (result, seconds, peak_bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, duration, peak
+
+
+def list_path(model_output: np.ndarray):
+    """Old path: tolist() per batch, list cache, Chroma converts back to float32."""
+    embeddings = model_output.tolist()
+    cache = {str(i): vec for i, vec in enumerate(embeddings)}
+    chroma_payload = np.array(embeddings, dtype=np.float32)
+    return embeddings, cache, chroma_payload
+
+
+def numpy_path(model_output: np.ndarray):
+    """New path: float32 matrix, float32 cache entries, passed to Chroma as-is."""
+    embeddings = np.ascontiguousarray(model_output, dtype=np.float32)
+    cache = InMemoryEmbeddingCache("benchmark", max_entries=0)
+    cache.put_many({str(i): vec for i, vec in enumerate(embeddings)})
+    return embeddings, cache, embeddings
+
+
+def main():
+    print("Embedding Memory Benchmark")
+    print("=" * 50)
+    print(f"Chunks: {NUM_CHUNKS}, Dimension: {DIMENSION}")
+
+    rng = np.random.default_rng(42)
+    model_output = rng.standard_normal((NUM_CHUNKS, DIMENSION)).astype(np.float32)
+
+    _, list_time, list_peak = measure(lambda: list_path(model_output))
+    _, numpy_time, numpy_peak = measure(lambda: numpy_path(model_output))
+
+    print(f"\n{'Path':<20}{'Time':>12}{'Peak memory':>16}")
+    print(f"{'Python lists':<20}{list_time:>11.4f}s{list_peak / 1024**2:>13.1f} MB")
+    print(f"{'numpy float32':<20}{numpy_time:>11.4f}s{numpy_peak / 1024**2:>13.1f} MB")
+
+    print(f"\nSaved per {NUM_CHUNKS} chunks: "
+          f"{(list_peak - numpy_peak) / 1024**2:.1f} MB, "
+          f"{list_time - numpy_time:.4f}s "
+          f"({list_peak / max(numpy_peak, 1):.1f}x less memory)")
+
+
+if __name__ == "__main__":
+    main()
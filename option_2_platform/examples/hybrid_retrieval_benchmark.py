@@ -0,0 +1,117 @@
+"""
+Benchmark: BM25 side index lookups on a large collection.
+
+Indexes synthetic German funding-regulation chunks (Zipf-distributed
+vocabulary, paragraph references, program names) into a BM25Index and
+measures sparse search latency for identifier queries and criterion
+questions, with and without a project filter. Also reports index build
+and reload (process start) time.
+
+Usage:
+    python examples/hybrid_retrieval_benchmark.py [chunks] [queries]
+"""
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.rag.models import Chunk
+from src.rag.sparse_index import BM25Index
+
+WORDS = (
+    "förderung antrag vorhaben unternehmen innovation kosten personalkosten sachkosten "
+    "zuwendung richtlinie projekt markt technologie entwicklung forschung hamburg "
+    "investitionsbank förderfähig zuschuss eigenanteil arbeitsplan meilenstein "
+    "verwertung wettbewerb prototyp patent kooperation hochschule mittelstand "
+    "finanzierung laufzeit bewilligung nachweis auszahlung prüfung bericht"
+).split()
+PROGRAMS = ["PROFI", "PROFI Standard", "PROFI Transfer", "InnoRampUp", "Hamburg-Kredit"]
+
+QUERIES = [
+    "§ 4 Abs. 2",
+    "PROFI Transfer",
+    "Sind die Personalkosten nach § 7 Abs. 3 förderfähig?",
+    "Erfüllt das Projekt das Kriterium: Ist das Projekt innovativ und geht über den Stand der Technik hinaus?",
+    "Ist die Finanzierung gesichert und angemessen?",
+    "Meilenstein Arbeitsplan Laufzeit",
+]
+
+
+def make_chunks(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    # Zipf-like word frequencies, plus a long tail of rare technical terms
+    weights = [1.0 / (rank + 1) for rank in range(len(WORDS))]
+    rare = [f"fachbegriff{i}" for i in range(20000)]
+    for i in range(count):
+        words = rng.choices(WORDS, weights=weights, k=60) + rng.sample(rare, 5)
+        words.insert(rng.randrange(len(words)), f"§ {rng.randint(1, 20)} Abs. {rng.randint(1, 5)}")
+        if rng.random() < 0.1:
+            words.insert(rng.randrange(len(words)), rng.choice(PROGRAMS))
+        yield f"chunk-{i}", Chunk(
+            content=" ".join(words),
+            metadata={"project_id": f"projekt-{i % 50}", "doc_id": f"doc-{i // 40}", "page_number": i % 40 + 1}
+        )
+
+
+def measure(index: BM25Index, queries, top_k: int, metadata_filter=None):
+    # First lookup per term computes its weights; report warm lookups
+    for query in queries:
+        index.search(query, top_k=top_k, metadata_filter=metadata_filter)
+    timings = []
+    for _ in range(20):
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, top_k=top_k, metadata_filter=metadata_filter)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def main():
+    chunk_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else len(QUERIES)
+    queries = QUERIES[:query_count]
+
+    print("BM25 Index Benchmark")
+    print("=" * 60)
+    print(f"Chunks: {chunk_count}, queries: {len(queries)}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        index = BM25Index(work_dir, "benchmark")
+        start = time.perf_counter()
+        batch_ids, batch_chunks = [], []
+        for chunk_id, chunk in make_chunks(chunk_count):
+            batch_ids.append(chunk_id)
+            batch_chunks.append(chunk)
+            if len(batch_ids) == 256:
+                index.add(batch_ids, batch_chunks)
+                batch_ids, batch_chunks = [], []
+        index.add(batch_ids, batch_chunks)
+        print(f"\nBuild (256-chunk batches): {time.perf_counter() - start:.1f}s, {len(index._postings)} terms")
+        index.close()
+
+        start = time.perf_counter()
+        index = BM25Index(work_dir, "benchmark")
+        print(f"Reload from disk: {time.perf_counter() - start:.1f}s")
+
+        print(f"\n{'Lookup':<34}{'p50':>10}{'p95':>10}")
+        for label, metadata_filter in [
+            ("top 20, no filter", None),
+            ("top 20, project filter", {"project_id": "projekt-7"}),
+        ]:
+            p50, p95 = measure(index, queries, 20, metadata_filter)
+            print(f"{label:<34}{p50:>8.3f}ms{p95:>8.3f}ms")
+
+        for query in queries[:2]:
+            print(f"\n{query!r}: {index.search(query, top_k=3)}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -45,15 +45,14 @@ def main():
     
     try:
         # Ingest directory
-        stats_list = pipeline.ingest_directory(str(docs_dir))
+        stats = pipeline.ingest_directory(str(docs_dir))
         
         duration = time.time() - start_time
         print(f"\n✅ Ingestion complete in {duration:.2f}s")
         
         # Aggregate stats
-        total_chunks = sum(s.get('chunks', 0) for s in stats_list)
-        print(f"Chunks created: {total_chunks}")
-        print(f"Documents processed: {len(stats_list)}")
+        print(f"Chunks created: {stats['chunk_count']}")
+        print(f"Documents processed: {stats['files_succeeded']}/{stats['files_total']}")
         
     except Exception as e:
         print(f"❌ Ingestion failed: {e}")
@@ -0,0 +1,128 @@
+"""
+Benchmark: peak RSS of materialized vs. streaming ingestion.
+
+Generates a 500-page PDF and ingests it once the old way (all pages, then
+all chunks, then all embeddings, then one Chroma write) and once through
+the streaming IngestionPipeline.ingest_file (page → chunks → micro-batch).
+Each mode runs in a fresh subprocess so the peak RSS values don't mix.
+
+Usage:
+    python examples/ingestion_memory_benchmark.py [pages] [model]
+"""
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+import logging
+
+import fitz
+
+# Add project root to python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.rag.config import RAGConfig
+from src.rag.ingestion import IngestionPipeline
+
+logging.basicConfig(level=logging.ERROR)
+
+PARAGRAPH = (
+    "Die Hamburgische Investitions- und Förderbank fördert im Programm PROFI "
+    "innovative Vorhaben kleiner und mittlerer Unternehmen. Förderfähig sind "
+    "Personal- und Sachkosten nach § 4 Abs. 2 der Förderrichtlinie. "
+)
+
+
+def build_pdf(path: Path, pages: int):
+    """Text-dense pages (~3,000 characters each), similar to tender documents."""
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        text = "\n\n".join(
+            f"Abschnitt {page_num + 1}.{i}: {PARAGRAPH * 2}" for i in range(8)
+        )
+        page.insert_textbox(fitz.Rect(40, 40, 560, 800), text, fontsize=6)
+    doc.save(str(path))
+    doc.close()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode: str, pdf_path: str, work_dir: str, model: str) -> dict:
+    """Ingest pdf_path in this process and return timings and RSS."""
+    config = RAGConfig.from_yaml()
+    config.embedding_model = model or config.embedding_model
+    config.embedding_cache_backend = "memory"
+    config.vector_store_path = str(Path(work_dir) / f"chroma_{mode}")
+    config.collection_name = f"memory_benchmark_{mode}"
+
+    pipeline = IngestionPipeline(config)
+    # Load model and Chroma before measuring the baseline
+    pipeline.embedder.embed_batch_array(["warm-up"])
+    baseline = peak_rss_mb()
+
+    start = time.perf_counter()
+    path = Path(pdf_path)
+    if mode == "materialized":
+        # Previous ingest_file: every stage fully materialized before the next one
+        documents = pipeline._parse_document(path)
+        chunks = pipeline._chunk_document(documents)
+        for chunk in chunks:
+            chunk.metadata.update({"doc_id": path.stem, "doc_name": path.name})
+        chunk_count = len(pipeline._store_chunks(chunks))
+    else:
+        chunk_count = pipeline.ingest_file(pdf_path)["chunk_count"]
+    duration = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "chunks": chunk_count,
+        "seconds": duration,
+        "baseline_mb": baseline,
+        "peak_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        _, _, mode, pdf_path, work_dir, model = sys.argv
+        print(json.dumps(run_mode(mode, pdf_path, work_dir, model)))
+        return
+
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    model = sys.argv[2] if len(sys.argv) > 2 else ""
+    batch_size = RAGConfig.from_yaml().ingest_store_batch_size
+
+    print("Ingestion Memory Benchmark")
+    print("=" * 60)
+    print(f"Pages: {pages}, micro-batch size: {batch_size} chunks")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = Path(work_dir) / "tender_bundle.pdf"
+        build_pdf(pdf_path, pages)
+
+        results = []
+        for mode in ("materialized", "streaming"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", mode, str(pdf_path), work_dir, model],
+                capture_output=True, text=True, check=True, cwd=str(project_root)
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"\n{'Mode':<14}{'Chunks':>8}{'Time':>10}{'Peak RSS':>12}{'Ingest delta':>15}")
+    for r in results:
+        print(f"{r['mode']:<14}{r['chunks']:>8}{r['seconds']:>9.1f}s"
+              f"{r['peak_mb']:>9.0f} MB{r['peak_mb'] - r['baseline_mb']:>12.0f} MB")
+
+    saved = results[0]["peak_mb"] - results[1]["peak_mb"]
+    print(f"\nPeak RSS saved by streaming: {saved:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: sequential vs. parallel PDF page extraction.
+
+Parses every PDF in tests/test_benchmarks/data with PDFParser, once
+sequentially and once with page ranges split across worker processes.
+The sample PDFs are short, so a large application is also simulated by
+concatenating all sample pages several times (default: ~400 pages).
+
+Usage:
+    python examples/pdf_parse_benchmark.py [workers] [target_pages]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+
+# Add project root to python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.parsers.pdf_parser import PDFParser
+
+DATA_DIR = project_root / "tests" / "test_benchmarks" / "data"
+
+
+def build_large_pdf(sources, target_pages: int, out_path: Path) -> int:
+    """Concatenate the sample PDFs until target_pages is reached."""
+    merged = fitz.open()
+    while len(merged) < target_pages:
+        for source in sources:
+            with fitz.open(source) as doc:
+                merged.insert_pdf(doc)
+            if len(merged) >= target_pages:
+                break
+    merged.save(str(out_path))
+    pages = len(merged)
+    merged.close()
+    return pages
+
+
+def timed_parse(parser: PDFParser, pdf_path: Path, repeats: int = 3) -> float:
+    """Best of several runs (seconds)."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        parser.parse(str(pdf_path))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else min(4, os.cpu_count() or 1)
+    target_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+
+    sources = sorted(DATA_DIR.glob("*.pdf"))
+    if not sources:
+        print(f"No PDFs found in {DATA_DIR}")
+        return
+
+    sequential = PDFParser()
+    # parallel_min_pages=2 so that every sample is split, to show the break-even point
+    parallel = PDFParser(max_workers=workers, parallel_min_pages=2)
+
+    print("PDF Parse Benchmark")
+    print("=" * 70)
+    print(f"Workers: {workers}, CPUs: {os.cpu_count()}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        large_pdf = Path(tmp_dir) / "large_application.pdf"
+        large_pages = build_large_pdf(sources, target_pages, large_pdf)
+
+        # Start worker processes outside of the measurement
+        parallel.parse(str(sources[0]))
+
+        print(f"\n{'File':<45}{'Pages':>6}{'Seq':>9}{'Par':>9}{'Speedup':>9}")
+        for pdf_path in sources + [large_pdf]:
+            with fitz.open(pdf_path) as doc:
+                pages = len(doc)
+            seq_time = timed_parse(sequential, pdf_path)
+            par_time = timed_parse(parallel, pdf_path)
+            print(f"{pdf_path.name[:44]:<45}{pages:>6}{seq_time:>8.3f}s{par_time:>8.3f}s"
+                  f"{seq_time / par_time:>8.2f}x")
+
+        print(f"\nSimulated application: {large_pages} pages")
+
+    parallel.close()
+
+
+if __name__ == "__main__":
+    main()
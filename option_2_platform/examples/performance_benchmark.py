@@ -10,6 +10,8 @@ sys.path.append(str(project_root))
 from src.rag.llm_chain import create_llm_chain
 from src.rag.ingestion import IngestionPipeline
 from src.rag.config import RAGConfig
+from src.rag.embeddings import EmbeddingGenerator
+from src.rag.embedding_backends import EMBEDDING_BACKENDS
 
 logging.basicConfig(level=logging.ERROR)
 
@@ -21,6 +23,36 @@ def benchmark_component(name, func, iterations=1):
     print(f"{name:<20}: {duration:.4f}s")
     return duration
 
+def benchmark_embedding_backends(config: RAGConfig, iterations: int = 3):
+    """Compare encoding speed of all embedding backends against torch."""
+    texts = [
+        f"Abschnitt {i}: Die IFB Hamburg fördert innovative Vorhaben nach § 4 Abs. 2 der Richtlinie."
+        for i in range(64)
+    ]
+    baseline = None
+    for backend in EMBEDDING_BACKENDS:
+        try:
+            embedder = EmbeddingGenerator(
+                model_name=config.embedding_model,
+                use_cache=False,
+                backend=backend,
+                onnx_file=config.embedding_onnx_file if backend == "onnx" else None
+            )
+        except Exception as e:
+            print(f"{backend:<20}: skipped ({e})")
+            continue
+        
+        embedder.embed_batch_array(texts[:4])  # warm-up
+        duration = benchmark_component(
+            f"{backend} (64 texts)",
+            lambda: embedder.embed_batch_array(texts),
+            iterations=iterations
+        )
+        if baseline is None:
+            baseline = duration
+        else:
+            print(f"{'':<20}  -> {baseline / duration:.2f}x vs torch")
+
 def main():
     print("Performance Benchmark")
     print("=" * 50)
@@ -65,5 +97,9 @@ def main():
     else:
         print("\n3. Full Pipeline: Skipped (Ollama not available)")
 
+    # 4. Embedding Backends (torch vs. quantized vs. ONNX)
+    print("\n4. Embedding Backend Performance")
+    benchmark_embedding_backends(config)
+
 if __name__ == "__main__":
     main()
@@ -77,6 +77,9 @@ class APIClient:
             files = {"file": (filename, f, content_type)}
             return await self._post("/ingest/upload", files=files)
 
+    async def get_ingest_job(self, job_id: str) -> Dict[str, Any]:
+        return await self._get(f"/ingest/jobs/{job_id}")
+
     async def query_rag(self, question: str, template_type: str = "standard", top_k: int = 5, system_prompt: Optional[str] = None) -> Dict[str, Any]:
         payload = {
             "question": question,
@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 """
 Ingest Sample Data into ChromaDB.
+
+Usage:
+    python scripts/ingest_samples.py [--workers N]
 """
+import argparse
+import json
 import sys
 import os
 from pathlib import Path
@@ -20,7 +25,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ingest_samples")
 
+def collect_project_ids(samples_dir: Path) -> dict:
+    """Map each application's documents to the id from its metadata.json."""
+    project_ids = {}
+    for metadata_file in samples_dir.glob("*/metadata.json"):
+        with open(metadata_file, encoding="utf-8") as f:
+            app_id = json.load(f).get("id")
+        if not app_id:
+            continue
+        for file_path in metadata_file.parent.iterdir():
+            if file_path.suffix.lower() in ('.pdf', '.docx', '.xlsx'):
+                project_ids[file_path.relative_to(samples_dir).as_posix()] = app_id
+    return project_ids
+
 def main():
+    parser = argparse.ArgumentParser(description="Ingest sample applications into ChromaDB")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for parsing/chunking (1 = sequential)")
+    args = parser.parse_args()
+    
     samples_dir = Path("data/samples/applications")
     if not samples_dir.exists():
         logger.error(f"Sample data directory not found: {samples_dir}")
@@ -30,27 +53,26 @@ def main():
     logger.info("🚀 Starting Sample Data Ingestion...")
     
     pipeline = IngestionPipeline()
+    project_ids = collect_project_ids(samples_dir)
     
-    # Walk through all subdirectories
-    files_to_ingest = []
-    for root, _, files in os.walk(samples_dir):
-        for file in files:
-            if file.lower().endswith(('.pdf', '.docx', '.xlsx')):
-                files_to_ingest.append(Path(root) / file)
-    
-    logger.info(f"Found {len(files_to_ingest)} documents to ingest.")
+    stats = pipeline.ingest_directory(
+        str(samples_dir),
+        project_ids=project_ids,
+        max_workers=args.workers
+    )
     
-    success_count = 0
-    for file_path in files_to_ingest:
-        try:
-            logger.info(f"Processing: {file_path.name}")
-            chunks = pipeline.ingest_file(file_path)
-            logger.info(f"  ✅ Ingested {len(chunks)} chunks")
-            success_count += 1
-        except Exception as e:
-            logger.error(f"  ❌ Failed: {e}")
+    for result in stats['files']:
+        name = Path(result['file_path']).name
+        if result['success']:
+            logger.info(f"  ✅ {name}: {result['chunk_count']} chunks")
+        else:
+            logger.error(f"  ❌ {name}: {result['error']}")
             
-    logger.info(f"\n✅ Ingestion Complete: {success_count}/{len(files_to_ingest)} files processed.")
+    logger.info(
+        f"\n✅ Ingestion Complete: {stats['files_succeeded']}/{stats['files_total']} files, "
+        f"{stats['chunk_count']} chunks in {stats['wall_seconds']:.1f}s "
+        f"({stats['chunks_per_sec']} chunks/s, {stats['max_workers']} workers)"
+    )
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,8 @@
+import os
 import shutil
 import uuid
 from pathlib import Path
+from src.rag.ingestion import IngestionPipeline
 from src.services.project_service import project_service
 
 def setup_real_documents():
@@ -68,6 +70,19 @@ def setup_real_documents():
             
     # Save project
     project_service._save_projects({project.id: project}) # Accessing internal method for quick save
+    
+    # Index the project documents for retrieval
+    print("Ingesting project documents...")
+    stats = IngestionPipeline().ingest_directory(
+        str(project_docs_dir),
+        project_id=project.id,
+        max_workers=min(len(files_to_copy), os.cpu_count() or 1)
+    )
+    for result in stats['files']:
+        if not result['success']:
+            print(f"Warning: ingestion of {Path(result['file_path']).name} failed: {result['error']}")
+    print(f"Ingested {stats['files_succeeded']}/{stats['files_total']} documents "
+          f"({stats['chunk_count']} chunks, {stats['chunks_per_sec']} chunks/s).")
     print("Setup complete.")
 
 if __name__ == "__main__":
@@ -1,13 +1,16 @@
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from functools import lru_cache
+from typing import Any, Dict, Optional
 from src.rag.config import RAGConfig
 from src.rag.ingestion import IngestionPipeline
 from src.rag.llm_chain import LLMChain
 from src.rag.retrieval import RetrievalEngine
-from src.rag.llm_provider import OllamaProvider
 from src.rag.prompt_builder import PromptBuilder
-from src.rag.vector_store import VectorStore
-from src.rag.embeddings import EmbeddingGenerator
+from src.rag.registry import get_component_registry
+from src.services.ingestion_job_service import IngestionJobQueue
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +32,38 @@ def get_config() -> RAGConfig:
 # Global instances to act as singletons
 _ingestion_pipeline: IngestionPipeline | None = None
 _llm_chain: LLMChain | None = None
+_ingestion_job_queue: IngestionJobQueue | None = None
+
+# Serializes singleton construction, so a request arriving during warm-up
+# waits for the warm-up instead of building a second instance.
+_init_lock = threading.RLock()
+
+# Warm-up / readiness state with per-component init timings
+_startup_state: Dict[str, Any] = {
+    "status": "pending",  # pending, warming_up, ready, failed
+    "started_at": None,
+    "finished_at": None,
+    "components": {},
+    "error": None,
+}
+_warmup_thread: Optional[threading.Thread] = None
+
+@contextmanager
+def _init_timer(component: str):
+    """Record how long a component takes to initialize."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        _startup_state["components"][component] = {
+            "status": "error",
+            "duration_ms": (time.perf_counter() - start) * 1000,
+            "error": str(e),
+        }
+        raise
+    duration_ms = (time.perf_counter() - start) * 1000
+    _startup_state["components"][component] = {"status": "ok", "duration_ms": duration_ms}
+    logger.info(f"Initialized {component} in {duration_ms:.0f}ms")
 
 def get_ingestion_pipeline() -> IngestionPipeline:
     """
@@ -36,53 +71,144 @@ def get_ingestion_pipeline() -> IngestionPipeline:
     """
     global _ingestion_pipeline
     if _ingestion_pipeline is None:
-        try:
-            config = get_config()
-            _ingestion_pipeline = IngestionPipeline(config)
-            logger.info("IngestionPipeline initialized successfully.")
-        except Exception as e:
-            logger.error(f"Failed to initialize IngestionPipeline: {e}")
-            raise
+        with _init_lock:
+            if _ingestion_pipeline is None:
+                try:
+                    config = get_config()
+                    with _init_timer("ingestion_pipeline"):
+                        _ingestion_pipeline = IngestionPipeline(config)
+                    logger.info("IngestionPipeline initialized successfully.")
+                except Exception as e:
+                    logger.error(f"Failed to initialize IngestionPipeline: {e}")
+                    raise
     return _ingestion_pipeline
 
+def get_ingestion_job_queue() -> IngestionJobQueue:
+    """
+    Returns a singleton IngestionJobQueue with the configured concurrency limits.
+    The ingestion pipeline is resolved lazily by the workers.
+    """
+    global _ingestion_job_queue
+    if _ingestion_job_queue is None:
+        with _init_lock:
+            if _ingestion_job_queue is None:
+                config = get_config()
+                _ingestion_job_queue = IngestionJobQueue(
+                    pipeline_factory=get_ingestion_pipeline,
+                    max_workers=config.ingest_max_workers,
+                    max_pending_jobs=config.ingest_max_pending_jobs
+                )
+    return _ingestion_job_queue
+
+def shutdown_ingestion_job_queue():
+    """Stop the ingestion workers (running jobs are not awaited)."""
+    global _ingestion_job_queue
+    if _ingestion_job_queue is not None:
+        _ingestion_job_queue.shutdown(wait=False)
+        _ingestion_job_queue = None
+
 def get_llm_chain() -> LLMChain:
     """
     Returns a singleton instance of LLMChain.
     """
     global _llm_chain
     if _llm_chain is None:
-        try:
-            config = get_config()
-            
-            # Initialize dependencies
-            embedding_generator = EmbeddingGenerator(model_name=config.embedding_model)
-            
-            vector_store = VectorStore(
-                collection_name=config.collection_name,
-                persist_directory=config.persist_directory,
-                embedding_function=embedding_generator
-            )
-            
-            retrieval_engine = RetrievalEngine(
-                vector_store=vector_store,
-                config=config
-            )
-            
-            llm_provider = OllamaProvider(
-                model_name=config.llm_model,
-                base_url=config.llm_base_url
-            )
-            
-            prompt_builder = PromptBuilder(retrieval_engine=retrieval_engine)
-            
-            _llm_chain = LLMChain(
-                retrieval_engine=retrieval_engine,
-                llm_provider=llm_provider,
-                prompt_builder=prompt_builder,
-                config=config
-            )
-            logger.info("LLMChain initialized successfully.")
-        except Exception as e:
-            logger.error(f"Failed to initialize LLMChain: {e}")
-            raise
+        with _init_lock:
+            if _llm_chain is None:
+                try:
+                    _llm_chain = _build_llm_chain(get_config())
+                    logger.info("LLMChain initialized successfully.")
+                except Exception as e:
+                    logger.error(f"Failed to initialize LLMChain: {e}")
+                    raise
     return _llm_chain
+
+def _build_llm_chain(config: RAGConfig) -> LLMChain:
+    """Build the LLMChain from shared registry components, timing each one."""
+    registry = get_component_registry()
+    
+    with _init_timer("embedding_model"):
+        registry.get_embedder(config)
+    
+    with _init_timer("vector_store"):
+        vector_store = registry.get_vector_store(config)
+    
+    retrieval_engine = RetrievalEngine(
+        vector_store=vector_store,
+        config=config
+    )
+    
+    with _init_timer("llm_provider"):
+        llm_provider = registry.get_llm_provider(config)
+    
+    prompt_builder = PromptBuilder(retrieval_engine=retrieval_engine)
+    
+    return LLMChain(
+        retrieval_engine=retrieval_engine,
+        llm_provider=llm_provider,
+        prompt_builder=prompt_builder,
+        config=config
+    )
+
+def warm_up_components():
+    """
+    Build all heavy singletons (embedding model, Chroma client, LLM chain,
+    ingestion pipeline) and check the Ollama connection.
+    Meant to run in a background thread at startup; errors are recorded
+    in the readiness state instead of being raised.
+    """
+    _startup_state["status"] = "warming_up"
+    _startup_state["started_at"] = time.time()
+    try:
+        llm_chain = get_llm_chain()
+        get_ingestion_pipeline()
+        
+        # Not fatal for readiness: queries fail later with a clear error
+        with _init_timer("ollama_connection"):
+            connection = llm_chain.llm_provider.test_connection()
+        _startup_state["components"]["ollama_connection"]["available"] = connection.get("available", False)
+        if not connection.get("available"):
+            logger.warning(f"Ollama not available during warm-up: {connection.get('error')}")
+        
+        _startup_state["status"] = "ready"
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}")
+        _startup_state["status"] = "failed"
+        _startup_state["error"] = str(e)
+    finally:
+        _startup_state["finished_at"] = time.time()
+        if _startup_state["started_at"] is not None:
+            total = (_startup_state["finished_at"] - _startup_state["started_at"]) * 1000
+            logger.info(f"Warm-up finished with status '{_startup_state['status']}' in {total:.0f}ms")
+
+def start_background_warmup() -> threading.Thread:
+    """Start warm_up_components in a daemon thread (idempotent)."""
+    global _warmup_thread
+    if _warmup_thread is None or not _warmup_thread.is_alive():
+        if _startup_state["status"] in ("pending", "failed"):
+            _warmup_thread = threading.Thread(
+                target=warm_up_components,
+                name="component-warmup",
+                daemon=True
+            )
+            _warmup_thread.start()
+    return _warmup_thread
+
+def get_readiness() -> Dict[str, Any]:
+    """
+    Return readiness state with per-component init timings.
+    Components built lazily by a request (no warm-up) count as ready too.
+    """
+    ready = _startup_state["status"] == "ready" or (
+        _llm_chain is not None and _ingestion_pipeline is not None
+    )
+    total_ms = None
+    if _startup_state["started_at"] is not None and _startup_state["finished_at"] is not None:
+        total_ms = (_startup_state["finished_at"] - _startup_state["started_at"]) * 1000
+    return {
+        "ready": ready,
+        "status": _startup_state["status"],
+        "total_ms": total_ms,
+        "components": {name: dict(info) for name, info in _startup_state["components"].items()},
+        "error": _startup_state["error"],
+    }
@@ -1,8 +1,10 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.routers import ingest, query, system
 from src.api.middleware import LoggingMiddleware
+from src.api.dependencies import start_background_warmup, shutdown_ingestion_job_queue
 
 # Configure logging
 logging.basicConfig(
@@ -11,10 +13,19 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load embedding model, ChromaDB and LLM client in the background,
+    # so the server accepts requests immediately (see /system/ready)
+    start_background_warmup()
+    yield
+    shutdown_ingestion_job_queue()
+
 app = FastAPI(
     title="IFB PROFI RAG API",
     version="1.0.0",
-    description="REST API for IFB document analysis"
+    description="REST API for IFB document analysis",
+    lifespan=lifespan
 )
 
 # Middleware
@@ -1,10 +1,12 @@
 import os
 import shutil
 import logging
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
-from src.api.schemas import IngestResponse
-from src.api.dependencies import get_ingestion_pipeline
-from src.rag.ingestion import IngestionPipeline
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from src.api.schemas import IngestJobResponse, IngestJobStatus
+from src.api.dependencies import get_ingestion_job_queue
+from src.services.ingestion_job_service import IngestionJob, IngestionJobQueue, JobQueueFullError
 
 router = APIRouter(prefix="/ingest", tags=["ingest"])
 logger = logging.getLogger(__name__)
@@ -12,13 +14,26 @@ logger = logging.getLogger(__name__)
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".xlsx"}
 UPLOAD_DIR = "data/input"
 
-@router.post("/upload", response_model=IngestResponse)
+def _save_upload(source, file_path: str):
+    """Copy the upload to disk (blocking; run in the threadpool)."""
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
+def _job_status(job: IngestionJob) -> IngestJobStatus:
+    data = job.to_dict()
+    data["job_id"] = data.pop("id")
+    return IngestJobStatus(**data)
+
+@router.post("/upload", response_model=IngestJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def upload_document(
     file: UploadFile = File(...),
-    pipeline: IngestionPipeline = Depends(get_ingestion_pipeline)
+    project_id: Optional[str] = Form(None),
+    job_queue: IngestionJobQueue = Depends(get_ingestion_job_queue)
 ):
     """
-    Upload and ingest a document.
+    Upload a document and queue it for ingestion.
+    Chunks are tagged with project_id, so project-scoped retrieval finds them.
+    Returns a job id immediately; progress is available at /ingest/jobs/{job_id}.
     """
     filename = file.filename
     logger.info(f"File uploaded: {filename}")
@@ -36,29 +51,48 @@ async def upload_document(
     file_path = os.path.join(UPLOAD_DIR, filename)
     
     try:
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        logger.info(f"Processing started: {filename}")
-        
-        # Run ingestion
-        # Note: In a real app, this should be a background task
-        chunks = pipeline.ingest_file(file_path)
-        
-        logger.info(f"Processing complete: {len(chunks)} chunks")
-        
-        return IngestResponse(
-            success=True,
-            file_path=file_path,
-            chunks_count=len(chunks),
-            message="Document processed successfully"
-        )
-        
+        # Save file off the event loop, so large uploads don't stall other requests
+        await run_in_threadpool(_save_upload, file.file, file_path)
     except Exception as e:
-        logger.error(f"Processing failed: {e}")
-        # Clean up if needed, but keeping the file might be useful for debugging
+        logger.error(f"Saving upload failed: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+    
+    try:
+        job = job_queue.submit(file_path, project_id=project_id)
+    except JobQueueFullError as e:
+        logger.warning(f"Ingestion queue full, rejected: {filename}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    
+    return IngestJobResponse(
+        job_id=job.id,
+        status=job.status,
+        file_path=file_path,
+        status_url=f"{router.prefix}/jobs/{job.id}",
+        message="Document queued for ingestion"
+    )
+
+@router.get("/jobs", response_model=List[IngestJobStatus])
+async def list_jobs(job_queue: IngestionJobQueue = Depends(get_ingestion_job_queue)):
+    """
+    List known ingestion jobs, newest first.
+    """
+    return [_job_status(job) for job in job_queue.list_jobs()]
+
+@router.get("/jobs/{job_id}", response_model=IngestJobStatus)
+async def get_job(job_id: str, job_queue: IngestionJobQueue = Depends(get_ingestion_job_queue)):
+    """
+    Get status and stage progress (parsed pages, chunks embedded, stored) of an ingestion job.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Ingestion job not found: {job_id}"
+        )
+    return _job_status(job)
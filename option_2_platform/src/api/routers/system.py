@@ -1,13 +1,26 @@
 import logging
+from typing import Any, Dict
 from fastapi import APIRouter, Depends, HTTPException
-from src.api.schemas import SystemStatus, LLMServiceStatus, LLMModelStatus, VectorDBStatus
-from src.api.dependencies import get_config, get_llm_chain
+from fastapi.responses import JSONResponse
+from src.api.schemas import SystemStatus, LLMServiceStatus, LLMModelStatus, VectorDBStatus, ReadinessStatus
+from src.api.dependencies import get_config, get_llm_chain, get_readiness
 from src.rag.config import RAGConfig
 from src.rag.llm_chain import LLMChain
 
 router = APIRouter(prefix="/system", tags=["system"])
 logger = logging.getLogger(__name__)
 
+@router.get("/ready", response_model=ReadinessStatus, responses={503: {"model": ReadinessStatus}})
+async def readiness_check(readiness: Dict[str, Any] = Depends(get_readiness)):
+    """
+    Check whether the background warm-up has finished.
+    Returns 503 while models are still loading, including per-component init timings.
+    """
+    status = ReadinessStatus(**readiness)
+    if not status.ready:
+        return JSONResponse(status_code=503, content=status.model_dump())
+    return status
+
 @router.get("/health", response_model=SystemStatus)
 async def health_check(
     llm_chain: LLMChain = Depends(get_llm_chain),
@@ -34,8 +47,9 @@ async def health_check(
         
     # Check embedding cache (if available)
     embeddings_cached = 0
-    if hasattr(llm_chain.retrieval_engine.vector_store.embedding_function, "_cache"):
-         embeddings_cached = len(llm_chain.retrieval_engine.vector_store.embedding_function._cache or {})
+    embedding_function = llm_chain.retrieval_engine.vector_store.embedding_function
+    if hasattr(embedding_function, "get_cache_size"):
+         embeddings_cached = embedding_function.get_cache_size()
 
     return SystemStatus(
         llm_service=LLMServiceStatus(
@@ -83,5 +97,7 @@ async def get_stats(llm_chain: LLMChain = Depends(get_llm_chain)):
     return {
         "documents_count": doc_count,
         "collection_name": llm_chain.retrieval_engine.vector_store.collection_name,
-        "persist_directory": llm_chain.retrieval_engine.vector_store.persist_directory
+        "persist_directory": llm_chain.retrieval_engine.vector_store.persist_directory,
+        "retrieval": llm_chain.retrieval_engine.get_stats(),
+        "llm": llm_chain.get_stats()
     }
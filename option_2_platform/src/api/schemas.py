@@ -1,14 +1,31 @@
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 
 # --- Ingestion Schemas ---
 
-class IngestResponse(BaseModel):
-    success: bool
+class IngestJobResponse(BaseModel):
+    job_id: str
+    status: str
     file_path: str
-    chunks_count: int
+    status_url: str
     message: str
 
+class IngestJobStatus(BaseModel):
+    job_id: str
+    status: str
+    stage: str
+    file_path: str
+    project_id: Optional[str] = None
+    pages_parsed: int = 0
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    chunks_stored: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
 # --- Query Schemas ---
 
 class SourceInfo(BaseModel):
@@ -62,3 +79,16 @@ class SystemStatus(BaseModel):
     chromadb_available: bool
     documents_count: int
     embeddings_cached: int = 0
+
+class ComponentInitStatus(BaseModel):
+    status: str
+    duration_ms: float
+    error: Optional[str] = None
+    available: Optional[bool] = None
+
+class ReadinessStatus(BaseModel):
+    ready: bool
+    status: str
+    total_ms: Optional[float] = None
+    components: Dict[str, ComponentInitStatus] = {}
+    error: Optional[str] = None
@@ -4,7 +4,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.gzip import GZipMiddleware
 from pathlib import Path
 
-from src.api.main import app as api_app
+from src.api.main import app as api_app, lifespan as api_lifespan
 from frontend.routers import dashboard, projects, chat, admin, settings, logo
 
 # Configure logging
@@ -15,7 +15,8 @@ logging.basicConfig(
 )
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="IFB PROFI Platform")
+    # Mounted sub-apps don't run their own lifespan, so reuse the API's warm-up
+    app = FastAPI(title="IFB PROFI Platform", lifespan=api_lifespan)
     
     # Enable GZip Compression
     app.add_middleware(GZipMiddleware, minimum_size=1000)
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 from pathlib import Path
 from .models import Document
 from .exceptions import UnsupportedFormatError
@@ -14,6 +14,13 @@ class BaseParser(ABC):
         """Parse a document and return list of Document objects"""
         pass
     
+    def iter_documents(self, file_path: str) -> Iterator[Document]:
+        """
+        Yield Document objects one at a time (e.g. page by page).
+        Parsers that can stream override this; the default parses the whole file.
+        """
+        yield from self.parse(file_path)
+    
     def accepts_format(self, file_path: str) -> bool:
         """Check if parser can handle this file format"""
         ext = Path(file_path).suffix.lower().lstrip('.')
@@ -1,58 +1,169 @@
 import fitz
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List
+from typing import Iterator, List, Tuple
 
 from .base import BaseParser
 from .models import Document
 from .exceptions import CorruptedFileError, EmptyDocumentError
 
+
+# (start, end, x0, y0, x1, y1): character span of a text line in the page
+# text and its bounding box in PDF points
+TextLine = Tuple[int, int, float, float, float, float]
+
+
+def _extract_page(page) -> Tuple[str, List[TextLine]]:
+    """
+    Extract the page text together with the position of every text line.
+    
+    The text is assembled from the "dict" output exactly like get_text()
+    assembles it (one "\n" per line), so offsets into it are offsets into
+    the Document content.
+    """
+    parts = []
+    lines = []
+    offset = 0
+    for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+        if block.get("type", 0) != 0:
+            continue
+        for line in block["lines"]:
+            text = "".join(span["text"] for span in line["spans"])
+            x0, y0, x1, y1 = (round(v, 1) for v in line["bbox"])
+            if text.strip():
+                lines.append((offset, offset + len(text), x0, y0, x1, y1))
+            parts.append(text)
+            parts.append("\n")
+            offset += len(text) + 1
+    return "".join(parts), lines
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[Tuple[int, str, List[TextLine]]]:
+    """
+    Extract text and line boxes of pages [start, end) in a worker process.
+    Each worker opens its own fitz document (documents can't be shared across processes).
+    """
+    try:
+        doc = fitz.open(file_path)
+    except Exception as e:
+        raise CorruptedFileError(f"Cannot open PDF: {str(e)}")
+
+    pages = []
+    try:
+        for page_num in range(start, end):
+            try:
+                pages.append((page_num, *_extract_page(doc[page_num])))
+            except Exception as e:
+                raise CorruptedFileError(f"Error reading page {page_num + 1}: {str(e)}")
+    finally:
+        doc.close()
+    return pages
+
+
 class PDFParser(BaseParser):
     supported_formats = ['pdf']
-    
+
+    def __init__(self, max_workers: int = 0, parallel_min_pages: int = 20):
+        """
+        Args:
+            max_workers: Worker processes for page extraction (0/1 = sequential).
+            parallel_min_pages: Smaller PDFs are parsed sequentially, since
+                starting workers costs more than it saves.
+        """
+        self.max_workers = max_workers
+        self.parallel_min_pages = parallel_min_pages
+
     def parse(self, file_path: str) -> List[Document]:
+        return list(self.iter_documents(file_path))
+
+    def iter_documents(self, file_path: str) -> Iterator[Document]:
+        """
+        Yield one Document per non-empty page, without holding the whole PDF text.
+        In parallel mode, pages arrive per page range (still in page order).
+        metadata["text_lines"] holds the character span and bounding box of
+        every text line, so chunks can be located on the page later.
+        """
         path = Path(file_path)
-        
+
         if not path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
-        
+
         try:
             doc = fitz.open(file_path)
         except Exception as e:
             raise CorruptedFileError(f"Cannot open PDF: {str(e)}")
-        
-        documents = []
+
         total_pages = len(doc)
-        file_size = path.stat().st_size
-        
-        for page_num in range(total_pages):
-            try:
-                page = doc[page_num]
-                text = page.get_text()
-                
+        stat = path.stat()
+        created_date = datetime.now().isoformat()
+        modified_date = datetime.fromtimestamp(stat.st_mtime).isoformat()
+
+        try:
+            if self.max_workers > 1 and total_pages >= max(2, self.parallel_min_pages):
+                doc.close()
+                pages = self._extract_parallel(str(file_path), total_pages)
+            else:
+                pages = self._extract_sequential(doc, total_pages)
+
+            found_text = False
+            for page_num, text, lines in pages:
                 if not text.strip():
                     continue
-                
+                found_text = True
+
                 metadata = {
                     "page_number": page_num + 1,
                     "total_pages": total_pages,
-                    "file_size": file_size,
-                    "created_date": datetime.now().isoformat(),
-                    "modified_date": datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+                    "file_size": stat.st_size,
+                    "created_date": created_date,
+                    "modified_date": modified_date,
+                    "text_lines": lines
                 }
-                
-                documents.append(Document(
+
+                yield Document(
                     content=text,
                     metadata=metadata,
                     source_file=str(file_path),
                     file_type="pdf"
-                ))
+                )
+        finally:
+            if not doc.is_closed:
+                doc.close()
+
+        if not found_text:
+            raise EmptyDocumentError("No text extracted from PDF")
+
+    def _extract_sequential(self, doc, total_pages: int) -> Iterator[Tuple[int, str, List[TextLine]]]:
+        for page_num in range(total_pages):
+            try:
+                yield (page_num, *_extract_page(doc[page_num]))
             except Exception as e:
                 raise CorruptedFileError(f"Error reading page {page_num + 1}: {str(e)}")
+
+    def _extract_parallel(self, file_path: str, total_pages: int) -> Iterator[Tuple[int, str, List[TextLine]]]:
+        """
+        Split the pages into contiguous ranges and yield the results in page order.
         
-        doc.close()
-        
-        if not documents:
-            raise EmptyDocumentError("No text extracted from PDF")
-        
-        return documents
+        The worker pool lives for one parse only (large PDFs amortize the
+        start-up), so no processes outlive it, also if iteration stops early.
+        """
+        # Two ranges per worker evens out pages with very different text density
+        num_ranges = min(total_pages, self.max_workers * 2)
+        range_size = math.ceil(total_pages / num_ranges)
+        starts = list(range(0, total_pages, range_size))
+        ends = [min(start + range_size, total_pages) for start in starts]
+
+        # spawn instead of fork: the parent process runs torch/Chroma threads
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(starts)),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            # map() yields results in submission order, i.e. page order
+            for page_range in executor.map(_extract_page_range, [file_path] * len(starts), starts, ends):
+                yield from page_range
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -1,17 +1,31 @@
-from typing import List, Optional, Union
+from bisect import bisect_right
+from typing import Any, List, Optional, Sequence, Tuple, Union
 from src.parsers.models import Document
-from src.rag.models import Chunk
+from src.rag.exceptions import ChunkingError
+from src.rag.models import Chunk, encode_bboxes
 
 class Chunker:
     """
     Splits documents into semantic chunks while preserving metadata.
     Optimized for German text structures.
+    
+    Lengths are measured in characters, or in tokens of the embedding model
+    when a tokenizer is given, so chunks match what the encoder sees
+    (German compound words take several tokens). In token mode every chunk
+    also records its length ("token_count", special tokens excluded), summed
+    from the counts the merge step works with.
+    
+    Every chunk records its character span in the document text
+    (char_start/char_end) and, for PDF pages, the bounding boxes of the
+    text lines it covers ("bboxes"), so citations can be highlighted
+    without searching the page.
     """
     def __init__(
         self, 
         chunk_size: int = 500, 
         chunk_overlap: int = 50,
-        separators: Optional[List[str]] = None
+        separators: Optional[List[str]] = None,
+        tokenizer: Optional[Any] = None
     ):
         """
         Initialize the Chunker.
@@ -20,12 +34,18 @@ class Chunker:
             chunk_size: Maximum number of tokens/characters per chunk.
             chunk_overlap: Number of tokens/characters to overlap between chunks.
             separators: List of separators to use for splitting (in order of priority).
+            tokenizer: Hugging Face fast tokenizer; if given, chunk_size and
+                chunk_overlap count tokens (special tokens excluded).
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         # Default separators for recursive splitting: Paragraphs, Lines, Sentences, Words
         # Note: ". " is important for German sentence boundaries
         self.separators = separators or ["\n\n", "\n", ". ", " ", ""]
+        if tokenizer is not None and not getattr(tokenizer, "is_fast", False):
+            raise ChunkingError("Token-based chunking requires a fast tokenizer (offset mapping)")
+        self.tokenizer = tokenizer
+        self.chunk_unit = "tokens" if tokenizer is not None else "chars"
 
     def split(self, document: Union[Document, str]) -> List[Chunk]:
         """
@@ -37,32 +57,49 @@ class Chunker:
         Returns:
             List[Chunk]: A list of Chunk objects with metadata preserved.
         """
+        text_lines = None
         if isinstance(document, str):
             text = document
             base_metadata = {}
         else:
             text = document.content
             base_metadata = document.metadata.copy()
+            # Per-line positions are turned into per-chunk boxes below
+            text_lines = base_metadata.pop("text_lines", None)
             # Add document specific fields to metadata
             if document.source_file:
                 base_metadata["source"] = document.source_file
             if document.file_type:
                 base_metadata["doc_type"] = document.file_type
             
-        text_chunks = self._split_text(text, self.separators)
+        if self.tokenizer is not None:
+            chunk_lengths: Optional[List[int]] = []
+            text_chunks = self._split_text(text, self.separators, chunk_lengths)
+        else:
+            chunk_lengths = None
+            text_chunks = self._split_text(text, self.separators)
+        spans = self._locate(text, text_chunks)
+        line_ends = [line[1] for line in text_lines] if text_lines else []
         
         final_chunks = []
         total_chunks = len(text_chunks)
         
-        for i, chunk_text in enumerate(text_chunks):
+        for i, (chunk_text, span) in enumerate(zip(text_chunks, spans)):
             chunk_metadata = base_metadata.copy()
             chunk_metadata.update({
                 "chunk_id": i,
                 "chunk_index": i,
                 "total_chunks": total_chunks,
                 "chunk_size": self.chunk_size,
-                "chunk_overlap": self.chunk_overlap
+                "chunk_overlap": self.chunk_overlap,
+                "chunk_unit": self.chunk_unit
             })
+            if chunk_lengths is not None:
+                chunk_metadata["token_count"] = chunk_lengths[i]
+            if span is not None:
+                chunk_metadata["char_start"], chunk_metadata["char_end"] = span
+                if text_lines:
+                    chunk_metadata["bboxes"] = self._line_bboxes(text_lines, line_ends, *span)
             
             chunk = Chunk(
                 content=chunk_text,
@@ -72,9 +109,54 @@ class Chunker:
             
         return final_chunks
 
-    def _split_text(self, text: str, separators: List[str]) -> List[str]:
+    @staticmethod
+    def _locate(text: str, chunks: List[str]) -> List[Optional[Tuple[int, int]]]:
+        """
+        Character span of each chunk in text.
+        
+        Chunks are contiguous slices of the text in ascending start order
+        (overlapping by at most chunk_overlap), so each one is searched for
+        right after the start of its predecessor.
+        """
+        spans = []
+        cursor = 0
+        for chunk in chunks:
+            start = text.find(chunk, cursor)
+            if start < 0:
+                spans.append(None)
+                continue
+            spans.append((start, start + len(chunk)))
+            cursor = start + 1
+        return spans
+
+    @staticmethod
+    def _line_bboxes(
+        text_lines: Sequence[Sequence[float]],
+        line_ends: List[int],
+        start: int,
+        end: int
+    ) -> str:
+        """Encoded boxes of the text lines overlapping [start, end)."""
+        # text_lines are (start, end, x0, y0, x1, y1) in text order
+        first = bisect_right(line_ends, start)
+        bboxes = []
+        for line in text_lines[first:]:
+            if line[0] >= end:
+                break
+            bboxes.append(line[2:6])
+        return encode_bboxes(bboxes)
+
+    def _split_text(
+        self,
+        text: str,
+        separators: List[str],
+        chunk_lengths: Optional[List[int]] = None
+    ) -> List[str]:
         """
         Recursively splits text using the provided separators.
+        
+        If chunk_lengths is given, the length of every returned chunk is
+        appended to it (token mode).
         """
         final_chunks = []
         
@@ -94,68 +176,164 @@ class Chunker:
         # Split text
         if separator:
             splits = text.split(separator)
+        elif self.tokenizer is not None:
+            # Split by token: windows cut at the tokenizer's character offsets
+            return self._merge_tokens(text, chunk_lengths)
+        elif self.chunk_size > 1 and self.chunk_overlap >= 0:
+            # Split by character: every character is a "good" split, so the
+            # chunks are computed as offsets instead of one string per character
+            return self._merge_characters(text)
         else:
             splits = list(text) # Split by character
             
         # Merge splits into chunks
         final_chunks = []
         good_splits = []
+        good_lengths = []
         
-        for s in splits:
-            if len(s) < self.chunk_size:
+        for s, length in zip(splits, self._lengths(splits)):
+            if length < self.chunk_size:
                 good_splits.append(s)
+                good_lengths.append(length)
             else:
                 if good_splits:
-                    merged = self._merge_splits(good_splits, separator)
+                    merged = self._merge_splits(good_splits, separator, good_lengths, chunk_lengths)
                     final_chunks.extend(merged)
                     good_splits = []
+                    good_lengths = []
                 if new_separators:
-                    final_chunks.extend(self._split_text(s, new_separators))
+                    final_chunks.extend(self._split_text(s, new_separators, chunk_lengths))
+                elif self.tokenizer is not None:
+                    window_lengths: List[int] = []
+                    final_chunks.append(self._merge_tokens(s, window_lengths)[0])
+                    if chunk_lengths is not None:
+                        chunk_lengths.append(window_lengths[0])
                 else:
                     # No more separators, force split
                     final_chunks.append(s[:self.chunk_size]) # Simple truncation for now
                     
         if good_splits:
-            merged = self._merge_splits(good_splits, separator)
+            merged = self._merge_splits(good_splits, separator, good_lengths, chunk_lengths)
             final_chunks.extend(merged)
             
         return final_chunks
 
-    def _merge_splits(self, splits: List[str], separator: str) -> List[str]:
+    def _lengths(self, texts: List[str]) -> List[int]:
+        """Length of each text in the chunk unit (one batched tokenizer call for tokens)."""
+        if self.tokenizer is None:
+            return [len(text) for text in texts]
+        if not texts:
+            return []
+        input_ids = self.tokenizer(
+            list(texts),
+            add_special_tokens=False,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False
+        )["input_ids"]
+        return [len(ids) for ids in input_ids]
+
+    def _merge_splits(
+        self,
+        splits: List[str],
+        separator: str,
+        lengths: Optional[List[int]] = None,
+        chunk_lengths: Optional[List[int]] = None
+    ) -> List[str]:
         """
         Merges small splits into chunks of max size with overlap.
+        
+        The current chunk is the window splits[start:i]; dropping overlap
+        advances start instead of popping from a list, so each split is
+        added and removed once (linear in the number of splits).
+        In token mode, a chunk's length is the sum of its split and
+        separator token counts; it is appended to chunk_lengths if given.
         """
+        if lengths is None:
+            lengths = self._lengths(splits)
         docs = []
-        current_doc = []
+        start = 0
         total = 0
-        separator_len = len(separator)
+        separator_len = self._lengths([separator])[0] if separator else 0
         
-        for d in splits:
-            _len = len(d)
+        for i, d in enumerate(splits):
+            _len = lengths[i]
             
             # Can we add this split to the current chunk?
-            if total + _len + (separator_len if current_doc else 0) > self.chunk_size:
-                if total > self.chunk_size:
-                    # Warning: current chunk is already too big (shouldn't happen with correct logic)
-                    pass
-                
-                if current_doc:
-                    doc = separator.join(current_doc)
+            if total + _len + (separator_len if i > start else 0) > self.chunk_size:
+                if i > start:
+                    doc = separator.join(splits[start:i])
                     if doc:
                         docs.append(doc)
+                        if chunk_lengths is not None:
+                            chunk_lengths.append(total)
                     
                     # Handle overlap
-                    # We want to keep the tail of current_doc that fits in chunk_overlap
+                    # We want to keep the tail of the current chunk that fits in chunk_overlap
                     while total > self.chunk_overlap or (total + _len + separator_len > self.chunk_size and total > 0):
-                        total -= len(current_doc[0]) + (separator_len if len(current_doc) > 1 else 0)
-                        current_doc.pop(0)
+                        total -= lengths[start] + (separator_len if i - start > 1 else 0)
+                        start += 1
             
-            current_doc.append(d)
-            total += _len + (separator_len if len(current_doc) > 1 else 0)
+            total += _len + (separator_len if i > start else 0)
             
-        if current_doc:
-            doc = separator.join(current_doc)
+        if len(splits) > start:
+            doc = separator.join(splits[start:])
             if doc:
                 docs.append(doc)
+                if chunk_lengths is not None:
+                    chunk_lengths.append(total)
                 
         return docs
+
+    def _merge_characters(self, text: str) -> List[str]:
+        """
+        _merge_splits for single-character splits, as offset arithmetic.
+        
+        Chunks are chunk_size characters long; after each chunk the window
+        keeps min(chunk_overlap, chunk_size - 1) characters, so chunk starts
+        advance by a fixed step. The last chunk holds the remainder.
+        """
+        step = self.chunk_size - min(self.chunk_overlap, self.chunk_size - 1)
+        docs = []
+        start = 0
+        while start + self.chunk_size < len(text):
+            docs.append(text[start:start + self.chunk_size])
+            start += step
+        if len(text) > start:
+            docs.append(text[start:])
+        return docs
+
+    def _merge_tokens(self, text: str, chunk_lengths: Optional[List[int]] = None) -> List[str]:
+        """
+        Token-mode counterpart of _merge_characters: windows of chunk_size
+        tokens advancing by a fixed step, sliced from the text at the
+        tokenizer's character offsets (window sizes go to chunk_lengths).
+        """
+        offsets = self.tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False
+        )["offset_mapping"]
+        if not offsets:
+            if text and chunk_lengths is not None:
+                chunk_lengths.append(0)
+            return [text] if text else []
+        
+        size = max(1, self.chunk_size)
+        step = size - max(0, min(self.chunk_overlap, size - 1))
+        docs = []
+        start = 0
+        while start + size < len(offsets):
+            # The first chunk also keeps any text before the first token
+            begin = offsets[start][0] if start else 0
+            docs.append(text[begin:offsets[start + size - 1][1]])
+            if chunk_lengths is not None:
+                chunk_lengths.append(size)
+            start += step
+        docs.append(text[offsets[start][0] if start else 0:])
+        if chunk_lengths is not None:
+            chunk_lengths.append(len(offsets) - start)
+        return docs
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 from src.core.config import load_config
 
@@ -7,20 +8,76 @@ class RAGConfig(BaseModel):
     """
     chunk_size: int = 500
     chunk_overlap: int = 50
+    chunk_unit: str = "chars"  # "chars" or "tokens" (tokenizer of the embedding model)
     embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2"
+    embedding_backend: str = "torch"  # "torch", "torch_int8" or "onnx"
+    embedding_onnx_file: Optional[str] = None  # e.g. "onnx/model_qint8_avx2.onnx"
     top_k: int = 5
-    similarity_threshold: float = 0.7
+    similarity_threshold: float = 0.0  # minimum cosine similarity of dense/hybrid results, 0 = off
     persist_directory: str = "data/chromadb"
     collection_name: str = "ifb_documents"
     vector_store_path: str = "data/chromadb"
+    sparse_index_dir: Optional[str] = None  # BM25 index + collection write counter, None = "<vector store dir>_sparse"
+
+    # Embedding Cache Settings
+    embedding_cache_backend: str = "memory"  # "memory" or "sqlite"
+    embedding_cache_dir: str = "data/embedding_cache"
+    embedding_cache_max_entries: int = 100000
+    criteria_catalog_dir: str = "data/criteria_catalog"  # compiled criteria with precomputed query embeddings
+
+    # Embedding Encoding Settings
+    encode_batch_size: int = 32  # texts per forward pass (length-bucketed)
+    num_threads: int = 0  # CPU threads for encoding, 0 = library default
+
+    # PDF Parsing Settings
+    pdf_parse_workers: int = 0  # worker processes for page extraction, 0 = sequential
+    pdf_parallel_min_pages: int = 20  # smaller PDFs are always parsed sequentially
+
+    # Ingestion Job Queue Settings
+    ingest_max_workers: int = 2  # documents ingested concurrently
+    ingest_max_pending_jobs: int = 50  # queued + running jobs, 0 = unbounded
+    ingest_store_batch_size: int = 256  # chunks per embed/store micro-batch, bounds ingestion memory
+    ingest_pipelined: bool = True  # overlap parse, embed and store stages (one thread each)
+    ingest_queue_size: int = 2  # micro-batches buffered between pipelined stages
+    ingest_incremental: bool = True  # skip unchanged files/chunks via the content-hash manifest
+    chunk_stats_sample_every: int = 10  # char mode: tokenize every Nth micro-batch for truncation stats, 0 = off
+
+    # Retrieval Settings
+    retrieval_mode: str = "dense"  # "dense", "sparse" (BM25) or "hybrid" (BM25 + dense, RRF)
+    retrieval_candidates: int = 20  # candidates per ranking fused in hybrid mode
+    rrf_k: int = 60  # reciprocal-rank fusion constant: 1 / (rrf_k + rank)
+
+    # Re-ranking Settings (cross-encoder over the retrieval candidates)
+    rerank_enabled: bool = False
+    rerank_model: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # multilingual, CPU-sized
+    rerank_candidates: int = 20  # candidates fetched and scored per query
+    rerank_batch_size: int = 16  # (query, chunk) pairs per forward pass
+    rerank_max_length: int = 256  # tokens per pair
+    rerank_score_threshold: float = 0.7  # minimum cross-encoder score (0-1) of re-ranked chunks
+    rerank_time_budget_ms: int = 1000  # over budget the retrieval order is kept, 0 = unlimited
+    rerank_cache_max_entries: int = 10000  # cached (query, chunk) scores
+
+    # Query Result Cache Settings (in front of RetrievalEngine.retrieve)
+    query_cache_enabled: bool = False
+    query_cache_max_entries: int = 1000
+    query_cache_ttl_seconds: int = 3600  # bounds staleness after writes by other processes, 0 = no expiry
+    query_cache_semantic_threshold: float = 0.0  # cosine similarity for near-identical queries, 0 = exact only
 
     # LLM Settings
     llm_provider: str = "ollama"
     llm_model: str = "qwen2.5:7b"
     llm_base_url: str = "http://localhost:11434"
     llm_temperature: float = 0.7
+    llm_citation_temperature: float = 0.0  # query_with_citations (validation): deterministic and cacheable
     llm_max_tokens: int = 2000
 
+    # LLM Answer Cache Settings (keyed by prompt fingerprint and generation parameters)
+    llm_cache_enabled: bool = False
+    llm_cache_dir: str = "data/llm_cache"
+    llm_cache_max_entries: int = 10000
+    llm_cache_ttl_seconds: int = 604800  # 0 = no expiry
+    llm_cache_sampled: bool = False  # also cache answers generated with temperature > 0
+
     # Prompt Settings
     default_template: str = "standard"
     include_scores: bool = False
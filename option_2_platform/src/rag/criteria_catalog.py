@@ -0,0 +1,132 @@
+"""
+Compiled criteria catalog with precomputed query embeddings.
+
+The validation criteria are static, so their retrieval questions are
+embedded once and stored together with the retrieval parameters in an
+.npz artifact. The artifact records the catalog version (hash of the
+questions and parameters) and the embedding model; it is rebuilt when
+either changes. Validation runs then search with the stored vectors and
+skip query encoding.
+"""
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from .embeddings import EmbeddingGenerator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CriterionQuery:
+    """Retrieval query of one criterion."""
+    criterion_id: str
+    question: str
+    top_k: int = 5
+
+
+def catalog_version(queries: List[CriterionQuery]) -> str:
+    """Hash of the questions and retrieval parameters of a catalog."""
+    payload = json.dumps([asdict(query) for query in queries], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def embedding_model_key(embedder: EmbeddingGenerator) -> str:
+    """Model and runtime the query vectors were computed with."""
+    return embedder.backend.cache_namespace(embedder.model_name)
+
+
+class CompiledCriteriaCatalog:
+    """Criterion queries with one query embedding per criterion (row order = query order)."""
+
+    FILE_PREFIX = "criteria_"
+
+    def __init__(self, queries: List[CriterionQuery], embeddings: np.ndarray, version: str, model_key: str):
+        self.queries = queries
+        self.embeddings = embeddings
+        self.version = version
+        self.model_key = model_key
+
+    @property
+    def questions(self) -> List[str]:
+        return [query.question for query in self.queries]
+
+    @property
+    def max_top_k(self) -> int:
+        return max((query.top_k for query in self.queries), default=0)
+
+    @classmethod
+    def path_for(cls, directory: str, name: str) -> Path:
+        return Path(directory) / f"{cls.FILE_PREFIX}{name}.npz"
+
+    @classmethod
+    def compile(
+        cls,
+        queries: List[CriterionQuery],
+        embedder: EmbeddingGenerator,
+        directory: str,
+        name: str = "default"
+    ) -> "CompiledCriteriaCatalog":
+        """
+        Load the compiled catalog, or embed the questions and store it.
+
+        Args:
+            queries: Criterion queries of the current catalog
+            embedder: Embedding generator used for retrieval
+            directory: Directory for the artifact
+            name: Catalog name (one artifact per name)
+        """
+        version = catalog_version(queries)
+        model_key = embedding_model_key(embedder)
+        path = cls.path_for(directory, name)
+
+        catalog = cls.load(path)
+        if catalog is not None and catalog.version == version and catalog.model_key == model_key:
+            logger.info(f"Loaded compiled criteria catalog {path} (version {version})")
+            return catalog
+
+        embeddings = embedder.embed_batch_array([query.question for query in queries])
+        catalog = cls(queries, embeddings, version, model_key)
+        try:
+            catalog.save(path)
+            logger.info(f"Compiled criteria catalog {path}: {len(queries)} criteria, version {version}")
+        except OSError as e:
+            # Still usable for this process
+            logger.warning(f"Could not store compiled criteria catalog {path}: {e}")
+        return catalog
+
+    def save(self, path: Path):
+        """Write the artifact atomically (readers never see a partial file)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = json.dumps({
+            "version": self.version,
+            "model_key": self.model_key,
+            "queries": [asdict(query) for query in self.queries],
+        }, ensure_ascii=False)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, header=np.array(header), embeddings=self.embeddings.astype(np.float32))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["CompiledCriteriaCatalog"]:
+        """Read an artifact; None if it is missing or unreadable."""
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                header = json.loads(str(data["header"]))
+                embeddings = np.ascontiguousarray(data["embeddings"], dtype=np.float32)
+            queries = [CriterionQuery(**query) for query in header["queries"]]
+            if len(queries) != len(embeddings):
+                raise ValueError("query and embedding counts differ")
+            return cls(queries, embeddings, header["version"], header["model_key"])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable criteria catalog {path}: {e}")
+            return None
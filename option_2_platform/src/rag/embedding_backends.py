@@ -0,0 +1,124 @@
+"""
+Embedding model backends for EmbeddingGenerator.
+
+All backends load a SentenceTransformer-compatible model (encode /
+get_sentence_embedding_dimension), so the generator, cache and
+bucketing logic stay backend-agnostic:
+- torch: full-precision PyTorch model on CPU (default)
+- torch_int8: dynamic int8 quantization of the Linear layers (no extra dependencies)
+- onnx: ONNX Runtime via sentence-transformers (pip install "sentence-transformers[onnx]")
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Type
+
+from sentence_transformers import SentenceTransformer
+
+from .exceptions import EmbeddingError
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackend(ABC):
+    """Base class for embedding model loaders."""
+
+    name: str = ""
+
+    @abstractmethod
+    def load(self, model_name: str) -> SentenceTransformer:
+        """Load the model for CPU inference."""
+        pass
+
+    def cache_namespace(self, model_name: str) -> str:
+        """
+        Key under which loaded models and cached vectors are stored.
+        Non-default backends get their own namespace, because their vectors
+        differ slightly from the full-precision model.
+        """
+        return model_name
+
+
+class TorchBackend(EmbeddingBackend):
+    """Full-precision PyTorch SentenceTransformer."""
+
+    name = "torch"
+
+    def load(self, model_name: str) -> SentenceTransformer:
+        # Force CPU to avoid MPS issues on macOS
+        return SentenceTransformer(model_name, device="cpu")
+
+
+class QuantizedTorchBackend(EmbeddingBackend):
+    """PyTorch model with dynamically int8-quantized Linear layers."""
+
+    name = "torch_int8"
+
+    def load(self, model_name: str) -> SentenceTransformer:
+        import torch
+        from torch.ao.quantization import quantize_dynamic
+
+        model = SentenceTransformer(model_name, device="cpu")
+        quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model
+
+    def cache_namespace(self, model_name: str) -> str:
+        return f"{model_name}::{self.name}"
+
+
+class ONNXBackend(EmbeddingBackend):
+    """ONNX Runtime model, optionally a pre-quantized export (e.g. onnx/model_qint8_avx2.onnx)."""
+
+    name = "onnx"
+
+    def __init__(self, onnx_file: Optional[str] = None):
+        """
+        Args:
+            onnx_file: ONNX file inside the model repository (default: onnx/model.onnx).
+        """
+        self.onnx_file = onnx_file
+
+    def load(self, model_name: str) -> SentenceTransformer:
+        model_kwargs = {"file_name": self.onnx_file} if self.onnx_file else None
+        try:
+            return SentenceTransformer(
+                model_name,
+                device="cpu",
+                backend="onnx",
+                model_kwargs=model_kwargs
+            )
+        except ImportError as e:
+            raise EmbeddingError(
+                f"ONNX backend requires optional dependencies: "
+                f"pip install \"sentence-transformers[onnx]\" ({e})"
+            )
+
+    def cache_namespace(self, model_name: str) -> str:
+        return f"{model_name}::{self.name}:{self.onnx_file or 'onnx/model.onnx'}"
+
+
+EMBEDDING_BACKENDS: Dict[str, Type[EmbeddingBackend]] = {
+    TorchBackend.name: TorchBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    ONNXBackend.name: ONNXBackend,
+}
+
+
+def get_embedding_backend(name: str = "torch", onnx_file: Optional[str] = None) -> EmbeddingBackend:
+    """
+    Create an embedding backend by name.
+
+    Args:
+        name: "torch", "torch_int8" or "onnx"
+        onnx_file: ONNX file for the onnx backend
+
+    Returns:
+        EmbeddingBackend instance
+    """
+    backend_cls = EMBEDDING_BACKENDS.get(name)
+    if backend_cls is None:
+        raise EmbeddingError(
+            f"Unknown embedding backend: {name}. Available: {', '.join(EMBEDDING_BACKENDS)}"
+        )
+    if backend_cls is ONNXBackend:
+        return ONNXBackend(onnx_file=onnx_file)
+    return backend_cls()
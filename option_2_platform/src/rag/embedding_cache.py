@@ -0,0 +1,253 @@
+"""
+Embedding cache backends for EmbeddingGenerator.
+
+Both backends are keyed by model name + text hash, store vectors as
+contiguous float32 arrays and are bounded by a maximum number of entries
+with least-recently-used eviction:
+- InMemoryEmbeddingCache: per-process dict (lost on restart)
+- SQLiteEmbeddingCache: persistent store next to the vector database
+"""
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .exceptions import EmbeddingError
+
+logger = logging.getLogger(__name__)
+
+
+def _as_cache_entry(vector) -> np.ndarray:
+    """Return an owned, read-only, contiguous float32 copy of a vector."""
+    entry = np.array(vector, dtype=np.float32, order="C", copy=True)
+    entry.flags.writeable = False
+    return entry
+
+
+class EmbeddingCache(ABC):
+    """Base class for embedding caches with bounded size and LRU eviction."""
+
+    def __init__(self, model_name: str, max_entries: int = 100_000):
+        """
+        Initialize cache for a single embedding model.
+
+        Args:
+            model_name: Embedding model the cached vectors belong to.
+            max_entries: Maximum number of cached vectors (<= 0 disables the bound).
+        """
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.evictions = 0
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the given keys (missing keys are omitted)."""
+        pass
+
+    @abstractmethod
+    def put_many(self, items: Dict[str, np.ndarray]):
+        """Store vectors and evict least recently used entries if over the bound."""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Remove all cached vectors of this model."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return a single cached vector or None."""
+        return self.get_many([key]).get(key)
+
+    def put(self, key: str, vector: np.ndarray):
+        """Store a single vector."""
+        self.put_many({key: vector})
+
+
+class InMemoryEmbeddingCache(EmbeddingCache):
+    """Process-local LRU cache backed by an OrderedDict."""
+
+    def __init__(self, model_name: str, max_entries: int = 100_000):
+        super().__init__(model_name, max_entries)
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        with self._lock:
+            for key, vector in items.items():
+                self._data[key] = _as_cache_entry(vector)
+                self._data.move_to_end(key)
+            if self.max_entries > 0:
+                while len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteEmbeddingCache(EmbeddingCache):
+    """
+    Persistent LRU cache stored in a SQLite file.
+    Vectors are stored as float32 blobs; last access time drives eviction.
+    """
+
+    FILENAME = "embedding_cache.sqlite3"
+
+    def __init__(self, cache_dir: str, model_name: str, max_entries: int = 100_000):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            cache_dir: Directory for the cache file (e.g. data/embedding_cache).
+            model_name: Embedding model the cached vectors belong to.
+            max_entries: Maximum number of cached vectors for this model.
+        """
+        super().__init__(model_name, max_entries)
+        self._lock = threading.Lock()
+        try:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            self.path = Path(cache_dir) / self.FILENAME
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_lru ON embeddings (model, last_access)"
+            )
+            self._conn.commit()
+            logger.info(f"Opened embedding cache at {self.path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open embedding cache in {cache_dir}: {e}")
+            raise EmbeddingError(f"Failed to open embedding cache: {e}")
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if not keys:
+            return {}
+        found: Dict[str, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay below SQLite's host parameter limit
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, *batch]
+                ).fetchall()
+                for text_hash, blob in rows:
+                    # frombuffer yields a read-only float32 view, no copy
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                    [(now, self.model_name, key) for key in found]
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (self.model_name, key, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in items.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            if self.max_entries > 0:
+                excess = self._count() - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        """
+                        DELETE FROM embeddings WHERE model = ? AND text_hash IN (
+                            SELECT text_hash FROM embeddings WHERE model = ?
+                            ORDER BY last_access ASC LIMIT ?
+                        )
+                        """,
+                        (self.model_name, self.model_name, excess)
+                    )
+                    self.evictions += excess
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings WHERE model = ?", (self.model_name,))
+            self._conn.commit()
+
+    def _count(self) -> int:
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)
+        ).fetchone()
+        return int(row[0])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def create_embedding_cache(
+    backend: str,
+    model_name: str,
+    cache_dir: Optional[str] = None,
+    max_entries: int = 100_000
+) -> EmbeddingCache:
+    """
+    Create an embedding cache for the configured backend.
+
+    Args:
+        backend: "memory" or "sqlite"
+        model_name: Embedding model name (part of the cache key)
+        cache_dir: Directory for persistent backends
+        max_entries: Maximum number of cached vectors
+
+    Returns:
+        EmbeddingCache instance
+    """
+    if backend == "memory":
+        return InMemoryEmbeddingCache(model_name, max_entries=max_entries)
+    if backend == "sqlite":
+        return SQLiteEmbeddingCache(cache_dir or "data/embedding_cache", model_name, max_entries=max_entries)
+    raise EmbeddingError(f"Unknown embedding cache backend: {backend}")
@@ -1,8 +1,14 @@
 import hashlib
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
 from sentence_transformers import SentenceTransformer
+import numpy as np
 import logging
 from src.rag.exceptions import RAGException
+from src.rag.embedding_cache import EmbeddingCache, create_embedding_cache
+from src.rag.embedding_backends import get_embedding_backend
+
+if TYPE_CHECKING:
+    from src.rag.config import RAGConfig
 
 logger = logging.getLogger(__name__)
 
@@ -10,34 +16,90 @@ class EmbeddingGenerator:
     """
     Generate embeddings for text chunks using sentence-transformers.
     Supports German language via multilingual models.
-    Includes caching for performance optimization.
+    Includes caching for performance optimization (in-memory or persistent SQLite).
+    The model runtime is pluggable (torch, torch_int8, onnx), see embedding_backends.
     """
     
     _model_cache: Dict[str, SentenceTransformer] = {}
     
-    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2", use_cache: bool = True):
+    def __init__(
+        self,
+        model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
+        use_cache: bool = True,
+        cache_backend: str = "memory",
+        cache_dir: Optional[str] = None,
+        cache_max_entries: int = 100_000,
+        encode_batch_size: int = 32,
+        num_threads: int = 0,
+        backend: str = "torch",
+        onnx_file: Optional[str] = None
+    ):
         """
         Initialize with specific model.
         
         Args:
             model_name: Name of the sentence-transformers model to use.
-            use_cache: Whether to enable in-memory caching of embeddings.
+            use_cache: Whether to enable caching of embeddings.
+            cache_backend: "memory" (per process) or "sqlite" (persistent on disk).
+            cache_dir: Directory for the persistent cache (sqlite backend only).
+            cache_max_entries: Size bound of the cache, least recently used entries are evicted.
+            encode_batch_size: Number of texts per forward pass (texts are length-bucketed).
+            num_threads: CPU threads for the model (0 keeps the library default).
+            backend: Model runtime: "torch", "torch_int8" or "onnx".
+            onnx_file: ONNX file inside the model repository (onnx backend only).
         """
         self.model_name = model_name
+        self.backend = get_embedding_backend(backend, onnx_file=onnx_file)
+        # Vectors of quantized/ONNX backends are cached separately from full precision
+        model_key = self.backend.cache_namespace(model_name)
+        self.encode_batch_size = max(1, encode_batch_size)
         self.use_cache = use_cache
-        self._cache: Optional[Dict[str, List[float]]] = {} if use_cache else None
-        self._stats = {"hits": 0, "misses": 0}
+        self.cache_backend = cache_backend
+        self._cache: Optional[EmbeddingCache] = (
+            create_embedding_cache(cache_backend, model_key, cache_dir, cache_max_entries)
+            if use_cache else None
+        )
+        self._stats = {"hits": 0, "misses": 0, "batch_dedup_saved": 0}
+        
+        if num_threads > 0:
+            self._set_num_threads(num_threads)
         
         try:
-            if model_name not in self._model_cache:
-                logger.info(f"Loading embedding model: {model_name}")
-                # Force CPU to avoid MPS issues on macOS
-                self._model_cache[model_name] = SentenceTransformer(model_name, device="cpu")
+            if model_key not in self._model_cache:
+                logger.info(f"Loading embedding model: {model_name} (backend: {self.backend.name})")
+                self._model_cache[model_key] = self.backend.load(model_name)
                 logger.info("Model loaded successfully")
-            self.model = self._model_cache[model_name]
+            self.model = self._model_cache[model_key]
         except Exception as e:
             logger.error(f"Failed to load embedding model {model_name}: {e}")
             raise RAGException(f"Failed to load embedding model: {e}")
+
+    @classmethod
+    def from_config(cls, config: "RAGConfig") -> "EmbeddingGenerator":
+        """
+        Create generator with model and cache settings from RAGConfig.
+        """
+        return cls(
+            model_name=config.embedding_model,
+            cache_backend=config.embedding_cache_backend,
+            cache_dir=config.embedding_cache_dir,
+            cache_max_entries=config.embedding_cache_max_entries,
+            encode_batch_size=config.encode_batch_size,
+            num_threads=config.num_threads,
+            backend=config.embedding_backend,
+            onnx_file=config.embedding_onnx_file
+        )
+
+    @staticmethod
+    def _set_num_threads(num_threads: int):
+        """Limit intra-op CPU threads used for encoding (process-wide setting)."""
+        try:
+            import torch
+            if torch.get_num_threads() != num_threads:
+                torch.set_num_threads(num_threads)
+                logger.info(f"Embedding encoder uses {num_threads} CPU threads")
+        except ImportError:
+            logger.warning("torch not available, ignoring num_threads setting")
             
     def _get_cache_key(self, text: str) -> str:
         """Generate cache key from text."""
@@ -47,16 +109,20 @@ class EmbeddingGenerator:
         """Clear the embedding cache."""
         if self._cache is not None:
             self._cache.clear()
-            self._stats = {"hits": 0, "misses": 0}
+            self._cache.evictions = 0
+            self._stats = {"hits": 0, "misses": 0, "batch_dedup_saved": 0}
 
     def get_cache_size(self) -> int:
         """Return number of cached embeddings."""
         return len(self._cache) if self._cache is not None else 0
 
-    def get_cache_stats(self) -> Dict[str, int]:
-        """Return cache statistics (hits, misses, size)."""
-        stats = self._stats.copy()
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return cache statistics (hits, misses, batch_dedup_saved, evictions, size, backend)."""
+        stats: Dict[str, Any] = self._stats.copy()
+        stats["evictions"] = self._cache.evictions if self._cache is not None else 0
         stats["size"] = self.get_cache_size()
+        stats["backend"] = self.cache_backend if self._cache is not None else None
+        stats["model_backend"] = self.backend.name
         return stats
 
     def embed(self, text: str) -> List[float]:
@@ -69,27 +135,37 @@ class EmbeddingGenerator:
         Returns:
             List[float]: The embedding vector.
         """
+        return self.embed_array(text).tolist()
+
+    def embed_array(self, text: str) -> np.ndarray:
+        """
+        Generate embedding for single text as float32 array (no list conversion).
+        
+        Args:
+            text: The text to embed.
+            
+        Returns:
+            np.ndarray: The embedding vector (empty array for empty input).
+        """
         if not text or not isinstance(text, str):
             logger.warning("Empty or invalid text provided for embedding")
-            return []
+            return np.empty(0, dtype=np.float32)
             
+        cache_key = self._get_cache_key(text)
         if self._cache is not None:
-            cache_key = self._get_cache_key(text)
-            if cache_key in self._cache:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
                 self._stats["hits"] += 1
-                return self._cache[cache_key]
+                return cached
             self._stats["misses"] += 1
             
         try:
-            # encode returns numpy array, convert to list
-            embedding = self.model.encode(text, convert_to_numpy=True).tolist()
+            embedding = np.ascontiguousarray(
+                self.model.encode(text, convert_to_numpy=True), dtype=np.float32
+            )
             
             if self._cache is not None:
-                # Re-calculate key if needed, but it should be available from above if we want to be safe
-                # However, cache_key is defined in the if block above. 
-                # Let's just recalculate to be safe and satisfy linter or ensure scope
-                cache_key = self._get_cache_key(text)
-                self._cache[cache_key] = embedding
+                self._cache.put(cache_key, embedding)
                 
             return embedding
         except Exception as e:
@@ -108,55 +184,131 @@ class EmbeddingGenerator:
         """
         if not texts:
             return []
+        return self.embed_batch_array(texts).tolist()
+
+    def embed_batch_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts as one contiguous float32 matrix.
+        Preferred over embed_batch for large batches: avoids building millions
+        of Python float objects. Duplicate texts are encoded only once.
+        
+        Args:
+            texts: List of texts to embed.
             
-        results: List[Optional[List[float]]] = [None] * len(texts)
-        texts_to_embed = []
-        indices_to_embed = []
+        Returns:
+            np.ndarray: Matrix of shape (len(texts), dimension).
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+            
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        # Unique uncached texts -> all positions they occur at in this batch
+        pending: Dict[str, List[int]] = {}
+        
+        # Check cache first (one lookup for the whole batch)
+        keys = [self._get_cache_key(text) for text in texts]
+        cached = self._cache.get_many(keys) if self._cache is not None else {}
         
-        # Check cache first
-        for i, text in enumerate(texts):
+        for i, key in enumerate(keys):
+            if key in cached:
+                results[i] = cached[key]
+                self._stats["hits"] += 1
+                continue
+            
+            # Duplicates within the batch are encoded once and fanned out below
+            if key in pending:
+                pending[key].append(i)
+                self._stats["batch_dedup_saved"] += 1
+                continue
+            
+            pending[key] = [i]
             if self._cache is not None:
-                cache_key = self._get_cache_key(text)
-                if cache_key in self._cache:
-                    results[i] = self._cache[cache_key]
-                    self._stats["hits"] += 1
-                    continue
-                
-                # Optimization: Check if we already queued this text for embedding in this batch
-                # This handles duplicates within the same batch efficiently
-                # However, for simplicity and to ensure we map back correctly, we might just queue it.
-                # But wait, if we queue "Text 1" twice, we embed it twice.
-                # The test expects us to be smart about duplicates within the batch?
-                # Or does it expect that after we process the batch, the cache is populated?
-                # The test failure says hits=0. This means NOTHING was in the cache initially (correct).
-                # But it expects hits>=2. This implies that within the loop, we should have found items in cache.
-                # BUT: We only populate the cache AFTER the loop, when we process `texts_to_embed`.
-                # So duplicates in the SAME batch are NOT found in cache during the initial loop.
-                
                 self._stats["misses"] += 1
             
-            # Track texts that need embedding
-            texts_to_embed.append(text)
-            indices_to_embed.append(i)
-            
-        # Batch process uncached texts
-        if texts_to_embed:
+        # Batch process unique uncached texts
+        if pending:
+            texts_to_embed = [texts[positions[0]] for positions in pending.values()]
             try:
-                # encode returns numpy array of arrays
-                new_embeddings = self.model.encode(texts_to_embed, convert_to_numpy=True).tolist()
+                new_embeddings = self._encode_bucketed(texts_to_embed)
                 
-                # Store new embeddings
-                for idx, text, embedding in zip(indices_to_embed, texts_to_embed, new_embeddings):
-                    results[idx] = embedding
-                    if self._cache is not None:
-                        cache_key = self._get_cache_key(text)
-                        self._cache[cache_key] = embedding
+                # Store new embeddings and fan them out to every position
+                new_entries = {}
+                for (key, positions), embedding in zip(pending.items(), new_embeddings):
+                    for idx in positions:
+                        results[idx] = embedding
+                    new_entries[key] = embedding
+                if self._cache is not None:
+                    self._cache.put_many(new_entries)
             except Exception as e:
                 logger.error(f"Error generating batch embeddings: {e}")
                 raise RAGException(f"Error generating batch embeddings: {e}")
         
-        # results list contains Optional[List[float]], but we guarantee all are filled
-        return results # type: ignore
+        # results contains Optional[np.ndarray], but we guarantee all are filled
+        return np.stack(results) # type: ignore
+        
+    def _encode_bucketed(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts in length-sorted buckets of encode_batch_size.
+        Texts of similar length share a forward pass, so short XLSX rows are not
+        padded to the length of full PDF chunks. Output keeps the input order.
+        """
+        if len(texts) <= self.encode_batch_size:
+            return np.asarray(
+                self.model.encode(texts, batch_size=self.encode_batch_size, convert_to_numpy=True),
+                dtype=np.float32
+            )
+        
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        output: Optional[np.ndarray] = None
+        for start in range(0, len(order), self.encode_batch_size):
+            bucket = order[start:start + self.encode_batch_size]
+            # encode returns a (n, dim) numpy matrix
+            vectors = np.asarray(
+                self.model.encode(
+                    [texts[i] for i in bucket],
+                    batch_size=self.encode_batch_size,
+                    convert_to_numpy=True
+                ),
+                dtype=np.float32
+            )
+            if output is None:
+                output = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            output[bucket] = vectors
+        return output # type: ignore
+        
+    def get_tokenizer(self) -> Optional[Any]:
+        """Return the model's tokenizer (None if the model has none)."""
+        return getattr(self.model, "tokenizer", None)
+
+    @property
+    def max_seq_length(self) -> Optional[int]:
+        """Token limit of the encoder; longer texts are truncated when embedding."""
+        return getattr(self.model, "max_seq_length", None)
+
+    def count_tokens(self, texts: List[str], add_special_tokens: bool = True) -> List[int]:
+        """
+        Count tokens per text with the model's tokenizer (one batched call).
+        
+        Args:
+            texts: Texts to count.
+            add_special_tokens: Include [CLS]/[SEP] etc., as the encoder does.
+            
+        Returns:
+            List[int]: Token count per text (not truncated).
+        """
+        tokenizer = self.get_tokenizer()
+        if tokenizer is None:
+            raise RAGException(f"Embedding model {self.model_name} has no tokenizer")
+        if not texts:
+            return []
+        input_ids = tokenizer(
+            list(texts),
+            add_special_tokens=add_special_tokens,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False
+        )["input_ids"]
+        return [len(ids) for ids in input_ids]
         
     def get_dimension(self) -> int:
         """
@@ -1,22 +1,230 @@
 """
 Document Ingestion Pipeline Service.
 Orchestrates: Document → Parser → Chunker → Embeddings → Vector Store
+
+Files are streamed through generator stages (page → chunks → micro-batch →
+store). With ingest_pipelined, parse, embed and store run in separate threads
+connected by bounded queues, so the stages overlap; only a few micro-batches
+of chunks and embeddings are held in memory at any time.
+
+With ingest_incremental, an ingestion manifest (file and chunk content
+hashes) lets re-ingestion skip unchanged files and re-embed only changed
+chunks; chunks missing from the new file version are deleted.
+
+Unless retrieval_mode is "dense", every chunk write and delete is mirrored
+into the BM25 side index used for hybrid retrieval.
 """
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, Set, Tuple
 import logging
+import multiprocessing
+import threading
+import time
+
+import numpy as np
 
 from src.parsers.pdf_parser import PDFParser
 from src.parsers.docx_parser import DocxParser
 from src.parsers.xlsx_parser import XlsxParser
 from src.parsers.models import Document
 from .chunker import Chunker
-from .embeddings import EmbeddingGenerator
-from .vector_store import VectorStore
+from .exceptions import ChunkingError
+from .models import Chunk
 from .config import RAGConfig
+from .ingestion_manifest import IngestionManifest, ManifestEntry, hash_chunk, hash_file
+from .registry import get_component_registry
+from .vector_store import VectorStore
+from .staged_executor import StagedExecutor, StageMetrics
 
 logger = logging.getLogger(__name__)
 
+# Called with (stage, counters), e.g. ("stored", {"pages_parsed": 12, "chunks_stored": 256, ...})
+ProgressCallback = Callable[[str, Dict[str, int]], None]
+
+def _create_parsers(config: RAGConfig, pdf_workers: Optional[int] = None) -> Dict[str, Any]:
+    """Document parsers by file extension."""
+    return {
+        '.pdf': PDFParser(
+            max_workers=config.pdf_parse_workers if pdf_workers is None else pdf_workers,
+            parallel_min_pages=config.pdf_parallel_min_pages
+        ),
+        '.docx': DocxParser(),
+        '.xlsx': XlsxParser(),
+    }
+
+def _create_chunker(config: RAGConfig, tokenizer: Optional[Any] = None) -> Chunker:
+    """Chunker with the configured chunk size, overlap and unit ("chars" or "tokens")."""
+    if config.chunk_unit not in ("chars", "tokens"):
+        raise ChunkingError(f"Unknown chunk_unit: {config.chunk_unit}")
+    if config.chunk_unit == "tokens" and tokenizer is None:
+        raise ChunkingError("chunk_unit 'tokens' requires an embedding model with a tokenizer")
+    return Chunker(
+        chunk_size=config.chunk_size,
+        chunk_overlap=config.chunk_overlap,
+        tokenizer=tokenizer if config.chunk_unit == "tokens" else None,
+    )
+
+def _add_file_metadata(chunk: Chunk, path: Path, project_id: Optional[str]) -> Chunk:
+    """Add file-level metadata (project, doc id/name, page) to a chunk."""
+    if project_id:
+        chunk.metadata["project_id"] = project_id
+    
+    chunk.metadata["doc_id"] = path.stem
+    chunk.metadata["doc_name"] = path.name
+    # Ensure page_number is present (PDFParser adds it)
+    # If not present (e.g. other parsers), default to 1
+    if "page_number" not in chunk.metadata:
+        chunk.metadata["page_number"] = 1
+    return chunk
+
+# Parsers/chunker of a directory-ingestion worker process
+_worker_components: Dict[str, Any] = {}
+
+def _init_worker(config: RAGConfig, tokenizer: Optional[Any]):
+    """
+    Process pool initializer for ingest_directory workers.
+    The tokenizer (token chunking) is sent once per worker, not per file.
+    """
+    # Workers are already parallel per file, so PDFs are parsed sequentially
+    _worker_components["parsers"] = _create_parsers(config, pdf_workers=0)
+    _worker_components["chunker"] = _create_chunker(config, tokenizer)
+
+def _parse_and_chunk_file(file_path: str, project_id: Optional[str]) -> Tuple[int, List[Chunk]]:
+    """
+    Parse and chunk one file in a worker process (ingest_directory).
+    Returns the number of parsed pages/documents and the chunks.
+    """
+    path = Path(file_path)
+    parser = _worker_components["parsers"].get(path.suffix.lower())
+    if not parser:
+        raise ValueError(f"Unsupported file type: {path.suffix.lower()}")
+    
+    pages = 0
+    chunks: List[Chunk] = []
+    for doc in parser.iter_documents(file_path):
+        pages += 1
+        for chunk in _worker_components["chunker"].split(doc):
+            chunks.append(_add_file_metadata(chunk, path, project_id))
+    return pages, chunks
+
+def _distribution(lengths: Counter) -> Dict[str, Any]:
+    """min/mean/percentiles/max of a length histogram."""
+    count = sum(lengths.values())
+    if not count:
+        return {}
+    result = {
+        "min": min(lengths),
+        "mean": round(sum(length * n for length, n in lengths.items()) / count, 1),
+        "max": max(lengths),
+    }
+    targets = {"p50": 0.5 * count, "p95": 0.95 * count}
+    seen = 0
+    for length in sorted(lengths):
+        seen += lengths[length]
+        for name, target in list(targets.items()):
+            if seen >= target:
+                result[name] = length
+                del targets[name]
+    return result
+
+@dataclass
+class ChunkLengthStats:
+    """
+    Length histograms of embedded chunks (bounded by the number of distinct lengths).
+    
+    Token counts may cover only a sample of the chunks (token_sampled);
+    the truncation rate refers to that sample.
+    """
+    unit: str = "chars"
+    max_seq_length: Optional[int] = None
+    count: int = 0
+    token_sampled: int = 0
+    truncated: int = 0
+    chars: Counter = field(default_factory=Counter)
+    tokens: Counter = field(default_factory=Counter)
+    
+    def record(self, texts: List[str], token_counts: Optional[List[int]] = None):
+        self.count += len(texts)
+        self.chars.update(len(text) for text in texts)
+        if token_counts is not None:
+            self.token_sampled += len(token_counts)
+            self.tokens.update(token_counts)
+            if self.max_seq_length:
+                self.truncated += sum(1 for n in token_counts if n > self.max_seq_length)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "unit": self.unit,
+            "count": self.count,
+            "chars": _distribution(self.chars),
+            "tokens": _distribution(self.tokens),
+            "token_sampled": self.token_sampled,
+            "max_seq_length": self.max_seq_length,
+            "truncated": self.truncated,
+            "truncation_rate": round(self.truncated / self.token_sampled, 4) if self.token_sampled else None,
+        }
+
+@dataclass
+class _ChunkBatch:
+    """Micro-batch handed from stage to stage."""
+    chunks: List[Chunk]
+    embeddings: Optional[np.ndarray] = None
+    ids: Optional[List[str]] = None
+
+class _FileDiff:
+    """Comparison of a file version with its manifest entry (incremental ingestion)."""
+    
+    def __init__(
+        self,
+        file_hash: str,
+        project_id: Optional[str],
+        previous: Optional[ManifestEntry],
+        stored_ids: Set[str]
+    ):
+        self.entry = ManifestEntry(file_hash=file_hash, project_id=project_id)
+        self.previous = previous
+        # Only chunks still present in the collection can be reused
+        self.reusable = {
+            chunk_id: chunk_hash
+            for chunk_id, chunk_hash in previous.chunk_hashes.items()
+            if chunk_id in stored_ids
+        } if previous else {}
+        # Unchanged chunks whose metadata still has to be refreshed
+        self.unchanged: List[Chunk] = []
+        self.reused = 0
+    
+    @property
+    def file_unchanged(self) -> bool:
+        """Same content and project as last time, and all chunks still stored."""
+        return (
+            self.previous is not None
+            and self.previous.file_hash == self.entry.file_hash
+            and self.previous.project_id == self.entry.project_id
+            and 0 < len(self.reusable) == len(self.previous.chunk_hashes)
+        )
+    
+    def needs_embedding(self, chunk: Chunk) -> bool:
+        """Record the chunk in the new entry; False if its stored version can be kept."""
+        chunk_id = VectorStore.make_chunk_id(chunk)
+        chunk_hash = hash_chunk(chunk)
+        self.entry.chunk_hashes[chunk_id] = chunk_hash
+        if self.reusable.get(chunk_id) == chunk_hash:
+            self.unchanged.append(chunk)
+            self.reused += 1
+            return False
+        return True
+    
+    def stale_ids(self) -> List[str]:
+        """Chunks of the previous version that the new version no longer has."""
+        if self.previous is None:
+            return []
+        return [chunk_id for chunk_id in self.previous.chunk_hashes if chunk_id not in self.entry.chunk_hashes]
+
 class IngestionPipeline:
     """
     Complete document ingestion pipeline.
@@ -38,109 +246,204 @@ class IngestionPipeline:
         """
         self.config = config or RAGConfig.from_yaml()
         
+        # Cumulative per-stage metrics of pipelined ingestion
+        self._stats_lock = threading.Lock()
+        self._stage_metrics: Dict[str, StageMetrics] = {}
+        self._chunk_lengths: Optional[ChunkLengthStats] = None
+        self._length_batches = 0
+        self._ingest_stats = {
+            "files": 0, "chunks": 0, "wall_seconds": 0.0,
+            "files_skipped": 0, "chunks_reused": 0, "chunks_deleted": 0,
+        }
+        
         # Initialize components
         self._init_parsers()
-        self._init_chunker()
         self._init_embedder()
+        self._init_chunker()
         self._init_vector_store()
+        self._init_sparse_index()
+        self._init_manifest()
     
     def _init_parsers(self):
         """Initialize document parsers."""
-        self.parsers = {
-            '.pdf': PDFParser(),
-            '.docx': DocxParser(),
-            '.xlsx': XlsxParser(),
-        }
+        self.parsers = _create_parsers(self.config)
     
     def _init_chunker(self):
-        """Initialize chunker with config."""
-        self.chunker = Chunker(
-            chunk_size=self.config.chunk_size,
-            chunk_overlap=self.config.chunk_overlap,
-        )
+        """Initialize chunker with config (token chunking uses the embedder's tokenizer)."""
+        tokenizer = self.embedder.get_tokenizer() if self.config.chunk_unit == "tokens" else None
+        self.chunker = _create_chunker(self.config, tokenizer)
+        max_seq_length = self.embedder.max_seq_length
+        # Special tokens ([CLS], [SEP]) count against the encoder limit as well
+        if tokenizer is not None and max_seq_length and self.config.chunk_size + 2 > max_seq_length:
+            logger.warning(
+                f"chunk_size {self.config.chunk_size} tokens exceeds the encoder limit of "
+                f"{max_seq_length} tokens; chunks will be truncated when embedding"
+            )
     
     def _init_embedder(self):
-        """Initialize embedding generator."""
-        self.embedder = EmbeddingGenerator(
-            model_name=self.config.embedding_model
-        )
+        """Initialize embedding generator (shared with querying via the registry)."""
+        self.embedder = get_component_registry().get_embedder(self.config)
     
     def _init_vector_store(self):
-        """Initialize vector store."""
-        self.vector_store = VectorStore(
-            collection_name=self.config.collection_name,
-            persist_directory=self.config.vector_store_path,
-            embedding_function=self.embedder
+        """Initialize vector store (shared with querying via the registry)."""
+        self.vector_store = get_component_registry().get_vector_store(
+            self.config,
+            persist_directory=self.config.vector_store_path
+        )
+    
+    def _init_sparse_index(self):
+        """Initialize the BM25 side index (kept in sync with Chroma unless retrieval is dense-only)."""
+        self.sparse_index = (
+            get_component_registry().get_sparse_index(self.vector_store)
+            if self.config.retrieval_mode != "dense" else None
         )
     
-    def ingest_file(self, file_path: str, project_id: Optional[str] = None) -> Dict[str, Any]:
+    def _init_manifest(self):
+        """Initialize the file/chunk hash manifest used for incremental re-ingestion."""
+        self.manifest = (
+            IngestionManifest(self.config.vector_store_path, self.config.collection_name)
+            if self.config.ingest_incremental else None
+        )
+    
+    def ingest_file(
+        self,
+        file_path: str,
+        project_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
         """
         Ingest a single file through complete pipeline.
         
         Args:
             file_path: Path to document file
             project_id: Optional project ID to associate with chunks
+            progress_callback: Optional callback receiving progress after each
+                micro-batch (pages parsed, chunks, chunks embedded and stored)
             
         Returns:
-            Ingestion results with statistics
+            Ingestion results with statistics ('skipped' if the file is unchanged)
         """
         path = Path(file_path)
         
         if not path.exists():
             raise FileNotFoundError(f"File not found: {path}")
 
-        # 1. Parse document
-        documents = self._parse_document(path)
+        start = time.perf_counter()
+        diff = self._diff_file(path, project_id)
+        if diff is not None and diff.file_unchanged:
+            self._record_skip(diff, time.perf_counter() - start)
+            return self._skipped_result(path, diff)
         
-        # 2. Chunk document
-        chunks = self._chunk_document(documents)
+        # One write version for the whole file (see _write_batch)
+        with self._write_batch():
+            # 1. Parse page by page, 2. chunk each page, 3. embed + store per micro-batch
+            counters = {"pages_parsed": 0, "chunks_total": 0, "chunks_embedded": 0}
+            documents = self._count_documents(self._iter_documents(path), counters)
+            chunks = self._iter_chunks(documents, path, project_id, counters)
+            if diff is not None:
+                # Unchanged chunks keep their stored embedding
+                chunks = self._filter_changed(chunks, diff)
+            batches = (
+                _ChunkBatch(chunks=batch)
+                for batch in self._iter_batches(chunks, self.config.ingest_store_batch_size)
+            )
         
-        # Add extra metadata
-        for chunk in chunks:
-            if project_id:
-                chunk.metadata["project_id"] = project_id
-            
-            chunk.metadata["doc_id"] = path.stem
-            chunk.metadata["doc_name"] = path.name
-            # Ensure page_number is present (PDFParser adds it)
-            # If not present (e.g. other parsers), default to 1
-            if "page_number" not in chunk.metadata:
-                chunk.metadata["page_number"] = 1
+            def embed(batch: _ChunkBatch) -> _ChunkBatch:
+                batch = self._embed_batch(batch)
+                counters["chunks_embedded"] += len(batch.chunks)
+                return batch
         
-        # 3. Store chunks (embeddings generated automatically)
-        chunk_ids = self._store_chunks(chunks)
+            executor = None
+            if self.config.ingest_pipelined:
+                # Parsing page N+1 overlaps embedding page N and storing page N-1
+                executor = StagedExecutor(
+                    "parse",
+                    [("embed", embed), ("store", self._store_batch)],
+                    queue_size=self.config.ingest_queue_size,
+                    unit_count=lambda batch: len(batch.chunks)
+                )
+                stored = executor.run(batches)
+            else:
+                stored = (self._store_batch(embed(batch)) for batch in batches)
+        
+            chunk_ids: List[str] = []
+            chunks_deleted = 0
+            try:
+                for batch in stored:
+                    chunk_ids.extend(batch.ids)
+                    if progress_callback:
+                        progress_callback("stored", {
+                            **counters,
+                            "chunks_stored": len(chunk_ids),
+                        })
+                if diff is not None:
+                    chunks_deleted = self._finish_diff(path, diff)
+                    chunk_ids = list(diff.entry.chunk_hashes)
+                else:
+                    chunks_deleted = self._delete_stale(path, chunk_ids)
+            finally:
+                self._record_stats(executor, counters["chunks_embedded"], time.perf_counter() - start, diff, chunks_deleted)
         
         # 4. Return statistics
         return {
             'file_path': str(path),
             'file_type': path.suffix,
             'document_count': 1,
-            'chunk_count': len(chunks),
+            'page_count': counters["pages_parsed"],
+            'chunk_count': len(chunk_ids),
             'chunk_ids': chunk_ids,
+            'chunks_embedded': counters["chunks_embedded"],
+            'chunks_unchanged': diff.reused if diff is not None else 0,
+            'chunks_deleted': chunks_deleted,
+            'skipped': False,
             'success': True
         }
     
-    def ingest_directory(self, directory_path: str) -> List[Dict[str, Any]]:
+    def ingest_directory(
+        self,
+        directory_path: str,
+        project_id: Optional[str] = None,
+        project_ids: Optional[Dict[str, str]] = None,
+        max_workers: int = 1
+    ) -> Dict[str, Any]:
         """
-        Ingest all supported documents from a directory.
+        Ingest all supported documents from a directory (recursively).
+        
+        With max_workers > 1, files are parsed and chunked in a process pool
+        while a single consumer embeds and stores the chunks in micro-batches.
         
         Args:
             directory_path: Path to directory
+            project_id: Project ID for all files without an entry in project_ids
+            project_ids: Per-file project IDs, keyed by path relative to the
+                directory, absolute path or file name
+            max_workers: Worker processes for parsing/chunking (1 = sequential)
             
         Returns:
-            List of ingestion results for each file
+            Aggregate statistics with the ingestion result of each file under 'files'
+            (chunk_count counts all chunks, chunks_embedded only new/changed ones)
         """
         directory = Path(directory_path)
         if not directory.exists():
              raise FileNotFoundError(f"Directory not found: {directory_path}")
 
-        results = []
+        files = sorted(
+            file_path for file_path in directory.glob('**/*')
+            if file_path.is_file() and file_path.suffix.lower() in self.parsers
+        )
+        assignments = [
+            (file_path, self._resolve_project_id(file_path, directory, project_id, project_ids))
+            for file_path in files
+        ]
         
-        for file_path in directory.glob('**/*'):
-            if file_path.suffix.lower() in self.parsers:
+        start = time.perf_counter()
+        if max_workers > 1 and len(files) > 1:
+            results = self._ingest_files_parallel(assignments, max_workers)
+        else:
+            results = []
+            for file_path, file_project_id in assignments:
                 try:
-                    result = self.ingest_file(str(file_path))
-                    results.append(result)
+                    results.append(self.ingest_file(str(file_path), project_id=file_project_id))
                 except Exception as e:
                     logger.error(f"Failed to ingest {file_path}: {e}")
                     results.append({
@@ -148,18 +451,313 @@ class IngestionPipeline:
                         'success': False,
                         'error': str(e)
                     })
+        wall_seconds = time.perf_counter() - start
         
-        return results
+        succeeded = [r for r in results if r['success']]
+        chunk_count = sum(r['chunk_count'] for r in succeeded)
+        return {
+            'files': results,
+            'files_total': len(results),
+            'files_succeeded': len(succeeded),
+            'files_failed': len(results) - len(succeeded),
+            'files_skipped': sum(1 for r in succeeded if r['skipped']),
+            'chunk_count': chunk_count,
+            'chunks_embedded': sum(r['chunks_embedded'] for r in succeeded),
+            'wall_seconds': round(wall_seconds, 4),
+            'files_per_sec': round(len(results) / wall_seconds, 2) if wall_seconds else 0.0,
+            'chunks_per_sec': round(chunk_count / wall_seconds, 2) if wall_seconds else 0.0,
+            'max_workers': max_workers,
+        }
     
-    def _parse_document(self, file_path: Path) -> List[Document]:
-        """Parse document based on file extension."""
+    @staticmethod
+    def _resolve_project_id(
+        file_path: Path,
+        directory: Path,
+        default: Optional[str],
+        project_ids: Optional[Dict[str, str]]
+    ) -> Optional[str]:
+        if project_ids:
+            for key in (
+                file_path.relative_to(directory).as_posix(),
+                str(file_path.resolve()),
+                str(file_path),
+                file_path.name
+            ):
+                if key in project_ids:
+                    return project_ids[key]
+        return default
+    
+    def _ingest_files_parallel(
+        self,
+        assignments: List[Tuple[Path, Optional[str]]],
+        max_workers: int
+    ) -> List[Dict[str, Any]]:
+        """Parse/chunk in worker processes, embed and store in this (single) consumer."""
+        start = time.perf_counter()
+        results: Dict[str, Dict[str, Any]] = {}
+        diffs: Dict[str, Optional[_FileDiff]] = {}
+        pending: List[Tuple[str, Chunk]] = []
+        batch_size = max(1, self.config.ingest_store_batch_size)
+        
+        def fail(file_path: str, error: Exception):
+            logger.error(f"Failed to ingest {file_path}: {error}")
+            results[file_path] = {'file_path': file_path, 'success': False, 'error': str(error)}
+        
+        def flush():
+            # A failed batch fails every file with chunks in it; the others carry on
+            owners = [owner for owner, _ in pending]
+            try:
+                batch = self._embed_batch(_ChunkBatch(chunks=[chunk for _, chunk in pending]))
+                batch = self._store_batch(batch)
+            except Exception as e:
+                # The batch may be in Chroma but not in the BM25 index
+                batch_state["mirrored"] = False
+                for owner in dict.fromkeys(owners):
+                    fail(owner, e)
+            else:
+                for owner, chunk_id in zip(owners, batch.ids):
+                    if results[owner]['success']:
+                        results[owner]['chunk_ids'].append(chunk_id)
+            pending.clear()
+        
+        # Unchanged files are skipped before any parsing
+        to_parse: List[Tuple[Path, Optional[str]]] = []
+        for file_path, file_project_id in assignments:
+            try:
+                diff = self._diff_file(file_path, file_project_id)
+            except Exception as e:
+                fail(str(file_path), e)
+                continue
+            if diff is not None and diff.file_unchanged:
+                self._record_skip(diff, 0.0)
+                results[str(file_path)] = self._skipped_result(file_path, diff)
+                continue
+            diffs[str(file_path)] = diff
+            to_parse.append((file_path, file_project_id))
+        
+        # One write version for the whole run (see _write_batch); skipped files write nothing
+        with (self._write_batch() if to_parse else nullcontext({"mirrored": True})) as batch_state:
+            # spawn instead of fork: the parent process runs torch/Chroma threads
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.config, self.chunker.tokenizer)
+            ) as executor:
+                futures = {
+                    executor.submit(_parse_and_chunk_file, str(file_path), file_project_id): str(file_path)
+                    for file_path, file_project_id in to_parse
+                }
+                for future in as_completed(futures):
+                    file_path = futures[future]
+                    path = Path(file_path)
+                    try:
+                        pages, chunks = future.result()
+                    except Exception as e:
+                        fail(file_path, e)
+                        continue
+                
+                    results[file_path] = {
+                        'file_path': file_path,
+                        'file_type': path.suffix,
+                        'document_count': 1,
+                        'page_count': pages,
+                        'chunk_ids': [],
+                        'skipped': False,
+                        'success': True
+                    }
+                    diff = diffs[file_path]
+                    for chunk in chunks:
+                        if not results[file_path]['success']:
+                            break
+                        if diff is None or diff.needs_embedding(chunk):
+                            pending.append((file_path, chunk))
+                            if len(pending) >= batch_size:
+                                flush()
+                        elif len(diff.unchanged) >= batch_size:
+                            try:
+                                self._flush_unchanged(diff)
+                            except Exception as e:
+                                batch_state["mirrored"] = False
+                                fail(file_path, e)
+                if pending:
+                    flush()
+        
+            # Manifest entries are written only after all chunks of the file are stored
+            chunks_embedded = chunks_reused = chunks_deleted = 0
+            for file_path, result in results.items():
+                if not result['success'] or result['skipped']:
+                    continue
+                diff = diffs[file_path]
+                result['chunks_embedded'] = len(result['chunk_ids'])
+                result['chunks_unchanged'] = diff.reused if diff is not None else 0
+                try:
+                    result['chunks_deleted'] = (
+                        self._finish_diff(Path(file_path), diff) if diff is not None
+                        else self._delete_stale(Path(file_path), result['chunk_ids'])
+                    )
+                except Exception as e:
+                    batch_state["mirrored"] = False
+                    fail(file_path, e)
+                    continue
+                if diff is not None:
+                    result['chunk_ids'] = list(diff.entry.chunk_hashes)
+                result['chunk_count'] = len(result['chunk_ids'])
+                chunks_embedded += result['chunks_embedded']
+                chunks_reused += result['chunks_unchanged']
+                chunks_deleted += result['chunks_deleted']
+        
+        ordered = [results[str(file_path)] for file_path, _ in assignments]
+        with self._stats_lock:
+            self._ingest_stats["files"] += sum(1 for r in ordered if r['success'] and not r['skipped'])
+            self._ingest_stats["chunks"] += chunks_embedded
+            self._ingest_stats["chunks_reused"] += chunks_reused
+            self._ingest_stats["chunks_deleted"] += chunks_deleted
+            self._ingest_stats["wall_seconds"] += time.perf_counter() - start
+        return ordered
+    
+    def _diff_file(self, path: Path, project_id: Optional[str]) -> Optional[_FileDiff]:
+        """Compare a file with its manifest entry (None without incremental ingestion)."""
+        if self.manifest is None:
+            return None
+        previous = self.manifest.get(path)
+        stored_ids = self.vector_store.get_existing_ids(list(previous.chunk_hashes)) if previous else set()
+        return _FileDiff(hash_file(path), project_id, previous, stored_ids)
+    
+    @staticmethod
+    def _skipped_result(path: Path, diff: _FileDiff) -> Dict[str, Any]:
+        logger.info(f"Skipping unchanged file: {path.name}")
+        chunk_ids = list(diff.previous.chunk_hashes)
+        return {
+            'file_path': str(path),
+            'file_type': path.suffix,
+            'document_count': 1,
+            'page_count': 0,
+            'chunk_count': len(chunk_ids),
+            'chunk_ids': chunk_ids,
+            'chunks_embedded': 0,
+            'chunks_unchanged': len(chunk_ids),
+            'chunks_deleted': 0,
+            'skipped': True,
+            'success': True
+        }
+    
+    def _filter_changed(self, chunks: Iterable[Chunk], diff: _FileDiff) -> Iterator[Chunk]:
+        """Yield chunks that need embedding; refresh the metadata of the others in batches."""
+        for chunk in chunks:
+            if diff.needs_embedding(chunk):
+                yield chunk
+            elif len(diff.unchanged) >= self.config.ingest_store_batch_size:
+                self._flush_unchanged(diff)
+    
+    def _flush_unchanged(self, diff: _FileDiff):
+        # Metadata only (e.g. a new project id), the stored embedding is kept
+        ids = self.vector_store.update_metadata(diff.unchanged)
+        self._index_sparse(ids, diff.unchanged)
+        diff.unchanged = []
+    
+    def _finish_diff(self, path: Path, diff: _FileDiff) -> int:
+        """Delete stale chunks and record the new file version. Returns the number deleted."""
+        self._flush_unchanged(diff)
+        stale_ids = diff.stale_ids()
+        previous_project = diff.previous.project_id if diff.previous else None
+        self.vector_store.delete_ids(stale_ids, project_ids=[previous_project])
+        if diff.previous and previous_project != diff.entry.project_id:
+            # Chunks moved to another project: cached results of the old one are stale too
+            self.vector_store.mark_changed([previous_project])
+        if self.sparse_index is not None and stale_ids:
+            self.sparse_index.delete(stale_ids)
+        self.manifest.put(path, diff.entry)
+        return len(stale_ids)
+    
+    def _delete_stale(self, path: Path, chunk_ids: List[str]) -> int:
+        """
+        Delete stored chunks of a re-ingested file that its new version no longer has.
+        
+        Without the manifest, an edited chunk is stored under a new
+        content-addressed ID and the old one would remain. Returns the
+        number deleted.
+        """
+        kept = set(chunk_ids)
+        stale_ids = [chunk_id for chunk_id in self.vector_store.ids_by_source(str(path)) if chunk_id not in kept]
+        self._delete_chunks(stale_ids)
+        return len(stale_ids)
+    
+    def _delete_chunks(self, ids: List[str]):
+        """Delete chunks from Chroma and the BM25 index."""
+        if not ids:
+            return
+        self.vector_store.delete_ids(ids)
+        if self.sparse_index is not None:
+            self.sparse_index.delete(ids)
+    
+    def delete_source(self, file_path: str) -> int:
+        """
+        Remove an ingested file: its chunks in Chroma and the BM25 index and
+        its manifest entry.
+        
+        Args:
+            file_path: Path the file was ingested from
+            
+        Returns:
+            Number of deleted chunks
+        """
+        path = Path(file_path)
+        ids = self.vector_store.ids_by_source(str(path))
+        if ids:
+            with self._write_batch():
+                self._delete_chunks(ids)
+        if self.manifest is not None:
+            self.manifest.remove(path)
+        logger.info(f"Deleted {len(ids)} chunks of {path.name}")
+        return len(ids)
+    
+    def _get_parser(self, file_path: Path):
+        """Return the parser for the file extension."""
         suffix = file_path.suffix.lower()
         parser = self.parsers.get(suffix)
         
         if not parser:
             raise ValueError(f"Unsupported file type: {suffix}")
         
-        return parser.parse(str(file_path))
+        return parser
+    
+    def _parse_document(self, file_path: Path) -> List[Document]:
+        """Parse document based on file extension."""
+        return self._get_parser(file_path).parse(str(file_path))
+    
+    def _iter_documents(self, file_path: Path) -> Iterator[Document]:
+        """Stream documents (pages for PDFs) based on file extension."""
+        return self._get_parser(file_path).iter_documents(str(file_path))
+    
+    @staticmethod
+    def _count_documents(documents: Iterable[Document], counters: Dict[str, int]) -> Iterator[Document]:
+        for doc in documents:
+            counters["pages_parsed"] += 1
+            yield doc
+    
+    def _iter_chunks(
+        self,
+        documents: Iterable[Document],
+        path: Path,
+        project_id: Optional[str],
+        counters: Dict[str, int]
+    ) -> Iterator[Chunk]:
+        """Chunk documents one at a time and add file-level metadata."""
+        for doc in documents:
+            for chunk in self.chunker.split(doc):
+                counters["chunks_total"] += 1
+                yield _add_file_metadata(chunk, path, project_id)
+    
+    @staticmethod
+    def _iter_batches(chunks: Iterable[Chunk], batch_size: int) -> Iterator[List[Chunk]]:
+        """Group chunks into micro-batches of at most batch_size."""
+        iterator = iter(chunks)
+        while True:
+            batch = list(islice(iterator, max(1, batch_size)))
+            if not batch:
+                return
+            yield batch
     
     def _chunk_document(self, documents: List[Document]) -> List:
         """Chunk documents into smaller pieces."""
@@ -170,15 +768,128 @@ class IngestionPipeline:
     
     def _store_chunks(self, chunks: List) -> List[str]:
         """Store chunks in vector store."""
-        return self.vector_store.add_chunks(chunks)
+        ids = self.vector_store.add_chunks(chunks)
+        self._index_sparse(ids, chunks)
+        return ids
+    
+    def _embed_batch(self, batch: _ChunkBatch) -> _ChunkBatch:
+        """Embedding stage: compute float32 embeddings for a micro-batch."""
+        texts = [chunk.content for chunk in batch.chunks]
+        self._record_chunk_lengths(batch.chunks)
+        batch.embeddings = self.embedder.embed_batch_array(texts)
+        return batch
+    
+    def _record_chunk_lengths(self, chunks: List[Chunk]):
+        """
+        Chunk size distribution and how many chunks the encoder will truncate.
+        
+        In token mode the chunker's counts are reused (plus the special tokens
+        the encoder adds); in char mode only every chunk_stats_sample_every-th
+        micro-batch is tokenized.
+        """
+        texts = [chunk.content for chunk in chunks]
+        tokenizer = self.embedder.get_tokenizer()
+        with self._stats_lock:
+            batch_number = self._length_batches
+            self._length_batches += 1
+        token_counts = None
+        if self.chunker.chunk_unit == "tokens":
+            special = tokenizer.num_special_tokens_to_add(pair=False)
+            token_counts = [chunk.metadata["token_count"] + special for chunk in chunks]
+        elif tokenizer is not None and self.config.chunk_stats_sample_every > 0:
+            if batch_number % self.config.chunk_stats_sample_every == 0:
+                token_counts = self.embedder.count_tokens(texts)
+        with self._stats_lock:
+            if self._chunk_lengths is None:
+                self._chunk_lengths = ChunkLengthStats(
+                    unit=self.chunker.chunk_unit,
+                    max_seq_length=self.embedder.max_seq_length
+                )
+            self._chunk_lengths.record(texts, token_counts)
+    
+    def _store_batch(self, batch: _ChunkBatch) -> _ChunkBatch:
+        """Store stage: write a micro-batch with precomputed embeddings to Chroma."""
+        batch.ids = self.vector_store.add_chunks(batch.chunks, embeddings=batch.embeddings)
+        self._index_sparse(batch.ids, batch.chunks)
+        # Release the embeddings once written
+        batch.embeddings = None
+        return batch
+    
+    def _index_sparse(self, ids: List[str], chunks: List[Chunk]):
+        """Add stored chunks to the BM25 index (same IDs as in Chroma)."""
+        if self.sparse_index is not None and ids:
+            self.sparse_index.add(ids, chunks)
+    
+    @contextmanager
+    def _write_batch(self) -> Iterator[Dict[str, bool]]:
+        """
+        Run an ingestion step's Chroma writes under one write version of the collection.
+        
+        Yields a state dict; set "mirrored" to False if a write may have
+        reached Chroma but not the BM25 index. On success the index is
+        marked synced to the batch's version, only if it was current before
+        the batch; otherwise another writer got in between and the next
+        start re-syncs.
+        """
+        state = {"mirrored": True}
+        with self.vector_store.write_batch() as version:
+            yield state
+        if self.sparse_index is not None and state["mirrored"]:
+            self.sparse_index.mark_synced(version, expected=version - 1)
+    
+    def _record_stats(
+        self,
+        executor: Optional[StagedExecutor],
+        chunk_count: int,
+        wall_seconds: float,
+        diff: Optional[_FileDiff] = None,
+        chunks_deleted: int = 0
+    ):
+        with self._stats_lock:
+            self._ingest_stats["files"] += 1
+            self._ingest_stats["chunks"] += chunk_count
+            self._ingest_stats["wall_seconds"] += wall_seconds
+            self._ingest_stats["chunks_reused"] += diff.reused if diff is not None else 0
+            self._ingest_stats["chunks_deleted"] += chunks_deleted
+            if executor is not None:
+                for name, metrics in executor.metrics.items():
+                    self._stage_metrics.setdefault(name, StageMetrics(name)).merge(metrics)
+    
+    def _record_skip(self, diff: _FileDiff, wall_seconds: float):
+        with self._stats_lock:
+            self._ingest_stats["files_skipped"] += 1
+            self._ingest_stats["chunks_reused"] += len(diff.previous.chunk_hashes)
+            self._ingest_stats["wall_seconds"] += wall_seconds
     
     def get_stats(self) -> Dict[str, Any]:
-        """Get pipeline statistics."""
+        """
+        Get pipeline statistics.
+        'stages' holds per-stage throughput (chunks/sec while busy) and
+        queue depth of pipelined ingestion; 'ingestion' the end-to-end rate
+        (chunks = embedded chunks) and incremental re-ingestion savings;
+        'chunks' the size distribution of embedded chunks (chars and tokens)
+        and the share truncated by the encoder's token limit.
+        """
+        with self._stats_lock:
+            ingest_stats = dict(self._ingest_stats)
+            stage_stats = {name: m.to_dict() for name, m in self._stage_metrics.items()}
+            chunk_stats = self._chunk_lengths.to_dict() if self._chunk_lengths is not None else {}
+        wall = ingest_stats["wall_seconds"]
+        ingest_stats["chunks_per_sec"] = round(ingest_stats["chunks"] / wall, 2) if wall else 0.0
+        ingest_stats["wall_seconds"] = round(wall, 4)
+        
         return {
             'vector_store': self.vector_store.get_collection_stats(),
             'embedding_cache': self.embedder.get_cache_stats(),
+            'ingestion': ingest_stats,
+            'stages': stage_stats,
+            'chunks': chunk_stats,
             'config': {
                 'chunk_size': self.config.chunk_size,
+                'chunk_unit': self.config.chunk_unit,
                 'top_k': self.config.top_k,
+                'pipelined': self.config.ingest_pipelined,
+                'queue_size': self.config.ingest_queue_size,
+                'incremental': self.config.ingest_incremental,
             }
         }
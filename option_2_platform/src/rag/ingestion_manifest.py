@@ -0,0 +1,170 @@
+"""
+Ingestion manifest for incremental re-ingestion.
+
+Records, per collection and ingested file, the SHA-256 of the file content
+and of every stored chunk. IngestionPipeline uses it to skip unchanged
+files without parsing them, to re-embed only chunks whose content changed
+and to delete chunks that no longer exist in a new file version.
+The manifest is a SQLite file next to the vector database.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from .exceptions import VectorStoreError
+from .models import Chunk
+
+logger = logging.getLogger(__name__)
+
+
+def hash_file(file_path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of the file content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_chunk(chunk: Chunk) -> str:
+    """SHA-256 of the chunk text (what the embedding depends on)."""
+    return hashlib.sha256(chunk.content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """Ingestion state of one file."""
+    file_hash: str
+    project_id: Optional[str] = None
+    chunk_hashes: Dict[str, str] = field(default_factory=dict)  # chunk id -> content hash, in chunk order
+
+
+class IngestionManifest:
+    """Persistent file/chunk hash manifest of one collection."""
+
+    FILENAME = "ingestion_manifest.sqlite3"
+
+    def __init__(self, directory: str, collection_name: str):
+        """
+        Open (or create) the manifest database.
+
+        Args:
+            directory: Directory for the manifest file (the vector store path).
+            collection_name: Collection the recorded chunks belong to.
+        """
+        self.collection_name = collection_name
+        self._lock = threading.Lock()
+        try:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            self.path = Path(directory) / self.FILENAME
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    collection TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    project_id TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (collection, file_path)
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    collection TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    chunk_hash TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    PRIMARY KEY (collection, file_path, chunk_id)
+                )
+                """
+            )
+            self._conn.commit()
+            logger.info(f"Opened ingestion manifest at {self.path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open ingestion manifest in {directory}: {e}")
+            raise VectorStoreError(f"Failed to open ingestion manifest: {e}")
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return str(Path(file_path).resolve())
+
+    def get(self, file_path: Path) -> Optional[ManifestEntry]:
+        """Return the recorded state of a file (None if never ingested)."""
+        key = self._key(file_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_hash, project_id FROM files WHERE collection = ? AND file_path = ?",
+                (self.collection_name, key)
+            ).fetchone()
+            if row is None:
+                return None
+            chunk_rows = self._conn.execute(
+                "SELECT chunk_id, chunk_hash FROM chunks WHERE collection = ? AND file_path = ? ORDER BY position",
+                (self.collection_name, key)
+            ).fetchall()
+        return ManifestEntry(file_hash=row[0], project_id=row[1], chunk_hashes=dict(chunk_rows))
+
+    def put(self, file_path: Path, entry: ManifestEntry):
+        """Replace the recorded state of a file."""
+        key = self._key(file_path)
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE collection = ? AND file_path = ?",
+                (self.collection_name, key)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (collection, file_path, file_hash, project_id, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.collection_name, key, entry.file_hash, entry.project_id, time.time())
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (collection, file_path, chunk_id, chunk_hash, position) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(self.collection_name, key, chunk_id, chunk_hash, position)
+                 for position, (chunk_id, chunk_hash) in enumerate(entry.chunk_hashes.items())]
+            )
+            self._conn.commit()
+
+    def remove(self, file_path: Path):
+        """Forget a file (e.g. after its chunks were deleted)."""
+        key = self._key(file_path)
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE collection = ? AND file_path = ?",
+                (self.collection_name, key)
+            )
+            self._conn.execute(
+                "DELETE FROM files WHERE collection = ? AND file_path = ?",
+                (self.collection_name, key)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Forget all files of this collection."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE collection = ?", (self.collection_name,))
+            self._conn.execute("DELETE FROM files WHERE collection = ?", (self.collection_name,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM files WHERE collection = ?", (self.collection_name,)
+            ).fetchone()
+        return int(row[0])
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
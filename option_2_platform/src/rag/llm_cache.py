@@ -0,0 +1,161 @@
+"""
+Persistent cache of LLM answers.
+
+Identical prompts (same question, retrieved chunks and template) with the
+same model and generation parameters get the same answer at temperature 0,
+so LLMChain looks the answer up by a fingerprint of the final prompt and
+the parameters before calling the LLM. Answers live in a SQLite file with
+a TTL and an LRU size bound. Sampled generations (temperature > 0) bypass
+the cache unless cache_sampled is set.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .exceptions import LLMError
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_fingerprint(prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+    """SHA-256 of the final prompt and everything else the answer depends on."""
+    payload = json.dumps(
+        {"prompt": prompt, "model": model, "temperature": temperature, "max_tokens": max_tokens},
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMAnswerCache:
+    """SQLite-backed answer cache with TTL and LRU eviction."""
+
+    FILENAME = "llm_answer_cache.sqlite3"
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        cache_sampled: bool = False
+    ):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            cache_dir: Directory for the cache file (e.g. data/llm_cache).
+            max_entries: Maximum number of cached answers, 0 = unbounded.
+            ttl_seconds: Maximum answer age, 0 = no expiry.
+            cache_sampled: Also cache answers generated with temperature > 0.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_sampled = cache_sampled
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0, "misses": 0, "bypassed": 0, "evictions": 0, "expired": 0,
+            "saved_llm_seconds": 0.0,
+        }
+        try:
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            self.path = Path(cache_dir) / self.FILENAME
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS answers (
+                    fingerprint TEXT PRIMARY KEY,
+                    answer TEXT NOT NULL,
+                    llm_seconds REAL NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_lru ON answers (last_access)")
+            self._conn.commit()
+            logger.info(f"Opened LLM answer cache at {self.path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open LLM answer cache in {cache_dir}: {e}")
+            raise LLMError(f"Failed to open LLM answer cache: {e}")
+
+    def applies_to(self, temperature: float) -> bool:
+        """False for sampled generations unless cache_sampled is set (counted as bypassed)."""
+        if temperature > 0 and not self.cache_sampled:
+            with self._lock:
+                self._stats["bypassed"] += 1
+            return False
+        return True
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        """Cached answer, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, llm_seconds, created FROM answers WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+            if row is not None and self.ttl_seconds and now - row[2] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM answers WHERE fingerprint = ?", (fingerprint,))
+                self._conn.commit()
+                self._stats["expired"] += 1
+                row = None
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE answers SET last_access = ? WHERE fingerprint = ?", (now, fingerprint))
+            self._conn.commit()
+            self._stats["hits"] += 1
+            self._stats["saved_llm_seconds"] += row[1]
+            return row[0]
+
+    def put(self, fingerprint: str, answer: str, llm_seconds: float):
+        """Store an answer with the time the LLM took to generate it."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers (fingerprint, answer, llm_seconds, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (fingerprint, answer, llm_seconds, now, now)
+            )
+            if self.max_entries > 0:
+                excess = self._count() - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM answers WHERE fingerprint IN "
+                        "(SELECT fingerprint FROM answers ORDER BY last_access ASC LIMIT ?)",
+                        (excess,)
+                    )
+                    self._stats["evictions"] += excess
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.commit()
+
+    def _count(self) -> int:
+        return int(self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache statistics (hits, misses, bypassed, hit_rate, saved_llm_seconds, size, ...)."""
+        with self._lock:
+            stats: Dict[str, Any] = self._stats.copy()
+            stats["size"] = self._count()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats["saved_llm_seconds"] = round(stats["saved_llm_seconds"], 3)
+        return stats
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -3,13 +3,15 @@ import time
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
 
+import numpy as np
+
 from .config import RAGConfig
 from .retrieval import RetrievalEngine
-from .llm_provider import BaseLLMProvider, OllamaProvider
+from .llm_provider import BaseLLMProvider
+from .llm_cache import LLMAnswerCache, prompt_fingerprint
 from .prompt_builder import PromptBuilder
 from .response_parser import ResponseParser
-from .vector_store import VectorStore
-from .embeddings import EmbeddingGenerator
+from .registry import get_component_registry
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,7 @@ class Citation:
     text_snippet: str
     chunk_id: str
     score: float
+    bboxes: str = ""  # encoded line boxes on the page (see models.encode_bboxes)
 
 @dataclass
 class RAGResponse:
@@ -35,77 +38,123 @@ class LLMChain:
     Complete RAG chain: Retrieval -> Prompt -> LLM -> Response.
     """
     
+    CITATION_TOP_K = 5  # chunks retrieved per question in query_with_citations
+    
     def __init__(
         self, 
         retrieval_engine: RetrievalEngine, 
         llm_provider: BaseLLMProvider, 
         prompt_builder: PromptBuilder, 
-        config: RAGConfig
+        config: RAGConfig,
+        answer_cache: Optional[LLMAnswerCache] = None
     ):
-        """Initialize all components."""
+        """
+        Initialize all components.
+        
+        Args:
+            answer_cache: LLM answer cache; defaults to the shared cache
+                of llm_cache_dir if llm_cache_enabled
+        """
         self.retrieval_engine = retrieval_engine
         self.llm_provider = llm_provider
         self.prompt_builder = prompt_builder
         self.config = config
         self.response_parser = ResponseParser()
+        if answer_cache is None and config.llm_cache_enabled:
+            answer_cache = get_component_registry().get_llm_cache(config)
+        self.answer_cache = answer_cache
+        self._stats = {"llm_calls": 0, "llm_seconds": 0.0}
+
+    def _generate(self, prompt: str, temperature: Optional[float] = None) -> str:
+        """
+        Generate an answer, served from the answer cache if possible.
+        
+        Returns the cached answer for the same prompt, model, temperature
+        and max_tokens. Sampled generations (temperature > 0) bypass the
+        cache unless llm_cache_sampled is set.
         
+        Args:
+            temperature: Overrides llm_temperature (e.g. for validation calls)
+        """
+        if temperature is None:
+            temperature = self.config.llm_temperature
+        max_tokens = self.config.llm_max_tokens
+        fingerprint = None
+        if self.answer_cache is not None and self.answer_cache.applies_to(temperature):
+            fingerprint = prompt_fingerprint(prompt, self.llm_provider.model_name, temperature, max_tokens)
+            answer = self.answer_cache.get(fingerprint)
+            if answer is not None:
+                logger.info("LLM answer served from cache")
+                return answer
+
+        start = time.time()
+        answer = self.llm_provider.generate(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        seconds = time.time() - start
+        self._stats["llm_calls"] += 1
+        self._stats["llm_seconds"] += seconds
+
+        if fingerprint is not None:
+            self.answer_cache.put(fingerprint, answer, seconds)
+        return answer
+
+    def get_stats(self) -> Dict[str, Any]:
+        """LLM calls and time spent, plus answer cache statistics (None if disabled)."""
+        return {
+            "llm_calls": self._stats["llm_calls"],
+            "llm_seconds": round(self._stats["llm_seconds"], 3),
+            "answer_cache": self.answer_cache.get_stats() if self.answer_cache is not None else None,
+        }
+
+    def retrieve_for_citations(
+        self,
+        questions: List[str],
+        project_id: str,
+        top_k: Optional[int] = None,
+        query_embeddings: Optional[np.ndarray] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve the chunks for several questions in one batch.
+        
+        Pass each list as `results` to query_with_citations, e.g. when
+        checking a whole criteria catalog.
+        
+        Args:
+            questions: Questions to retrieve chunks for
+            project_id: Project whose documents are searched
+            top_k: Chunks per question (default CITATION_TOP_K)
+            query_embeddings: Precomputed question vectors (see criteria_catalog)
+        """
+        return self.retrieval_engine.retrieve_many(
+            questions,
+            top_k=top_k or self.CITATION_TOP_K,
+            metadata_filter={"project_id": project_id},
+            query_embeddings=query_embeddings
+        )
+
     def query_with_citations(
         self, 
         question: str,
-        project_id: str
+        project_id: str,
+        results: Optional[List[Dict[str, Any]]] = None
     ) -> RAGResponse:
         """
         Query with Citation Extraction.
-        """
-        # 1. Retrieve relevant Chunks
-        # Note: RetrievalEngine.retrieve returns a list of dicts or objects. 
-        # Assuming it returns a list of dicts with 'text', 'metadata', 'score'.
-        # We need to pass project_id filter if supported by retrieval_engine.
-        # The current retrieval_engine.retrieve signature is query(query, top_k).
-        # We might need to update RetrievalEngine to support filters or handle it here if possible.
-        # For now, assuming retrieval_engine handles it or we filter post-retrieval (less efficient).
-        # Ideally, RetrievalEngine should accept filters.
-        
-        # Let's check RetrievalEngine signature in src/rag/retrieval.py first.
-        # But based on the prompt, I should implement this method.
-        
-        # Assuming retrieval_engine.retrieve supports filter or we just pass it.
-        # If not, I will update RetrievalEngine later.
-        
-        results = self.retrieval_engine.retrieve(
-            query=question,
-            top_k=5,
-            metadata_filter={"project_id": project_id}
-        )
-        
-        # 2. Build Context
-        # PromptBuilder needs to be used here.
-        prompt = self.prompt_builder.build_query_prompt(
-            query=question,
-            template_type="standard" # or specific template
-        )
-        # Wait, PromptBuilder usually takes the retrieved chunks to build the prompt.
-        # The current implementation of query() does:
-        # prompt = self.prompt_builder.build_query_prompt(query=question, template_type=template_type)
-        # This implies PromptBuilder might be stateful or I missed something.
-        # Let's look at query() again.
         
-        # In query():
-        # results = self.retrieval_engine.retrieve(...)
-        # prompt = self.prompt_builder.build_query_prompt(query=question, template_type=template_type)
-        
-        # Wait, where are 'results' used?
-        # Ah, PromptBuilder probably doesn't take results in build_query_prompt?
-        # That would be strange for RAG.
-        # Let me check PromptBuilder in src/rag/prompt_builder.py
-        
-        # For now, I will implement the method as requested, but I need to be careful about how context is injected.
-        # The user prompt example shows:
-        # context = self._build_context(retrieved_chunks)
-        # prompt = f"... Context: {context} ..."
-        
-        # I will follow the user's example logic but adapt to existing classes.
+        Args:
+            question: Question to answer
+            project_id: Project whose documents are searched
+            results: Chunks already retrieved for the question
+                (see retrieve_for_citations); retrieved here if None
+        """
+        # 1. Retrieve relevant Chunks (the only vector search for this question)
+        if results is None:
+            results = self.retrieval_engine.retrieve(
+                query=question,
+                top_k=self.CITATION_TOP_K,
+                metadata_filter={"project_id": project_id}
+            )
         
+        # 2. Build Context from the retrieved chunks
         context = self._build_context(results)
         
         # Construct prompt manually or use PromptBuilder if it supports context injection
@@ -120,12 +169,8 @@ Frage: {question}
 Antwort:
 """
         
-        # 3. LLM Query
-        answer = self.llm_provider.generate(
-            prompt=full_prompt,
-            max_tokens=self.config.llm_max_tokens,
-            temperature=self.config.llm_temperature
-        )
+        # 3. LLM Query (deterministic, so repeated validations hit the answer cache)
+        answer = self._generate(full_prompt, temperature=self.config.llm_citation_temperature)
         
         # 4. Extract Citations
         citations = self._extract_citations(
@@ -175,7 +220,8 @@ Antwort:
                 page=page,
                 text_snippet=text_snippet,
                 chunk_id=chunk.get("id", ""),
-                score=chunk.get("score", 0.0)
+                score=chunk.get("score", 0.0),
+                bboxes=metadata.get("bboxes", "")
             )
             
             citations.append(citation)
@@ -220,10 +266,11 @@ Antwort:
                 "metadata": {"duration": time.time() - start_time}
             }
             
-        # 2. Prompt Building
+        # 2. Prompt Building (reuses the results above, no second retrieval)
         logger.info(f"Step 2: Building prompt with {len(results)} chunks...")
-        prompt = self.prompt_builder.build_query_prompt(
+        prompt = self.prompt_builder.build_prompt_from_results(
             query=question,
+            results=results,
             template_type=template_type
         )
         
@@ -234,11 +281,7 @@ Antwort:
         # 3. LLM Generation
         logger.info("Step 3: Generating response from LLM...")
         try:
-            response_text = self.llm_provider.generate(
-                prompt=prompt,
-                max_tokens=self.config.llm_max_tokens,
-                temperature=self.config.llm_temperature
-            )
+            response_text = self._generate(prompt)
         except Exception as e:
             logger.error(f"LLM Generation failed: {e}")
             raise
@@ -279,24 +322,16 @@ def create_llm_chain(config_path: str = "config/config.yaml") -> LLMChain:
     # For now assuming standard loading logic in RAGConfig
     config = RAGConfig.from_yaml()
     
-    # 2. Initialize Components
-    embedding_generator = EmbeddingGenerator(model_name=config.embedding_model)
-    
-    vector_store = VectorStore(
-        persist_directory=config.persist_directory,
-        collection_name=config.collection_name,
-        embedding_function=embedding_generator
-    )
+    # 2. Initialize Components (embedder, vector store and LLM provider are shared)
+    registry = get_component_registry()
+    vector_store = registry.get_vector_store(config)
     
     retrieval_engine = RetrievalEngine(
         vector_store=vector_store,
         config=config
     )
     
-    llm_provider = OllamaProvider(
-        model_name=config.llm_model,
-        base_url=config.llm_base_url
-    )
+    llm_provider = registry.get_llm_provider(config)
     
     # Check LLM connection
     status = llm_provider.test_connection()
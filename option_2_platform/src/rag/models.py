@@ -1,5 +1,26 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+
+BBox = Tuple[float, float, float, float]
+
+
+def encode_bboxes(bboxes: Sequence[Sequence[float]]) -> str:
+    """Compact metadata form of bounding boxes: "x0,y0,x1,y1;x0,y0,x1,y1"."""
+    return ";".join(",".join(f"{v:g}" for v in bbox) for bbox in bboxes)
+
+
+def decode_bboxes(value: Optional[str]) -> List[BBox]:
+    """Inverse of encode_bboxes (empty or malformed values yield [])."""
+    bboxes = []
+    for part in (value or "").split(";"):
+        coords = part.split(",")
+        if len(coords) != 4:
+            continue
+        try:
+            bboxes.append(tuple(float(v) for v in coords))
+        except ValueError:
+            continue
+    return bboxes
 
 class Chunk(BaseModel):
     """
@@ -35,18 +35,6 @@ class PromptBuilder:
         Returns:
             Formatted prompt string ready for LLM
         """
-        # 1. Select Template
-        if template_type == "standard":
-            template = PromptTemplate.standard_query()
-        elif template_type == "evaluation":
-            template = PromptTemplate.criteria_evaluation()
-        elif template_type == "summary":
-            template = PromptTemplate.document_summary()
-        else:
-            logger.warning(f"Unknown template type '{template_type}', using standard.")
-            template = PromptTemplate.standard_query()
-            
-        # 2. Retrieve Context
         # For summary, we might want to retrieve differently (e.g. all chunks of a doc),
         # but for now we use standard retrieval.
         results = self.retrieval_engine.retrieve(
@@ -55,13 +43,44 @@ class PromptBuilder:
             metadata_filter=metadata_filter
         )
         
-        # 3. Format Context
+        return self.build_prompt_from_results(query, results, template_type)
+
+    def build_prompt_from_results(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        template_type: str = "standard"
+    ) -> str:
+        """
+        Build complete prompt from already retrieved results.
+        Use this when the caller has run retrieval itself, so the same
+        question is not embedded and searched a second time.
+        
+        Args:
+            query: User query or criteria
+            results: Retrieval results (as returned by RetrievalEngine.retrieve)
+            template_type: Type of template to use ("standard", "evaluation", "summary")
+            
+        Returns:
+            Formatted prompt string ready for LLM
+        """
+        template = self._select_template(template_type)
+        
         context_str = format_context(results, include_scores=False) # Config could be used here
         
         if not context_str:
             context_str = "Keine relevanten Dokumente gefunden."
             
-        # 4. Format Prompt
-        prompt = template.format(query=query, context=context_str)
-        
-        return prompt
+        return template.format(query=query, context=context_str)
+
+    def _select_template(self, template_type: str) -> PromptTemplate:
+        """Select prompt template by type, falling back to standard."""
+        if template_type == "standard":
+            return PromptTemplate.standard_query()
+        elif template_type == "evaluation":
+            return PromptTemplate.criteria_evaluation()
+        elif template_type == "summary":
+            return PromptTemplate.document_summary()
+
+        logger.warning(f"Unknown template type '{template_type}', using standard.")
+        return PromptTemplate.standard_query()
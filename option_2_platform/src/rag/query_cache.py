@@ -0,0 +1,184 @@
+"""
+Result cache in front of RetrievalEngine.retrieve.
+
+Reviewers ask the same questions across projects ("Wer ist
+antragsberechtigt?", "Förderquote?"). Results are cached per normalized
+query, filter and retrieval parameters. Keys include the write version of
+the collection (or of the filtered project, see VectorStore.version), so
+any write by IngestionPipeline makes the affected entries unreachable.
+With a semantic threshold, a query also matches a cached query of the same
+scope whose embedding has at least that cosine similarity.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return _WHITESPACE.sub(" ", query).strip().rstrip("?!.;: ").lower()
+
+
+def pinned_project(metadata_filter: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Project a filter restricts results to (top level or inside $and), else None."""
+    if not metadata_filter:
+        return None
+    value = metadata_filter.get("project_id")
+    if isinstance(value, dict):
+        value = value.get("$eq") if len(value) == 1 else None
+    if isinstance(value, str):
+        return value
+    for clause in metadata_filter.get("$and", []):
+        project_id = pinned_project(clause)
+        if project_id is not None:
+            return project_id
+    return None
+
+
+def filter_key(metadata_filter: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(metadata_filter or {}, sort_keys=True, ensure_ascii=False, default=str)
+
+
+@dataclass
+class _Entry:
+    results: List[Dict[str, Any]]
+    embedding: Optional[np.ndarray]  # unit length
+    created: float
+
+
+class QueryResultCache:
+    """Bounded LRU cache of retrieval results, optionally with semantic matching."""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 0, semantic_threshold: float = 0.0):
+        """
+        Args:
+            max_entries: Size bound, least recently used entries are evicted
+            ttl_seconds: Maximum entry age, 0 = no expiry
+            semantic_threshold: Minimum cosine similarity of query embeddings
+                for a semantic hit, 0 = exact (normalized) matches only
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self._lock = threading.Lock()
+        # (scope, normalized query) -> entry; scope = versions and retrieval parameters
+        self._entries: "OrderedDict[Tuple[Hashable, str], _Entry]" = OrderedDict()
+        self._scopes: Dict[Hashable, Dict[str, None]] = {}
+        self._stats = {"hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def semantic(self) -> bool:
+        return self.semantic_threshold > 0
+
+    def get(
+        self,
+        scope: Hashable,
+        query: str,
+        embed: Optional[Callable[[], np.ndarray]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Cached results for the query, or None.
+
+        Args:
+            scope: Hashable of everything besides the query the results depend on
+            query: Query text (normalized here)
+            embed: Returns the query embedding; only called for semantic
+                matching after an exact miss
+        """
+        key = (scope, normalize_query(query))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry, now):
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._copy(entry.results)
+            try_semantic = self.semantic and embed is not None and scope in self._scopes
+
+        if try_semantic:
+            # Outside the lock: may run the embedding model
+            embedding = embed()
+            with self._lock:
+                match = self._nearest(scope, embedding, now)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self._stats["semantic_hits"] += 1
+                    return self._copy(self._entries[match].results)
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, scope: Hashable, query: str, results: List[Dict[str, Any]], embedding: Optional[np.ndarray] = None):
+        key = (scope, normalize_query(query))
+        if embedding is not None:
+            embedding = np.asarray(embedding, dtype=np.float32)
+            norm = float(np.linalg.norm(embedding))
+            embedding = embedding / norm if norm else None
+        with self._lock:
+            self._entries[key] = _Entry(self._copy(results), embedding, time.time())
+            self._entries.move_to_end(key)
+            self._scopes.setdefault(scope, {})[key[1]] = None
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _nearest(self, scope: Hashable, embedding: np.ndarray, now: float) -> Optional[Tuple[Hashable, str]]:
+        """Most similar cached query of the scope above the threshold."""
+        keys = []
+        vectors = []
+        for query in self._scopes.get(scope, ()):
+            entry = self._entries[(scope, query)]
+            if entry.embedding is not None and not self._expired(entry, now):
+                keys.append((scope, query))
+                vectors.append(entry.embedding)
+        if not vectors:
+            return None
+        query_vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(query_vector))
+        if not norm:
+            return None
+        similarities = np.stack(vectors) @ (query_vector / norm)
+        best = int(np.argmax(similarities))
+        return keys[best] if similarities[best] >= self.semantic_threshold else None
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - entry.created > self.ttl_seconds
+
+    def _remove(self, key: Tuple[Hashable, str]):
+        del self._entries[key]
+        queries = self._scopes[key[0]]
+        del queries[key[1]]
+        if not queries:
+            del self._scopes[key[0]]
+
+    @staticmethod
+    def _copy(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Callers add keys to result dicts (scores, re-ranking)
+        return [dict(result) for result in results]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache statistics (hits, semantic_hits, misses, evictions, size)."""
+        with self._lock:
+            stats: Dict[str, Any] = self._stats.copy()
+            stats["size"] = len(self._entries)
+        return stats
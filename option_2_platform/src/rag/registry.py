@@ -0,0 +1,243 @@
+"""
+Process-wide registry for shared RAG components.
+
+Ingestion, querying and validation used to build their own embedding
+model, embedding cache and ChromaDB client on the same directories.
+The registry hands out one instance per configuration instead:
+- EmbeddingGenerator per model/backend/cache settings
+- VectorStore per (persist directory, collection, embedder)
+- LLM provider per (model, base URL)
+- BM25Index per vector store (persist directory, collection)
+- CrossEncoderReranker per re-ranking settings (shares the score cache)
+- QueryResultCache per vector store (persist directory, collection)
+- LLMAnswerCache per cache directory (one SQLite connection per file)
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .config import RAGConfig
+from .embeddings import EmbeddingGenerator
+from .llm_cache import LLMAnswerCache
+from .llm_provider import BaseLLMProvider, OllamaProvider
+from .models import Chunk
+from .query_cache import QueryResultCache
+from .reranker import CrossEncoderReranker
+from .sparse_index import BM25Index
+from .vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+class ComponentRegistry:
+    """Thread-safe cache of embedders, vector stores and LLM providers."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._embedders: Dict[Tuple, EmbeddingGenerator] = {}
+        self._vector_stores: Dict[Tuple, VectorStore] = {}
+        self._llm_providers: Dict[Tuple, BaseLLMProvider] = {}
+        self._sparse_indexes: Dict[Tuple, BM25Index] = {}
+        self._rerankers: Dict[Tuple, CrossEncoderReranker] = {}
+        self._query_caches: Dict[Tuple, QueryResultCache] = {}
+        self._llm_caches: Dict[Tuple, LLMAnswerCache] = {}
+
+    @staticmethod
+    def _embedder_key(config: RAGConfig) -> Tuple:
+        cache_dir = (
+            str(Path(config.embedding_cache_dir).resolve())
+            if config.embedding_cache_backend == "sqlite" else None
+        )
+        return (
+            config.embedding_model,
+            config.embedding_backend,
+            config.embedding_onnx_file,
+            config.embedding_cache_backend,
+            cache_dir,
+            config.embedding_cache_max_entries,
+            config.encode_batch_size,
+            config.num_threads,
+        )
+
+    def get_embedder(self, config: RAGConfig) -> EmbeddingGenerator:
+        """Return the shared EmbeddingGenerator for the config's embedding settings."""
+        key = self._embedder_key(config)
+        with self._lock:
+            if key not in self._embedders:
+                self._embedders[key] = EmbeddingGenerator.from_config(config)
+            return self._embedders[key]
+
+    def get_vector_store(self, config: RAGConfig, persist_directory: Optional[str] = None) -> VectorStore:
+        """
+        Return the shared VectorStore for the config's collection.
+
+        Args:
+            config: RAG configuration
+            persist_directory: Overrides config.persist_directory (e.g. vector_store_path)
+        """
+        directory = persist_directory or config.persist_directory
+        key = (
+            str(Path(directory).resolve()),
+            config.collection_name,
+            self._embedder_key(config),
+            str(Path(config.sparse_index_dir).resolve()) if config.sparse_index_dir else None,
+        )
+        with self._lock:
+            if key not in self._vector_stores:
+                self._vector_stores[key] = VectorStore(
+                    collection_name=config.collection_name,
+                    persist_directory=directory,
+                    embedding_function=self.get_embedder(config),
+                    sparse_index_dir=config.sparse_index_dir
+                )
+            return self._vector_stores[key]
+
+    def get_llm_provider(self, config: RAGConfig) -> BaseLLMProvider:
+        """Return the shared LLM provider for the config's model and endpoint."""
+        key = (config.llm_model, config.llm_base_url.rstrip("/"))
+        with self._lock:
+            if key not in self._llm_providers:
+                self._llm_providers[key] = OllamaProvider(
+                    model_name=config.llm_model,
+                    base_url=config.llm_base_url
+                )
+            return self._llm_providers[key]
+
+    def get_sparse_index(self, vector_store: VectorStore) -> BM25Index:
+        """
+        Return the shared BM25 index of a vector store's collection.
+
+        On first use the index is brought in line with the collection
+        (e.g. chunks ingested while retrieval_mode was "dense"), unless it
+        already reflects the collection's stored write version.
+        """
+        key = (str(Path(vector_store.sparse_index_dir).resolve()), vector_store.collection_name)
+        with self._lock:
+            if key not in self._sparse_indexes:
+                index = BM25Index(vector_store.sparse_index_dir, vector_store.collection_name)
+                sync_sparse_index(index, vector_store)
+                self._sparse_indexes[key] = index
+            return self._sparse_indexes[key]
+
+    def get_reranker(self, config: RAGConfig) -> CrossEncoderReranker:
+        """Return the shared cross-encoder re-ranker for the config's rerank settings."""
+        key = (
+            config.rerank_model,
+            config.rerank_batch_size,
+            config.rerank_max_length,
+            config.rerank_cache_max_entries,
+            config.rerank_time_budget_ms,
+        )
+        with self._lock:
+            if key not in self._rerankers:
+                self._rerankers[key] = CrossEncoderReranker.from_config(config)
+            return self._rerankers[key]
+
+    def get_query_cache(self, vector_store: VectorStore, config: RAGConfig) -> QueryResultCache:
+        """Return the shared retrieval result cache of a vector store's collection."""
+        key = (
+            str(Path(vector_store.persist_directory).resolve()),
+            vector_store.collection_name,
+            config.query_cache_max_entries,
+            config.query_cache_ttl_seconds,
+            config.query_cache_semantic_threshold,
+        )
+        with self._lock:
+            if key not in self._query_caches:
+                self._query_caches[key] = QueryResultCache(
+                    max_entries=config.query_cache_max_entries,
+                    ttl_seconds=config.query_cache_ttl_seconds,
+                    semantic_threshold=config.query_cache_semantic_threshold
+                )
+            return self._query_caches[key]
+
+    def get_llm_cache(self, config: RAGConfig) -> LLMAnswerCache:
+        """Return the shared LLM answer cache of the config's cache directory."""
+        key = (
+            str(Path(config.llm_cache_dir).resolve()),
+            config.llm_cache_max_entries,
+            config.llm_cache_ttl_seconds,
+            config.llm_cache_sampled,
+        )
+        with self._lock:
+            if key not in self._llm_caches:
+                self._llm_caches[key] = LLMAnswerCache(
+                    cache_dir=config.llm_cache_dir,
+                    max_entries=config.llm_cache_max_entries,
+                    ttl_seconds=config.llm_cache_ttl_seconds,
+                    cache_sampled=config.llm_cache_sampled
+                )
+            return self._llm_caches[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Number of shared instances per component type."""
+        with self._lock:
+            return {
+                "embedders": len(self._embedders),
+                "vector_stores": len(self._vector_stores),
+                "llm_providers": len(self._llm_providers),
+                "sparse_indexes": len(self._sparse_indexes),
+                "rerankers": len(self._rerankers),
+                "query_caches": len(self._query_caches),
+                "llm_caches": len(self._llm_caches),
+            }
+
+    def clear(self):
+        """Drop all shared instances (e.g. after a configuration change)."""
+        with self._lock:
+            self._embedders.clear()
+            self._vector_stores.clear()
+            self._llm_providers.clear()
+            for index in self._sparse_indexes.values():
+                index.close()
+            self._sparse_indexes.clear()
+            self._rerankers.clear()
+            self._query_caches.clear()
+            for cache in self._llm_caches.values():
+                cache.close()
+            self._llm_caches.clear()
+
+
+def sync_sparse_index(index: BM25Index, vector_store: VectorStore) -> Tuple[int, int]:
+    """
+    Add chunks missing from the BM25 index and drop ones no longer stored.
+
+    Skipped while the index is synced to the collection's current write
+    version. Otherwise only the stored IDs are compared; documents are
+    read for the missing chunks alone.
+
+    Returns:
+        (added, removed) chunk counts
+    """
+    # Read first: writes during the sync leave the index marked as behind
+    version = vector_store.stored_version()
+    if index.synced_version() == version:
+        return 0, 0
+    indexed = set(index.ids())
+    stored = set()
+    missing = []
+    for ids in vector_store.iter_ids():
+        stored.update(ids)
+        missing.extend(chunk_id for chunk_id in ids if chunk_id not in indexed)
+    for start in range(0, len(missing), VectorStore.MAX_BATCH_SIZE):
+        results = vector_store.get_chunks(missing[start: start + VectorStore.MAX_BATCH_SIZE])
+        index.add(
+            [result["id"] for result in results],
+            [Chunk(content=result["content"], metadata=result["metadata"]) for result in results]
+        )
+    removed = indexed - stored
+    index.delete(list(removed))
+    index.mark_synced(version)
+    if missing or removed:
+        logger.info(f"Synced BM25 index with collection {vector_store.collection_name}: "
+                    f"{len(missing)} added, {len(removed)} removed")
+    return len(missing), len(removed)
+
+
+_registry = ComponentRegistry()
+
+
+def get_component_registry() -> ComponentRegistry:
+    """Return the process-wide component registry."""
+    return _registry
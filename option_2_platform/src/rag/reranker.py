@@ -0,0 +1,179 @@
+"""
+Cross-encoder re-ranking of retrieval candidates.
+
+RetrievalEngine over-fetches rerank_candidates chunks; the cross-encoder
+reads query and chunk together and scores their relevance (0-1). The best
+top_k chunks scoring at least rerank_score_threshold are passed on, so the
+LLM gets fewer but better chunks. Scores are cached per (query, chunk id);
+chunk IDs are content hashes, so a changed chunk is scored anew.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from sentence_transformers import CrossEncoder
+
+from .exceptions import RetrievalError
+
+if TYPE_CHECKING:
+    from .config import RAGConfig
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Re-rank retrieval results with a small CPU cross-encoder.
+
+    Candidates are scored in batches. When the next batch would not finish
+    within the time budget, scoring stops and the retrieval order is kept
+    (pairs scored so far stay cached for the next query).
+    """
+
+    _model_cache: Dict[str, Any] = {}
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1",
+        batch_size: int = 16,
+        max_length: int = 256,
+        cache_max_entries: int = 10_000,
+        time_budget_ms: int = 0
+    ):
+        """
+        Initialize with specific model.
+
+        Args:
+            model_name: Name of the sentence-transformers cross-encoder.
+            batch_size: (query, chunk) pairs per forward pass.
+            max_length: Token limit per pair (longer chunks are truncated).
+            cache_max_entries: Size bound of the score cache (LRU).
+            time_budget_ms: Scoring time per query, 0 = unlimited.
+        """
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.cache_max_entries = cache_max_entries
+        self.time_budget = time_budget_ms / 1000.0
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"reranks": 0, "pairs_scored": 0, "cache_hits": 0, "budget_fallbacks": 0}
+
+        try:
+            if model_name not in self._model_cache:
+                logger.info(f"Loading re-ranking model: {model_name}")
+                self._model_cache[model_name] = CrossEncoder(model_name, device="cpu", max_length=max_length)
+                logger.info("Model loaded successfully")
+            self.model = self._model_cache[model_name]
+        except Exception as e:
+            logger.error(f"Failed to load re-ranking model {model_name}: {e}")
+            raise RetrievalError(f"Failed to load re-ranking model: {e}")
+
+    @classmethod
+    def from_config(cls, config: "RAGConfig") -> "CrossEncoderReranker":
+        """
+        Create re-ranker with the rerank_* settings from RAGConfig.
+        """
+        return cls(
+            model_name=config.rerank_model,
+            batch_size=config.rerank_batch_size,
+            max_length=config.rerank_max_length,
+            cache_max_entries=config.rerank_cache_max_entries,
+            time_budget_ms=config.rerank_time_budget_ms
+        )
+
+    @staticmethod
+    def _cache_key(query: str, result: Dict[str, Any]) -> Tuple[str, str]:
+        chunk_id = result.get("id") or hashlib.md5(result.get("content", "").encode()).hexdigest()
+        return query, chunk_id
+
+    def rerank(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        top_k: int,
+        threshold: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Order results by cross-encoder score.
+
+        Args:
+            query: User query text
+            results: Retrieval candidates (best first)
+            top_k: Number of results to keep
+            threshold: Minimum cross-encoder score, None keeps all
+
+        Returns:
+            Up to top_k results with "rerank_score" and "score" set to the
+            cross-encoder score ("retrieval_score" keeps the previous score).
+            Over the time budget: the first top_k results, unchanged.
+        """
+        self._stats["reranks"] += 1
+        keys = [self._cache_key(query, result) for result in results]
+        scores = self._cached(keys)
+        pending = list(dict.fromkeys(
+            (key, result["content"]) for key, result in zip(keys, results) if key not in scores
+        ))
+
+        start = time.perf_counter()
+        batch_time = 0.0
+        for i in range(0, len(pending), self.batch_size):
+            elapsed = time.perf_counter() - start
+            if self.time_budget and elapsed + batch_time > self.time_budget:
+                self._stats["budget_fallbacks"] += 1
+                logger.warning(
+                    f"Re-ranking over time budget ({elapsed * 1000:.0f}ms, "
+                    f"{len(pending) - i} pairs left), keeping retrieval order"
+                )
+                return results[:top_k]
+            batch = pending[i:i + self.batch_size]
+            batch_start = time.perf_counter()
+            batch_scores = self.model.predict(
+                [(query, content) for _, content in batch],
+                batch_size=len(batch),
+                show_progress_bar=False,
+                convert_to_numpy=True
+            )
+            batch_time = time.perf_counter() - batch_start
+            scored = {key: float(score) for (key, _), score in zip(batch, batch_scores)}
+            self._store(scored)
+            scores.update(scored)
+            self._stats["pairs_scored"] += len(batch)
+
+        for key, result in zip(keys, results):
+            result["retrieval_score"] = result.get("score")
+            result["score"] = result["rerank_score"] = scores[key]
+        # Stable sort: equal scores keep the retrieval order
+        ranked = sorted(results, key=lambda result: -result["rerank_score"])
+        if threshold is not None:
+            ranked = [result for result in ranked if result["rerank_score"] >= threshold]
+        return ranked[:top_k]
+
+    def _cached(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], float]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    found[key] = self._cache[key]
+        self._stats["cache_hits"] += len(found)
+        return found
+
+    def _store(self, scores: Dict[Tuple[str, str], float]):
+        with self._lock:
+            self._cache.update(scores)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        """Clear the score cache."""
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return re-ranking statistics (reranks, pairs_scored, cache_hits, budget_fallbacks, cache_size)."""
+        stats = self._stats.copy()
+        stats["cache_size"] = len(self._cache)
+        return stats
@@ -1,13 +1,34 @@
 """
 Retrieval Engine for RAG system.
 Handles query processing and context assembly for LLM.
+
+retrieval_mode selects dense search (Chroma), sparse search (BM25 side
+index) or hybrid search, which orders by reciprocal-rank fusion of both
+rankings: fused_score(chunk) = sum over rankings of 1 / (rrf_k + rank).
+"score" stays the cosine similarity in dense and hybrid mode.
+similarity_threshold drops dense and hybrid results below that cosine
+similarity (BM25 scores in sparse mode are not comparable, so it is not
+applied there). With rerank_enabled, rerank_candidates chunks are fetched
+and a cross-encoder picks the top_k above rerank_score_threshold. With
+query_cache_enabled, retrieve answers repeated (or, above a cosine
+threshold, near-identical) queries from a result cache that writes to the
+collection or project invalidate.
 """
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 import logging
 
+import numpy as np
+
 from .vector_store import VectorStore
 from .embeddings import EmbeddingGenerator
 from .config import RAGConfig
+from .exceptions import RetrievalError
+from .registry import get_component_registry
+from .sparse_index import BM25Index
+from .reranker import CrossEncoderReranker
+from .query_cache import QueryResultCache, filter_key, pinned_project
+
+RETRIEVAL_MODES = ("dense", "sparse", "hybrid")
 
 logger = logging.getLogger(__name__)
 
@@ -18,18 +39,53 @@ class RetrievalEngine:
     Handles:
     - Query processing
     - Semantic search
-    - Result ranking
+    - BM25 keyword search and hybrid rank fusion
+    - Result ranking (optional cross-encoder re-ranking)
     - Context formatting for LLM
     """
     
     def __init__(
         self,
         vector_store: VectorStore,
-        config: Optional[RAGConfig] = None
+        config: Optional[RAGConfig] = None,
+        sparse_index: Optional[BM25Index] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+        query_cache: Optional[QueryResultCache] = None
     ):
-        """Initialize retrieval engine."""
+        """
+        Initialize retrieval engine.
+        
+        Args:
+            vector_store: Dense search backend
+            config: RAG configuration (retrieval_mode, rrf_k, ...)
+            sparse_index: BM25 index; defaults to the shared index of the
+                vector store's collection unless retrieval_mode is "dense"
+            reranker: Cross-encoder; defaults to the shared re-ranker if
+                rerank_enabled
+            query_cache: Result cache; defaults to the shared cache of the
+                collection if query_cache_enabled
+        """
         self.vector_store = vector_store
         self.config = config or RAGConfig.from_yaml()
+        if self.config.retrieval_mode not in RETRIEVAL_MODES:
+            raise RetrievalError(
+                f"Unknown retrieval_mode '{self.config.retrieval_mode}' (expected one of {RETRIEVAL_MODES})"
+            )
+        if sparse_index is None and self.config.retrieval_mode != "dense":
+            sparse_index = get_component_registry().get_sparse_index(vector_store)
+        self.sparse_index = sparse_index
+        if reranker is None and self.config.rerank_enabled:
+            reranker = get_component_registry().get_reranker(self.config)
+        self.reranker = reranker
+        if query_cache is None and self.config.query_cache_enabled:
+            query_cache = get_component_registry().get_query_cache(vector_store, self.config)
+        self.query_cache = query_cache
+        if self.config.similarity_threshold > 0 and self.config.retrieval_mode == "sparse":
+            logger.warning(
+                f"similarity_threshold {self.config.similarity_threshold} is a cosine similarity "
+                "and is not applied in sparse (BM25) mode"
+            )
+        self._stats = {"retrievals": 0, "dense_searches": 0, "sparse_searches": 0, "dense_fallbacks": 0}
     
     def retrieve(
         self,
@@ -49,16 +105,296 @@ class RetrievalEngine:
             List of relevant chunks with metadata and scores
         """
         top_k = top_k or self.config.top_k
+        self._stats["retrievals"] += 1
+        if self.query_cache is None:
+            return self._retrieve(query, top_k, metadata_filter)
+        
+        scope = self._cache_scope(top_k, metadata_filter)
+        embedding = None
+        
+        def embed():
+            # The dense search reuses it through the embedding cache
+            nonlocal embedding
+            if embedding is None:
+                embedding = self.vector_store.embedding_function.embed_array(query)
+            return embedding
+        
+        semantic = self.query_cache.semantic and self.vector_store.embedding_function is not None
+        results = self.query_cache.get(scope, query, embed if semantic else None)
+        if results is None:
+            results = self._retrieve(query, top_k, metadata_filter)
+            self.query_cache.put(scope, query, results, embed() if semantic else None)
+        return results
+    
+    def _retrieve(
+        self,
+        query: str,
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        if self.reranker is None:
+            return self._search(query, top_k, metadata_filter)
+        
+        # Over-fetch, the cross-encoder decides which top_k chunks are passed on
+        candidates = self._search(query, max(top_k, self.config.rerank_candidates), metadata_filter)
+        return self.reranker.rerank(query, candidates, top_k, threshold=self.config.rerank_score_threshold)
+    
+    def _cache_scope(self, top_k: int, metadata_filter: Optional[Dict[str, Any]]) -> Tuple:
+        """Everything besides the query text that cached results depend on."""
+        config = self.config
+        return (
+            # Writes to the filtered project (or, unfiltered, the collection) change the version
+            self.vector_store.version(pinned_project(metadata_filter)),
+            filter_key(metadata_filter),
+            top_k,
+            config.retrieval_mode,
+            config.retrieval_candidates,
+            config.rrf_k,
+            config.similarity_threshold,
+            (config.rerank_model, config.rerank_candidates, config.rerank_score_threshold)
+            if self.reranker is not None else None,
+        )
+    
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        query_embeddings: Optional[np.ndarray] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant chunks for several queries (e.g. a criteria catalog).
+        
+        All queries are embedded in one batch and searched with one ChromaDB
+        query; in hybrid/sparse mode the chunks found only by BM25 are read
+        in one call as well. Results match calling retrieve per query.
+        
+        Args:
+            queries: Query texts
+            top_k: Number of results per query (default from config)
+            metadata_filter: Optional metadata filters (shared by all queries)
+            query_embeddings: Precomputed query vectors (one row per query,
+                same embedding model), skips query encoding
+            
+        Returns:
+            One result list per query, in query order
+        """
+        if not queries:
+            return []
+        top_k = top_k or self.config.top_k
+        self._stats["retrievals"] += len(queries)
+        if self.reranker is None:
+            return self._search_many(queries, top_k, metadata_filter, query_embeddings)
+        
+        candidates = self._search_many(
+            queries, max(top_k, self.config.rerank_candidates), metadata_filter, query_embeddings
+        )
+        return [
+            self.reranker.rerank(query, results, top_k, threshold=self.config.rerank_score_threshold)
+            for query, results in zip(queries, candidates)
+        ]
+    
+    def _mode(self, metadata_filter: Optional[Dict[str, Any]]) -> str:
+        """Retrieval mode for a query with this filter."""
+        mode = self.config.retrieval_mode
+        if mode != "dense" and not BM25Index.supports_filter(metadata_filter):
+            # The BM25 index only holds a few metadata fields for filtering
+            logger.warning(f"Filter {metadata_filter} not supported by the BM25 index, using dense search")
+            self._stats["dense_fallbacks"] += 1
+            mode = "dense"
+        return mode
+    
+    def _search(
+        self,
+        query: str,
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        mode = self._mode(metadata_filter)
+        if mode == "dense":
+            return self._above_threshold(self._dense_search(query, top_k, metadata_filter))
         
-        # Query vector store
-        results = self.vector_store.query(
+        # Fuse deeper rankings than top_k, so chunks ranked moderately by both can win
+        candidates = max(top_k, self.config.retrieval_candidates)
+        sparse = self._sparse_search(query, top_k if mode == "sparse" else candidates, metadata_filter)
+        if mode == "sparse":
+            return self._sparse_results(sparse, self._get_chunks(chunk_id for chunk_id, _ in sparse))
+        
+        # Embedded once: dense search and similarity of BM25-only chunks
+        query_embedding = self.vector_store.embedding_function.embed_array(query)
+        dense = self._dense_search_many([query], candidates, metadata_filter, query_embedding.reshape(1, -1))[0]
+        return self._above_threshold(self._fuse(dense, sparse, top_k, query_embedding))
+    
+    def _search_many(
+        self,
+        queries: List[str],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]],
+        query_embeddings: Optional[np.ndarray] = None
+    ) -> List[List[Dict[str, Any]]]:
+        mode = self._mode(metadata_filter)
+        if mode == "dense":
+            return [
+                self._above_threshold(results)
+                for results in self._dense_search_many(queries, top_k, metadata_filter, query_embeddings)
+            ]
+        
+        candidates = max(top_k, self.config.retrieval_candidates)
+        sparse = [
+            self._sparse_search(query, top_k if mode == "sparse" else candidates, metadata_filter)
+            for query in queries
+        ]
+        if mode == "sparse":
+            chunks = self._get_chunks(chunk_id for ranking in sparse for chunk_id, _ in ranking)
+            return [self._sparse_results(ranking, chunks) for ranking in sparse]
+        
+        if query_embeddings is None:
+            query_embeddings = self.vector_store.embedding_function.embed_batch_array(queries)
+        dense = self._dense_search_many(queries, candidates, metadata_filter, query_embeddings)
+        # One read for every BM25-only candidate of all queries
+        chunks = self._get_chunks(
+            (
+                chunk_id
+                for dense_results, ranking in zip(dense, sparse)
+                for chunk_id in {chunk_id for chunk_id, _ in ranking} - {result["id"] for result in dense_results}
+            ),
+            include_embeddings=True
+        )
+        return [
+            self._above_threshold(self._fuse(dense_results, ranking, top_k, query_embedding, chunks))
+            for dense_results, ranking, query_embedding in zip(dense, sparse, query_embeddings)
+        ]
+    
+    def _above_threshold(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Dense/hybrid results whose cosine similarity ("score") reaches similarity_threshold."""
+        threshold = self.config.similarity_threshold
+        if threshold <= 0:
+            return results
+        return [result for result in results if result["score"] >= threshold]
+    
+    def _dense_search(self, query: str, top_k: int, metadata_filter: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self._stats["dense_searches"] += 1
+        return self.vector_store.query(
             query_text=query,
             top_k=top_k,
             metadata_filter=metadata_filter
         )
+    
+    def _dense_search_many(
+        self,
+        queries: List[str],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]],
+        query_embeddings: Optional[np.ndarray] = None
+    ) -> List[List[Dict[str, Any]]]:
+        self._stats["dense_searches"] += 1
+        if query_embeddings is not None:
+            if len(query_embeddings) != len(queries):
+                raise RetrievalError(f"{len(query_embeddings)} query embeddings for {len(queries)} queries")
+            return self.vector_store.query_by_embeddings(
+                embeddings=query_embeddings,
+                top_k=top_k,
+                metadata_filter=metadata_filter
+            )
+        return self.vector_store.query_many(
+            query_texts=queries,
+            top_k=top_k,
+            metadata_filter=metadata_filter
+        )
+    
+    def _sparse_search(
+        self,
+        query: str,
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]]
+    ) -> List[Tuple[str, float]]:
+        self._stats["sparse_searches"] += 1
+        return self.sparse_index.search(query, top_k=top_k, metadata_filter=metadata_filter)
+    
+    def _get_chunks(self, ids: Iterable[str], include_embeddings: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Stored chunks by id (ids no longer in Chroma are missing)."""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        return {
+            result["id"]: result
+            for result in self.vector_store.get_chunks(ids, include_embeddings=include_embeddings)
+        }
+    
+    @staticmethod
+    def _sparse_results(sparse: List[Tuple[str, float]], chunks: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = []
+        for chunk_id, score in sparse:
+            if chunk_id in chunks:
+                # Copies: several queries may share a chunk
+                result = dict(chunks[chunk_id])
+                result["score"] = result["sparse_score"] = score
+                results.append(result)
+        return results
+    
+    def _fuse(
+        self,
+        dense: List[Dict[str, Any]],
+        sparse: List[Tuple[str, float]],
+        top_k: int,
+        query_embedding: np.ndarray,
+        chunks: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Reciprocal-rank fusion of the dense results and BM25 (id, score) pairs.
+        
+        Results are ordered by the fused score ("fused_score"). "score" (and
+        "dense_score") stays the cosine similarity to the query, computed
+        from the stored vector for chunks found only by BM25; "sparse_score"
+        is the BM25 score. Chunks found only by BM25 are taken from chunks
+        (read with embeddings), or read from Chroma if not given (stale index
+        entries drop out).
+        """
+        fused: Dict[str, float] = {}
+        for rank, result in enumerate(dense, 1):
+            fused[result["id"]] = fused.get(result["id"], 0.0) + 1.0 / (self.config.rrf_k + rank)
+        for rank, (chunk_id, _) in enumerate(sparse, 1):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (self.config.rrf_k + rank)
+        # Ties (e.g. dense rank 1 vs. sparse rank 1) keep the dense order
+        ranked = sorted(fused, key=lambda chunk_id: -fused[chunk_id])[:top_k]
         
+        by_id = {result["id"]: result for result in dense}
+        if chunks is None:
+            chunks = self._get_chunks(
+                (chunk_id for chunk_id in ranked if chunk_id not in by_id), include_embeddings=True
+            )
+        sparse_scores = dict(sparse)
+        
+        results = []
+        for chunk_id in ranked:
+            if chunk_id in by_id:
+                result = by_id[chunk_id]
+            elif chunk_id in chunks:
+                # Copy: several queries may share a chunk
+                result = dict(chunks[chunk_id])
+                result["score"] = self._cosine(query_embedding, result.pop("embedding"))
+            else:
+                continue
+            result["dense_score"] = result["score"]
+            result["sparse_score"] = sparse_scores.get(chunk_id)
+            result["fused_score"] = fused[chunk_id]
+            results.append(result)
         return results
     
+    @staticmethod
+    def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+        norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+        return float(np.dot(a, b) / norm) if norm else 0.0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return retrieval statistics (searches run; re-ranker and query cache stats if enabled)."""
+        stats: Dict[str, Any] = self._stats.copy()
+        if self.reranker is not None:
+            stats["rerank"] = self.reranker.get_stats()
+        if self.query_cache is not None:
+            stats["query_cache"] = self.query_cache.get_stats()
+        return stats
+    
     def format_context(self, results: List[Dict[str, Any]]) -> str:
         """
         Format retrieval results into context string for LLM.
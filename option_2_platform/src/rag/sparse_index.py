@@ -0,0 +1,454 @@
+"""
+BM25 side index for hybrid retrieval.
+
+Dense embeddings rank exact identifiers of funding regulations poorly
+("§ 4 Abs. 2", program names like PROFI). This inverted index scores
+chunks with Okapi BM25 so RetrievalEngine can fuse both rankings.
+
+The index is a SQLite file in the vector store's sparse_index_dir (one row
+per chunk with its term frequencies). On open, the postings are loaded into memory
+as compact arrays; a query only touches the postings of its own terms.
+Per-term BM25 weights are cached until the index changes. The index also
+records which write version of the collection (VectorStore.stored_version)
+it reflects, so it is only re-synced with Chroma after writes it missed.
+"""
+import json
+import logging
+import math
+import re
+import sqlite3
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .exceptions import VectorStoreError
+from .models import Chunk
+
+logger = logging.getLogger(__name__)
+
+# "§" is a token of its own, so "§ 4 Abs. 2" matches as § / 4 / abs / 2
+_TOKEN_PATTERN = re.compile(r"§|\w+")
+_IDENTIFIER_PATTERN = re.compile(r"§|\d")
+
+GERMAN_STOPWORDS = frozenset("""
+    aber als am an auch auf aus bei bis da damit dann das dass dem den der des
+    die dies diese dieser dieses doch du durch ein eine einem einen einer eines
+    er es für hat hatte ich ihr im in ist ja kann mit nach nicht noch nur ob
+    oder sein sich sie sind so über um und uns von vor war was wenn werden wie
+    wir wird wurde zu zum zur
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-cased word tokens without German stop words.
+    
+    Word pairs next to a number or "§" are added as extra tokens
+    ("§_4", "4_abs", "abs_2"), so "§ 4 Abs. 2" outranks "§ 2 Abs. 4".
+    """
+    tokens = [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in GERMAN_STOPWORDS]
+    pairs = [
+        f"{first}_{second}" for first, second in zip(tokens, tokens[1:])
+        if _IDENTIFIER_PATTERN.search(first) or _IDENTIFIER_PATTERN.search(second)
+    ]
+    return tokens + pairs
+
+
+class _TermWeights(NamedTuple):
+    """BM25 weights of one term: sparse (slots, values) or a dense vector (slots None)."""
+    slots: Optional[np.ndarray]
+    values: np.ndarray
+
+
+class BM25Index:
+    """Persistent BM25 inverted index of one collection."""
+
+    FILENAME = "bm25_index.sqlite3"
+    # Metadata kept in memory for Chroma-style where filters
+    FILTER_FIELDS = ("project_id", "doc_id", "doc_name", "source", "doc_type", "page_number")
+    # Where-clause operators evaluated by the index itself
+    FILTER_OPERATORS = ("$eq", "$ne", "$in", "$nin")
+    # Terms in more than 1/DENSE_TERM_FRACTION of the slots get dense weight vectors
+    DENSE_TERM_FRACTION = 16
+    MAX_DENSE_TERMS = 64
+    # Slots sampled to bound the k-th best score before a full scan
+    SCAN_SAMPLE = 2048
+
+    def __init__(self, directory: str, collection_name: str, k1: float = 1.5, b: float = 0.75):
+        """
+        Open (or create) the index and load it into memory.
+
+        Args:
+            directory: Directory for the index file (VectorStore.sparse_index_dir).
+            collection_name: Collection the indexed chunks belong to.
+            k1: BM25 term-frequency saturation.
+            b: BM25 document-length normalization.
+        """
+        self.collection_name = collection_name
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        try:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            self.path = Path(directory) / self.FILENAME
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    collection TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    length INTEGER NOT NULL,
+                    terms TEXT NOT NULL,
+                    fields TEXT NOT NULL,
+                    PRIMARY KEY (collection, chunk_id)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state (collection TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            self._conn.commit()
+            self._load()
+            logger.info(f"Opened BM25 index at {self.path} ({len(self)} chunks)")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open BM25 index in {directory}: {e}")
+            raise VectorStoreError(f"Failed to open BM25 index: {e}")
+
+    def add(self, ids: Sequence[str], chunks: Sequence[Chunk]):
+        """Index chunks under the given IDs (existing IDs are replaced)."""
+        rows = []
+        for chunk_id, chunk in zip(ids, chunks):
+            tokens = tokenize(chunk.content)
+            fields = [chunk.metadata.get(name) for name in self.FILTER_FIELDS]
+            rows.append((self.collection_name, chunk_id, len(tokens), json.dumps(Counter(tokens)), json.dumps(fields)))
+        if not rows:
+            return
+        with self._lock:
+            self._write(
+                "INSERT OR REPLACE INTO chunks (collection, chunk_id, length, terms, fields) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            for _, chunk_id, length, terms, fields in rows:
+                self._insert(chunk_id, length, json.loads(terms), json.loads(fields))
+            self._changed()
+
+    def delete(self, ids: Sequence[str]):
+        """Remove chunks from the index."""
+        ids = list(ids)
+        if not ids:
+            return
+        with self._lock:
+            self._write(
+                "DELETE FROM chunks WHERE collection = ? AND chunk_id = ?",
+                [(self.collection_name, chunk_id) for chunk_id in ids]
+            )
+            for chunk_id in ids:
+                self._remove(chunk_id)
+            self._changed()
+
+    def clear(self):
+        """Remove all chunks of this collection."""
+        with self._lock:
+            self._write("DELETE FROM chunks WHERE collection = ?", [(self.collection_name,)])
+            self._reset()
+
+    def synced_version(self) -> Optional[int]:
+        """Collection write version the index was last synced to (None if never)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM sync_state WHERE collection = ?", (self.collection_name,)
+            ).fetchone()
+        return int(row[0]) if row else None
+
+    def mark_synced(self, version: int, expected: Optional[int] = None) -> bool:
+        """
+        Record that the index reflects the collection at a write version.
+
+        Args:
+            version: Write version of the collection
+            expected: Only update if the recorded version is this one
+                (after mirroring a single write); None = unconditionally
+
+        Returns:
+            Whether the version was recorded
+        """
+        with self._lock:
+            try:
+                if expected is None:
+                    cursor = self._conn.execute(
+                        "INSERT OR REPLACE INTO sync_state (collection, version) VALUES (?, ?)",
+                        (self.collection_name, version)
+                    )
+                else:
+                    cursor = self._conn.execute(
+                        "UPDATE sync_state SET version = ? WHERE collection = ? AND version = ?",
+                        (version, self.collection_name, expected)
+                    )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"BM25 index write failed: {e}")
+                raise VectorStoreError(f"BM25 index write failed: {e}")
+            return cursor.rowcount > 0
+
+    def ids(self) -> List[str]:
+        """IDs of all indexed chunks."""
+        with self._lock:
+            self._refresh()
+            return list(self._slots)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._slots)
+
+    @classmethod
+    def supports_filter(cls, metadata_filter: Optional[Dict[str, Any]]) -> bool:
+        """Whether search() can evaluate the where clause itself."""
+        if not metadata_filter:
+            return True
+        for key, condition in metadata_filter.items():
+            if key in ("$and", "$or"):
+                if not isinstance(condition, list) or not all(cls.supports_filter(c) for c in condition):
+                    return False
+            elif key not in cls.FILTER_FIELDS:
+                return False
+            elif isinstance(condition, dict):
+                if len(condition) != 1 or next(iter(condition)) not in cls.FILTER_OPERATORS:
+                    return False
+        return True
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        metadata_filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank chunks by BM25 score for the query.
+
+        Args:
+            query: Query text (tokenized like the chunks)
+            top_k: Number of results
+            metadata_filter: Chroma-style where clause on FILTER_FIELDS
+
+        Returns:
+            (chunk id, score) pairs, best first; chunks without a query term are omitted
+        """
+        if not self.supports_filter(metadata_filter):
+            raise VectorStoreError(f"Unsupported filter for BM25 search: {metadata_filter}")
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            self._refresh()
+            if not terms or not self._slots or top_k <= 0:
+                return []
+            scores = np.zeros(len(self._ids), dtype=np.float32)
+            rare_slots = []
+            frequent = False
+            for term in terms:
+                weights = self._term_weights(term)
+                if weights is None:
+                    continue
+                if weights.slots is None:
+                    np.add(scores, weights.values, out=scores)
+                    frequent = True
+                else:
+                    scores[weights.slots] += weights.values
+                    rare_slots.append(weights.slots)
+            if not rare_slots and not frequent:
+                return []
+            mask = self._filter_mask(metadata_filter) if metadata_filter else None
+            if not frequent:
+                # Only slots in the postings of the query terms have a score
+                hit = np.zeros(len(scores), dtype=bool)
+                for slots in rare_slots:
+                    hit[slots] = True
+                mask = hit if mask is None else hit & mask
+            top = self._top_scan(scores, np.flatnonzero(mask) if mask is not None else None, top_k)
+            candidates = top[scores[top] > 0]
+            # Best first, ties in slot (insertion) order
+            candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+            return [(self._ids[slot], float(scores[slot])) for slot in candidates]
+
+    @staticmethod
+    def _top(scores: np.ndarray, candidates: np.ndarray, top_k: int) -> np.ndarray:
+        """The top_k candidates by score (unordered)."""
+        if len(candidates) <= top_k:
+            return candidates
+        return candidates[np.argpartition(scores[candidates], -top_k)[-top_k:]]
+
+    def _top_scan(self, scores: np.ndarray, pool: Optional[np.ndarray], top_k: int) -> np.ndarray:
+        """
+        The top_k slots among pool (None: all slots).
+        
+        Any top_k slots give a lower bound for the k-th best score; taking
+        them from a strided sample makes the bound tight, so only the few
+        slots above it need a partial sort.
+        """
+        size = len(pool) if pool is not None else len(scores)
+        if size <= max(self.SCAN_SAMPLE, top_k):
+            return self._top(scores, pool if pool is not None else np.arange(size), top_k)
+        step = size // self.SCAN_SAMPLE
+        sample = pool[::step] if pool is not None else np.arange(0, size, step)
+        threshold = scores[self._top(scores, sample, top_k)].min()
+        if pool is None:
+            return self._top(scores, np.flatnonzero(scores >= threshold), top_k)
+        return self._top(scores, pool[scores[pool] >= threshold], top_k)
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    # In-memory index: chunks occupy slots; deleted slots stay as tombstones
+    # until the next compaction, so postings lists are append-only.
+
+    def _reset(self):
+        self._ids: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._lengths = array("i")
+        self._alive = bytearray()
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._field_codes = {name: array("i") for name in self.FILTER_FIELDS}
+        self._field_values: Dict[str, Dict[Any, int]] = {name: {} for name in self.FILTER_FIELDS}
+        self._total_length = 0
+        self._changed()
+
+    def _load(self):
+        """(Re)build the in-memory index from the database."""
+        self._reset()
+        rows = self._conn.execute(
+            "SELECT chunk_id, length, terms, fields FROM chunks WHERE collection = ?",
+            (self.collection_name,)
+        )
+        for chunk_id, length, terms, fields in rows:
+            self._insert(chunk_id, length, json.loads(terms), json.loads(fields))
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _refresh(self):
+        """Reload if another process (e.g. an ingestion script) changed the database."""
+        if self._conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+            logger.info("BM25 index changed on disk, reloading")
+            self._load()
+
+    def _write(self, sql: str, rows: List[Tuple]):
+        try:
+            self._conn.executemany(sql, rows)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"BM25 index write failed: {e}")
+            raise VectorStoreError(f"BM25 index write failed: {e}")
+
+    def _insert(self, chunk_id: str, length: int, terms: Dict[str, int], fields: List[Any]):
+        self._remove(chunk_id)
+        slot = len(self._ids)
+        self._ids.append(chunk_id)
+        self._slots[chunk_id] = slot
+        self._lengths.append(length)
+        self._alive.append(1)
+        self._total_length += length
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("i"), array("i"))
+            postings[0].append(slot)
+            postings[1].append(tf)
+        for name, value in zip(self.FILTER_FIELDS, fields):
+            codes = self._field_values[name]
+            self._field_codes[name].append(codes.setdefault(value, len(codes)))
+
+    def _remove(self, chunk_id: str):
+        slot = self._slots.pop(chunk_id, None)
+        if slot is not None:
+            self._ids[slot] = None
+            self._alive[slot] = 0
+            self._total_length -= self._lengths[slot]
+
+    def _changed(self):
+        """Drop cached weights/columns; compact once tombstones dominate."""
+        self._weights: Dict[str, Optional[_TermWeights]] = {}
+        self._dense_terms = 0
+        self._columns: Dict[str, np.ndarray] = {}
+        self._alive_mask: Optional[np.ndarray] = None
+        self._lengths_array: Optional[np.ndarray] = None
+        dead = len(self._ids) - len(self._slots)
+        if dead > 1000 and dead > len(self._slots):
+            self._load()
+
+    def _mask(self) -> np.ndarray:
+        if self._alive_mask is None:
+            self._alive_mask = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        return self._alive_mask
+
+    def _term_weights(self, term: str) -> Optional[_TermWeights]:
+        """
+        BM25 weights of a term, cached per term.
+        
+        Frequent terms get a dense vector over all slots: adding one vector
+        is much cheaper than a scatter-add into most of the score array.
+        """
+        if term in self._weights:
+            return self._weights[term]
+        weights = None
+        postings = self._postings.get(term)
+        if postings is not None:
+            slots = np.array(postings[0], dtype=np.int32)
+            tfs = np.array(postings[1], dtype=np.float32)
+            alive = self._mask()[slots]
+            slots, tfs = slots[alive], tfs[alive]
+            if len(slots):
+                count = len(self._slots)
+                idf = math.log(1.0 + (count - len(slots) + 0.5) / (len(slots) + 0.5))
+                avg_length = max(self._total_length / count, 1.0)
+                lengths = self._length_array()[slots]
+                norm = self.k1 * (1.0 - self.b + self.b * lengths / avg_length)
+                values = (idf * tfs * (self.k1 + 1.0) / (tfs + norm)).astype(np.float32)
+                weights = _TermWeights(slots, values)
+                if len(slots) * self.DENSE_TERM_FRACTION > len(self._ids):
+                    if self._dense_terms >= self.MAX_DENSE_TERMS:
+                        # Bound the memory of cached dense vectors
+                        self._weights = {}
+                        self._dense_terms = 0
+                    dense = np.zeros(len(self._ids), dtype=np.float32)
+                    dense[slots] = values
+                    weights = _TermWeights(None, dense)
+                    self._dense_terms += 1
+        self._weights[term] = weights
+        return weights
+
+    def _length_array(self) -> np.ndarray:
+        if self._lengths_array is None:
+            self._lengths_array = np.array(self._lengths, dtype=np.float32)
+        return self._lengths_array
+
+    def _column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            self._columns[name] = np.array(self._field_codes[name], dtype=np.int32)
+        return self._columns[name]
+
+    def _filter_mask(self, metadata_filter: Dict[str, Any]) -> np.ndarray:
+        """Boolean mask over slots for a where clause (see supports_filter)."""
+        mask = np.ones(len(self._ids), dtype=bool)
+        for key, condition in metadata_filter.items():
+            if key == "$and":
+                for sub in condition:
+                    mask &= self._filter_mask(sub)
+            elif key == "$or":
+                any_mask = np.zeros(len(self._ids), dtype=bool)
+                for sub in condition:
+                    any_mask |= self._filter_mask(sub)
+                mask &= any_mask
+            else:
+                operator, value = next(iter(condition.items())) if isinstance(condition, dict) else ("$eq", condition)
+                column = self._column(key)
+                codes = self._field_values[key]
+                if operator in ("$eq", "$ne"):
+                    matches = column == codes.get(value, -1)
+                else:
+                    matches = np.isin(column, [codes[v] for v in value if v in codes])
+                mask &= ~matches if operator in ("$ne", "$nin") else matches
+        return mask
@@ -0,0 +1,233 @@
+"""
+Staged executor for pipelined ingestion.
+
+Runs a source iterator and a chain of stage functions in separate threads,
+connected by bounded queues. While stage N works on item k, stage N-1 can
+already produce item k+1 (e.g. parse page N+1 while embedding page N and
+storing page N-1). Bounded queues keep memory flat when a stage is slower
+than its producer.
+"""
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class StageMetrics:
+    """Throughput and output-queue depth of one stage."""
+    name: str
+    items: int = 0
+    units: int = 0
+    busy_seconds: float = 0.0
+    max_queue_depth: int = 0
+    queue_depth_sum: int = 0
+    queue_depth_samples: int = 0
+
+    def record(self, units: int, seconds: float, depth: int):
+        self.items += 1
+        self.units += units
+        self.busy_seconds += seconds
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self.queue_depth_sum += depth
+        self.queue_depth_samples += 1
+
+    def merge(self, other: "StageMetrics"):
+        self.items += other.items
+        self.units += other.units
+        self.busy_seconds += other.busy_seconds
+        self.max_queue_depth = max(self.max_queue_depth, other.max_queue_depth)
+        self.queue_depth_sum += other.queue_depth_sum
+        self.queue_depth_samples += other.queue_depth_samples
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "units": self.units,
+            "busy_seconds": round(self.busy_seconds, 4),
+            "units_per_sec": round(self.units / self.busy_seconds, 2) if self.busy_seconds else 0.0,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_queue_depth": (
+                round(self.queue_depth_sum / self.queue_depth_samples, 2)
+                if self.queue_depth_samples else 0.0
+            ),
+        }
+
+
+class StagedExecutor:
+    """
+    Run source → stage 1 → ... → stage N with one thread per stage.
+
+    Results of the last stage are yielded to the caller in input order.
+    The first exception raised in any stage stops all stages and is
+    re-raised in the caller. However the run ends, the source iterator is
+    closed (so generators release files and worker pools) and items still
+    queued between stages are dropped. run() only returns or raises once
+    every stage thread has finished, so no stage writes after that.
+    """
+
+    def __init__(
+        self,
+        source_name: str,
+        stages: List[Tuple[str, Callable[[Any], Any]]],
+        queue_size: int = 2,
+        unit_count: Optional[Callable[[Any], int]] = None
+    ):
+        """
+        Args:
+            source_name: Name of the source stage in the metrics (e.g. "parse").
+            stages: (name, function) pairs; each function maps one item to one item.
+            queue_size: Capacity of each queue between stages.
+            unit_count: Counts units per item for throughput (default: 1 per item).
+        """
+        self.stage_names = [source_name] + [name for name, _ in stages]
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.unit_count = unit_count or (lambda item: 1)
+        self.metrics: Dict[str, StageMetrics] = {
+            name: StageMetrics(name) for name in self.stage_names
+        }
+
+    def run(self, source: Iterable[Any]) -> Iterator[Any]:
+        """Process all items of source and yield the outputs of the last stage."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stage_names]
+        # Set when a stage fails or the consumer stops early
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        threads = [threading.Thread(
+            target=self._run_source,
+            args=(iter(source), queues[0], stop, errors),
+            name=f"stage-{self.stage_names[0]}",
+            daemon=True
+        )]
+        for index, (name, func) in enumerate(self.stages):
+            threads.append(threading.Thread(
+                target=self._run_stage,
+                args=(name, func, queues[index], queues[index + 1], stop, errors),
+                name=f"stage-{name}",
+                daemon=True
+            ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                if errors:
+                    raise errors[0]
+                try:
+                    item = queues[-1].get(timeout=0.1)
+                except queue.Empty:
+                    if stop.is_set():
+                        break
+                    continue
+                if item is _DONE:
+                    break
+                yield item
+            if errors:
+                raise errors[0]
+        finally:
+            stop.set()
+            # No timeout: a stage may be inside a store call, and the caller must
+            # not return while it still writes. Stages poll stop between items.
+            for thread in threads:
+                thread.join()
+            for q in queues:
+                self._drain(q)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self.metrics[name].to_dict() for name in self.stage_names}
+
+    def _run_source(
+        self,
+        iterator: Iterator[Any],
+        out_queue: queue.Queue,
+        stop: threading.Event,
+        errors: List[BaseException]
+    ):
+        metrics = self.metrics[self.stage_names[0]]
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                elapsed = time.perf_counter() - start
+                if not self._put(out_queue, item, stop):
+                    return
+                metrics.record(self.unit_count(item), elapsed, out_queue.qsize())
+            self._put(out_queue, _DONE, stop)
+        except BaseException as e:
+            self._fail(metrics.name, e, stop, errors)
+        finally:
+            # Closed here: a generator can't be closed from another thread while it runs
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except BaseException as e:
+                    self._fail(metrics.name, e, stop, errors)
+
+    def _run_stage(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        in_queue: queue.Queue,
+        out_queue: queue.Queue,
+        stop: threading.Event,
+        errors: List[BaseException]
+    ):
+        metrics = self.metrics[name]
+        while not stop.is_set():
+            try:
+                item = in_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                self._put(out_queue, item, stop)
+                return
+            if stop.is_set():
+                return
+            try:
+                start = time.perf_counter()
+                result = func(item)
+                elapsed = time.perf_counter() - start
+            except BaseException as e:
+                self._fail(name, e, stop, errors)
+                return
+            if not self._put(out_queue, result, stop):
+                return
+            metrics.record(self.unit_count(result), elapsed, out_queue.qsize())
+
+    @staticmethod
+    def _fail(name: str, error: BaseException, stop: threading.Event, errors: List[BaseException]):
+        logger.error(f"Stage '{name}' failed: {error}")
+        errors.append(error)
+        stop.set()
+
+    @staticmethod
+    def _drain(q: queue.Queue):
+        """Drop queued items so their payloads (e.g. embeddings) can be freed."""
+        while True:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                return
+
+    @staticmethod
+    def _put(q: queue.Queue, item: Any, cancel: threading.Event) -> bool:
+        """Blocking put that gives up once cancel is set."""
+        while True:
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if cancel.is_set():
+                    return False
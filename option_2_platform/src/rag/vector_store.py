@@ -1,13 +1,31 @@
 """
 Vector Store implementation using ChromaDB.
 Handles storage and retrieval of embeddings for RAG system.
+
+Chunk IDs are deterministic and content-addressed (source, location and a
+hash of the chunk text), and chunks are upserted: re-ingesting a document
+replaces its chunks in place instead of duplicating them. Chunks whose text
+changed get new IDs; IngestionPipeline deletes the old ones after storing
+the new version of a file.
+
+Every write bumps an in-process version of the collection and of the
+projects it touched; caches key on these versions (see query_cache).
+Writes also advance a persistent write counter of the collection, shared
+by processes: once per write_batch (an ingestion run), or per write outside
+one. The counter is a SQLite file in sparse_index_dir, next to the BM25
+index, not in Chroma's directory; side indexes record the counter they
+reflect and skip re-syncing while it is unchanged.
 """
-from typing import List, Dict, Optional, Any
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Dict, Optional, Any, Set, Tuple, Union
+import numpy as np
 import chromadb
 from chromadb.config import Settings
 from pathlib import Path
+import hashlib
 import logging
-import uuid
+import sqlite3
+import threading
 
 from .models import Chunk
 from .embeddings import EmbeddingGenerator
@@ -15,6 +33,49 @@ from .exceptions import RAGException
 
 logger = logging.getLogger(__name__)
 
+
+class _StoredVersion:
+    """Persistent write counter of one collection."""
+
+    FILENAME = "collection_versions.sqlite3"
+
+    def __init__(self, directory: str, collection_name: str):
+        self.collection_name = collection_name
+        self._lock = threading.Lock()
+        try:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(Path(directory) / self.FILENAME), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS versions (collection TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open collection versions in {directory}: {e}")
+            raise RAGException(f"Failed to open collection versions: {e}")
+
+    def get(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM versions WHERE collection = ?", (self.collection_name,)
+            ).fetchone()
+        return int(row[0]) if row else 0
+
+    def bump(self) -> int:
+        """Advance the counter; returns the new version."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO versions (collection, version) VALUES (?, 1) "
+                "ON CONFLICT(collection) DO UPDATE SET version = version + 1",
+                (self.collection_name,)
+            )
+            self._conn.commit()
+            row = self._conn.execute(
+                "SELECT version FROM versions WHERE collection = ?", (self.collection_name,)
+            ).fetchone()
+        return int(row[0])
+
+
 class VectorStore:
     """
     ChromaDB-based vector store for embeddings.
@@ -32,7 +93,8 @@ class VectorStore:
         self,
         collection_name: str = "ifb_documents",
         persist_directory: str = "data/chromadb",
-        embedding_function: Optional[EmbeddingGenerator] = None
+        embedding_function: Optional[EmbeddingGenerator] = None,
+        sparse_index_dir: Optional[str] = None
     ):
         """
         Initialize vector store.
@@ -41,11 +103,22 @@ class VectorStore:
             collection_name: Name of the ChromaDB collection
             persist_directory: Directory for persistent storage
             embedding_function: Optional custom embedding generator
+            sparse_index_dir: Directory for the BM25 index and the write
+                counter (default: "<persist_directory>_sparse")
         """
         self.collection_name = collection_name
         self.persist_directory = persist_directory
+        self.sparse_index_dir = sparse_index_dir or f"{Path(persist_directory)}_sparse"
         self.embedding_function = embedding_function
         
+        # Write versions (see version / mark_changed)
+        self._versions_lock = threading.Lock()
+        self._version = 0
+        self._epoch = 0
+        self._project_versions: Dict[str, int] = {}
+        self._open_batches = 0
+        self._stored_version = _StoredVersion(self.sparse_index_dir, collection_name)
+        
         self._init_client(persist_directory)
         self._get_or_create_collection(collection_name)
         
@@ -75,87 +148,199 @@ class VectorStore:
             logger.error(f"Failed to get/create collection {collection_name}: {e}")
             raise RAGException(f"Failed to get/create collection: {e}")
 
-    def add_chunks(self, chunks: List[Chunk]) -> List[str]:
+    def add_chunks(
+        self,
+        chunks: List[Chunk],
+        embeddings: Optional[np.ndarray] = None,
+        upsert: bool = True
+    ) -> List[str]:
         """
         Add chunks with embeddings to vector store.
         
         Args:
             chunks: List of Chunk objects (already have content and metadata)
+            embeddings: Optional precomputed embeddings (one row per chunk);
+                generated with the embedding function if omitted
+            upsert: Replace chunks with existing IDs in place; with False,
+                Chroma keeps the stored version
             
         Returns:
-            List of IDs for added chunks
+            List of IDs for added chunks (one per chunk, in input order)
         """
         if not chunks:
             return []
             
-        if not self.embedding_function:
+        if embeddings is None and not self.embedding_function:
             raise RAGException("Embedding function required to add chunks")
+        if embeddings is not None and len(embeddings) != len(chunks):
+            raise RAGException(f"Got {len(embeddings)} embeddings for {len(chunks)} chunks")
         if len(chunks) > self.MAX_BATCH_SIZE:
             ids: List[str] = []
             for start in range(0, len(chunks), self.MAX_BATCH_SIZE):
                 batch = chunks[start: start + self.MAX_BATCH_SIZE]
-                ids.extend(self._add_chunk_batch(batch))
-            return ids
+                batch_embeddings = None if embeddings is None else embeddings[start: start + self.MAX_BATCH_SIZE]
+                ids.extend(self._add_chunk_batch(batch, batch_embeddings, upsert))
+        else:
+            ids = self._add_chunk_batch(chunks, embeddings, upsert)
+        self._written(chunk.metadata.get("project_id") for chunk in chunks)
+        return ids
+
+    def version(self, project_id: Optional[str] = None) -> Tuple[int, ...]:
+        """
+        Write version of the collection, or of one project's chunks.
+        
+        Changes whenever a write may have changed what a query (filtered
+        to the project) returns. Counted per process: writes by other
+        processes are not seen.
+        """
+        with self._versions_lock:
+            if project_id is None:
+                return (self._version,)
+            return (self._epoch, self._project_versions.get(project_id, 0))
+
+    def mark_changed(self, project_ids: Optional[Iterable[Optional[str]]] = None):
+        """
+        Record a write to the collection.
+        
+        Args:
+            project_ids: Projects whose chunks were written; None if unknown
+                (invalidates every project)
+        """
+        with self._versions_lock:
+            self._version += 1
+            if project_ids is None:
+                self._epoch += 1
+                return
+            for project_id in set(project_ids):
+                if project_id is not None:
+                    self._project_versions[project_id] = self._project_versions.get(project_id, 0) + 1
+
+    def stored_version(self) -> int:
+        """Persistent write counter of the collection (counts writes of all processes)."""
+        return self._stored_version.get()
+
+    @contextmanager
+    def write_batch(self) -> Iterator[int]:
+        """
+        Group writes under a single advance of the persistent write counter.
+        
+        The counter is advanced once on entry, before any write, so a batch
+        that fails halfway still leaves side indexes marked as behind. Writes
+        while a batch is open do not advance it again; the batch's owner
+        mirrors them to side indexes (see IngestionPipeline).
+        
+        Yields:
+            The write version the batch's writes belong to
+        """
+        version = self._stored_version.bump()
+        with self._versions_lock:
+            self._open_batches += 1
+        try:
+            yield version
+        finally:
+            with self._versions_lock:
+                self._open_batches -= 1
+
+    def _written(self, project_ids: Optional[Iterable[Optional[str]]] = None):
+        """Record a write to Chroma: persistent counter (outside a batch) and in-process versions."""
+        with self._versions_lock:
+            in_batch = self._open_batches > 0
+        if not in_batch:
+            self._stored_version.bump()
+        self.mark_changed(project_ids)
+
+    @staticmethod
+    def make_chunk_id(chunk: Chunk) -> str:
+        """
+        Build the deterministic ID a chunk is stored under.
+        
+        Format: <source>[_p<page>][_s<sheet>][_r<row>]_<hash>, where hash is
+        derived from source, location and chunk text. The same chunk always
+        gets the same ID, so re-ingestion overwrites it; a chunk whose text
+        changed gets a new ID.
+        """
+        source = chunk.metadata.get("source", "unknown")
+        page_num = chunk.metadata.get("page_number", "")
+        row_num = chunk.metadata.get("row_number", "")
+        sheet_name = chunk.metadata.get("sheet_name", "")
+
+        path_obj = Path(source)
 
-        return self._add_chunk_batch(chunks)
+        prefix = ""
+        parts = path_obj.parts
+        if "projects" in parts:
+            try:
+                idx = parts.index("projects")
+                if idx + 1 < len(parts):
+                    prefix = parts[idx+1]
+            except ValueError:
+                pass
 
-    def _add_chunk_batch(self, chunks: List[Chunk]) -> List[str]:
+        if not prefix and path_obj.parent.name and path_obj.parent.name != ".":
+            prefix = path_obj.parent.name
+
+        safe_source = f"{prefix}_{path_obj.name}" if prefix else path_obj.name
+
+        id_parts = [safe_source]
+        if page_num:
+            id_parts.append(f"p{page_num}")
+        if sheet_name:
+            safe_sheet = "".join(c for c in sheet_name if c.isalnum() or c in "_-")
+            id_parts.append(f"s{safe_sheet}")
+        if row_num:
+            id_parts.append(f"r{row_num}")
+
+        digest = hashlib.sha256("\x1f".join(id_parts + [chunk.content]).encode("utf-8")).hexdigest()
+        id_parts.append(digest[:16])
+
+        return "_".join(id_parts)
+
+    @staticmethod
+    def _to_chroma_metadata(chunk: Chunk) -> Dict[str, Any]:
+        """Chroma only stores scalar metadata values."""
+        meta = chunk.metadata.copy()
+        for k, v in meta.items():
+            if isinstance(v, (list, dict)):
+                meta[k] = str(v)
+        return meta
+
+    def _add_chunk_batch(
+        self,
+        chunks: List[Chunk],
+        embeddings: Optional[np.ndarray] = None,
+        upsert: bool = True
+    ) -> List[str]:
         """Add a single chunk batch after splitting to respect Chroma limits."""
         try:
             documents = [chunk.content for chunk in chunks]
-            
-            metadatas = []
-            for chunk in chunks:
-                meta = chunk.metadata.copy()
-                for k, v in meta.items():
-                    if isinstance(v, (list, dict)):
-                        meta[k] = str(v)
-                metadatas.append(meta)
-
-            ids = []
-            for chunk in chunks:
-                source = chunk.metadata.get("source", "unknown")
-                chunk_id = chunk.metadata.get("chunk_id", uuid.uuid4().hex)
-                page_num = chunk.metadata.get("page_number", "")
-                row_num = chunk.metadata.get("row_number", "")
-                sheet_name = chunk.metadata.get("sheet_name", "")
-
-                path_obj = Path(source)
-
-                prefix = ""
-                parts = path_obj.parts
-                if "projects" in parts:
-                    try:
-                        idx = parts.index("projects")
-                        if idx + 1 < len(parts):
-                            prefix = parts[idx+1]
-                    except ValueError:
-                        pass
-
-                if not prefix and path_obj.parent.name and path_obj.parent.name != ".":
-                    prefix = path_obj.parent.name
-
-                safe_source = f"{prefix}_{path_obj.name}" if prefix else path_obj.name
-
-                id_parts = [safe_source]
-                if page_num:
-                    id_parts.append(f"p{page_num}")
-                if sheet_name:
-                    safe_sheet = "".join(c for c in sheet_name if c.isalnum() or c in "_-")
-                    id_parts.append(f"s{safe_sheet}")
-                if row_num:
-                    id_parts.append(f"r{row_num}")
-                id_parts.append(str(chunk_id))
-
-                ids.append("_".join(id_parts))
-
-            embeddings = self.embedding_function.embed_batch(documents)
-
-            self.collection.add(
+            metadatas = [self._to_chroma_metadata(chunk) for chunk in chunks]
+            ids = [self.make_chunk_id(chunk) for chunk in chunks]
+
+            # float32 matrix is handed to Chroma as-is (no Python list round-trip)
+            if embeddings is None:
+                embeddings = self.embedding_function.embed_batch_array(documents)
+            else:
+                embeddings = np.asarray(embeddings, dtype=np.float32)
+
+            # Identical text at the same location yields the same ID; Chroma
+            # rejects duplicate IDs within one call, so each ID is written once
+            write_ids = ids
+            first_index: Dict[str, int] = {}
+            for index, chunk_id in enumerate(ids):
+                first_index.setdefault(chunk_id, index)
+            if len(first_index) < len(ids):
+                keep = sorted(first_index.values())
+                write_ids = [ids[i] for i in keep]
+                documents = [documents[i] for i in keep]
+                metadatas = [metadatas[i] for i in keep]
+                embeddings = embeddings[keep]
+
+            write = self.collection.upsert if upsert else self.collection.add
+            write(
                 documents=documents,
                 embeddings=embeddings,
                 metadatas=metadatas,
-                ids=ids
+                ids=write_ids
             )
 
             logger.info(f"Added {len(chunks)} chunks to vector store")
@@ -190,7 +375,7 @@ class VectorStore:
             
         try:
             # Generate query embedding
-            query_embedding = self.embedding_function.embed(query_text)
+            query_embedding = self.embedding_function.embed_array(query_text)
             
             return self.query_by_embedding(
                 embedding=query_embedding,
@@ -201,49 +386,163 @@ class VectorStore:
             logger.error(f"Query failed: {e}")
             raise RAGException(f"Query failed: {e}")
 
+    def query_many(
+        self,
+        query_texts: List[str],
+        top_k: int = 5,
+        metadata_filter: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Query vector store for several queries at once.
+        
+        All queries are embedded in one batch and searched with a single
+        ChromaDB query (one round-trip instead of one per query).
+        
+        Args:
+            query_texts: Search queries
+            top_k: Number of results per query
+            metadata_filter: Optional metadata filters (applied to every query)
+            
+        Returns:
+            One result list per query, in query order (see query)
+        """
+        if not self.embedding_function:
+            raise RAGException("Embedding function required for query")
+        if not query_texts:
+            return []
+            
+        try:
+            embeddings = self.embedding_function.embed_batch_array(query_texts)
+            return self.query_by_embeddings(
+                embeddings=embeddings,
+                top_k=top_k,
+                metadata_filter=metadata_filter
+            )
+        except Exception as e:
+            logger.error(f"Query failed: {e}")
+            raise RAGException(f"Query failed: {e}")
+
     def query_by_embedding(
         self,
-        embedding: List[float],
+        embedding: Union[List[float], np.ndarray],
         top_k: int = 5,
         metadata_filter: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
-        """Query using pre-computed embedding."""
+        """Query using pre-computed embedding (list or float32 array)."""
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        results = self.query_by_embeddings(embedding, top_k=top_k, metadata_filter=metadata_filter)
+        return results[0] if results else []
+
+    def query_by_embeddings(
+        self,
+        embeddings: Union[List[List[float]], np.ndarray],
+        top_k: int = 5,
+        metadata_filter: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Query using pre-computed embeddings (one row per query), one result list per row."""
         try:
             results = self.collection.query(
-                query_embeddings=[embedding],
+                query_embeddings=np.asarray(embeddings, dtype=np.float32),
                 n_results=top_k,
                 where=metadata_filter
             )
             
-            # Format results
-            formatted_results = []
-            
             # ChromaDB returns lists of lists (one list per query)
-            if results["ids"] and len(results["ids"]) > 0:
-                ids = results["ids"][0]
-                distances = results["distances"][0] if results["distances"] else []
-                metadatas = results["metadatas"][0] if results["metadatas"] else []
-                documents = results["documents"][0] if results["documents"] else []
-                
-                for i in range(len(ids)):
-                    # Convert distance to similarity score (cosine distance -> similarity)
-                    # ChromaDB cosine distance is 1 - cosine_similarity
-                    # So similarity = 1 - distance
-                    score = 1.0 - distances[i] if i < len(distances) else 0.0
-                    
-                    formatted_results.append({
-                        "id": ids[i],
-                        "score": score,
-                        "content": documents[i] if i < len(documents) else "",
-                        "metadata": metadatas[i] if i < len(metadatas) else {}
-                    })
-            
-            return formatted_results
+            return [
+                self._format_results(results, row)
+                for row in range(len(results["ids"] or []))
+            ]
             
         except Exception as e:
             logger.error(f"Query by embedding failed: {e}")
             raise RAGException(f"Query by embedding failed: {e}")
 
+    @staticmethod
+    def _format_results(results: Dict[str, Any], row: int) -> List[Dict[str, Any]]:
+        """Results of one query of a ChromaDB query response."""
+        ids = results["ids"][row]
+        distances = results["distances"][row] if results["distances"] else []
+        metadatas = results["metadatas"][row] if results["metadatas"] else []
+        documents = results["documents"][row] if results["documents"] else []
+        
+        formatted_results = []
+        for i in range(len(ids)):
+            # Convert distance to similarity score (cosine distance -> similarity)
+            # ChromaDB cosine distance is 1 - cosine_similarity
+            # So similarity = 1 - distance
+            score = 1.0 - distances[i] if i < len(distances) else 0.0
+            
+            formatted_results.append({
+                "id": ids[i],
+                "score": score,
+                "content": documents[i] if i < len(documents) else "",
+                "metadata": metadatas[i] if i < len(metadatas) else {}
+            })
+        return formatted_results
+
+    def get_chunks(self, ids: List[str], include_embeddings: bool = False) -> List[Dict[str, Any]]:
+        """
+        Fetch stored chunks by ID (unknown IDs are skipped).
+        
+        Args:
+            ids: Chunk IDs
+            include_embeddings: Add the stored vector as "embedding" (float32 array)
+        
+        Returns:
+            Results in the format of query_by_embedding, without a score, in input order
+        """
+        if not ids:
+            return []
+        try:
+            include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+            results = self.collection.get(ids=list(dict.fromkeys(ids)), include=include)
+            found = {
+                chunk_id: {"id": chunk_id, "content": document or "", "metadata": metadata or {}}
+                for chunk_id, document, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+            }
+            if include_embeddings:
+                for chunk_id, embedding in zip(results["ids"], results["embeddings"]):
+                    found[chunk_id]["embedding"] = np.asarray(embedding, dtype=np.float32)
+            return [found[chunk_id] for chunk_id in ids if chunk_id in found]
+        except Exception as e:
+            logger.error(f"Failed to get chunks: {e}")
+            raise RAGException(f"Failed to get chunks: {e}")
+
+    def iter_ids(self, batch_size: int = MAX_BATCH_SIZE) -> Iterator[List[str]]:
+        """Yield the IDs of all stored chunks in batches (no documents or metadata read)."""
+        offset = 0
+        while True:
+            try:
+                ids = self.collection.get(include=[], limit=batch_size, offset=offset)["ids"]
+            except Exception as e:
+                logger.error(f"Failed to read chunk IDs: {e}")
+                raise RAGException(f"Failed to read chunk IDs: {e}")
+            if not ids:
+                return
+            yield ids
+            offset += len(ids)
+
+    def iter_chunks(self, batch_size: int = MAX_BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """Yield all stored chunks (id, content, metadata) in batches."""
+        offset = 0
+        while True:
+            try:
+                results = self.collection.get(
+                    include=["documents", "metadatas"],
+                    limit=batch_size,
+                    offset=offset
+                )
+            except Exception as e:
+                logger.error(f"Failed to read chunks: {e}")
+                raise RAGException(f"Failed to read chunks: {e}")
+            if not results["ids"]:
+                return
+            yield [
+                {"id": chunk_id, "content": document or "", "metadata": metadata or {}}
+                for chunk_id, document, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+            ]
+            offset += len(results["ids"])
+
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the collection."""
         try:
@@ -266,15 +565,91 @@ class VectorStore:
             # Recreating is safer
             self.client.delete_collection(self.collection_name)
             self._get_or_create_collection(self.collection_name)
+            self._written()
             logger.info(f"Cleared collection: {self.collection_name}")
         except Exception as e:
             logger.error(f"Failed to clear collection: {e}")
             raise RAGException(f"Failed to clear collection: {e}")
 
+    def update_metadata(self, chunks: List[Chunk]) -> List[str]:
+        """Overwrite the metadata of stored chunks without re-embedding them."""
+        if not chunks:
+            return []
+        try:
+            ids = [self.make_chunk_id(chunk) for chunk in chunks]
+            self.collection.update(
+                ids=ids,
+                metadatas=[self._to_chroma_metadata(chunk) for chunk in chunks]
+            )
+            self._written(chunk.metadata.get("project_id") for chunk in chunks)
+            return ids
+        except Exception as e:
+            logger.error(f"Failed to update chunk metadata: {e}")
+            raise RAGException(f"Failed to update chunk metadata: {e}")
+
+    def get_existing_ids(self, ids: List[str]) -> Set[str]:
+        """Return the subset of ids that are stored in the collection."""
+        if not ids:
+            return set()
+        try:
+            return set(self.collection.get(ids=ids, include=[])["ids"])
+        except Exception as e:
+            logger.error(f"Failed to look up chunk IDs: {e}")
+            raise RAGException(f"Failed to look up chunk IDs: {e}")
+
+    def delete_ids(self, ids: List[str], project_ids: Optional[Iterable[Optional[str]]] = None):
+        """
+        Delete chunks by ID.
+        
+        Args:
+            ids: Chunk IDs
+            project_ids: Projects of the deleted chunks, if known (otherwise
+                every project counts as changed)
+        """
+        if not ids:
+            return
+        try:
+            self.collection.delete(ids=ids)
+            self._written(project_ids)
+            logger.info(f"Deleted {len(ids)} chunks")
+        except Exception as e:
+            logger.error(f"Failed to delete chunks: {e}")
+            raise RAGException(f"Failed to delete chunks: {e}")
+
+    def ids_by_source(self, sources: Union[str, List[str]]) -> List[str]:
+        """IDs of all stored chunks of one or more source files."""
+        sources = [sources] if isinstance(sources, str) else list(sources)
+        if not sources:
+            return []
+        where = {"source": sources[0]} if len(sources) == 1 else {"source": {"$in": sources}}
+        try:
+            return self.collection.get(where=where, include=[])["ids"]
+        except Exception as e:
+            logger.error(f"Failed to look up chunks by source: {e}")
+            raise RAGException(f"Failed to look up chunks by source: {e}")
+
+    def delete_by_source(self, sources: Union[str, List[str]]) -> int:
+        """
+        Delete all chunks of one or more source files in a single call.
+        
+        Side indexes are not updated; IngestionPipeline.delete_source also
+        removes the chunks from the BM25 index and the manifest.
+        
+        Args:
+            sources: Source path(s) as stored in the chunk metadata ("source")
+            
+        Returns:
+            Number of deleted chunks
+        """
+        ids = self.ids_by_source(sources)
+        self.delete_ids(ids)
+        return len(ids)
+
     def delete_by_metadata(self, metadata_filter: Dict[str, Any]):
         """Delete documents matching metadata filter."""
         try:
             self.collection.delete(where=metadata_filter)
+            self._written()
             logger.info(f"Deleted documents matching: {metadata_filter}")
         except Exception as e:
             logger.error(f"Failed to delete by metadata: {e}")
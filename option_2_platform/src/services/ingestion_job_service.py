@@ -0,0 +1,161 @@
+"""
+Background ingestion jobs for the upload API.
+
+Uploads are queued and ingested by a bounded worker pool, so the request
+handler returns a job id immediately instead of parsing, embedding and
+writing to ChromaDB on the event loop. Jobs report progress after each
+stored micro-batch (pages parsed, chunks, chunks embedded and stored).
+"""
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.rag.exceptions import RAGException
+from src.rag.ingestion import IngestionPipeline
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(RAGException):
+    """Raised when the maximum number of pending ingestion jobs is reached."""
+    pass
+
+
+@dataclass
+class IngestionJob:
+    file_path: str
+    project_id: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued, running, completed, failed
+    stage: str = "queued"  # queued, parsing, stored, completed
+    pages_parsed: int = 0
+    chunks_total: int = 0  # all chunks of the file (incl. unchanged ones of incremental runs)
+    chunks_embedded: int = 0  # new or changed chunks embedded in this run
+    chunks_stored: int = 0  # chunks written with embeddings (unchanged ones are kept)
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class IngestionJobQueue:
+    """Runs IngestionPipeline.ingest_file for queued uploads in a worker pool."""
+
+    def __init__(
+        self,
+        pipeline_factory: Callable[[], IngestionPipeline],
+        max_workers: int = 2,
+        max_pending_jobs: int = 50,
+        max_finished_jobs: int = 500
+    ):
+        """
+        Args:
+            pipeline_factory: Returns the (shared) ingestion pipeline; resolved in the
+                worker, so submitting does not wait for model warm-up.
+            max_workers: Number of documents ingested concurrently.
+            max_pending_jobs: Bound on queued + running jobs (<= 0 disables the bound).
+            max_finished_jobs: Finished jobs kept for status queries.
+        """
+        self.pipeline_factory = pipeline_factory
+        self.max_workers = max(1, max_workers)
+        self.max_pending_jobs = max_pending_jobs
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="ingest-worker"
+        )
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, file_path: str, project_id: Optional[str] = None) -> IngestionJob:
+        """
+        Queue a file for ingestion.
+
+        Raises:
+            JobQueueFullError: If max_pending_jobs jobs are already queued or running.
+        """
+        with self._lock:
+            if self.max_pending_jobs > 0 and self._pending_count() >= self.max_pending_jobs:
+                raise JobQueueFullError(
+                    f"Ingestion queue is full ({self.max_pending_jobs} pending jobs)"
+                )
+            job = IngestionJob(file_path=file_path, project_id=project_id)
+            self._jobs[job.id] = job
+            self._prune_finished()
+
+        self._executor.submit(self._run, job)
+        logger.info(f"Queued ingestion job {job.id} for {file_path}")
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """Return a job by id (None if unknown or pruned)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[IngestionJob]:
+        """Return all known jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Number of jobs per status plus the worker limit."""
+        with self._lock:
+            stats = {"queued": 0, "running": 0, "completed": 0, "failed": 0}
+            for job in self._jobs.values():
+                stats[job.status] += 1
+        stats["max_workers"] = self.max_workers
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for running ones."""
+        self._executor.shutdown(wait=wait)
+
+    def _pending_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _prune_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: IngestionJob):
+        job.status = "running"
+        job.stage = "parsing"
+        job.started_at = datetime.now()
+
+        def on_progress(stage: str, counters: Dict[str, int]):
+            job.stage = stage
+            for key, value in counters.items():
+                setattr(job, key, value)
+
+        try:
+            pipeline = self.pipeline_factory()
+            result = pipeline.ingest_file(
+                job.file_path,
+                project_id=job.project_id,
+                progress_callback=on_progress
+            )
+            job.chunks_total = result.get("chunk_count", job.chunks_total)
+            # Incremental runs reuse unchanged chunks: only embedded ones are written
+            job.chunks_embedded = job.chunks_stored = result.get("chunks_embedded", job.chunks_embedded)
+            job.stage = "completed"
+            job.status = "completed"
+            logger.info(f"Ingestion job {job.id} completed: {job.chunks_total} chunks")
+        except Exception as e:
+            logger.error(f"Ingestion job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.now()
@@ -1,66 +1,140 @@
+import asyncio
 import fitz  # PyMuPDF
+import os
+import shutil
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import logging
 
+from src.rag.models import decode_bboxes
+
 logger = logging.getLogger(__name__)
 
+# PyMuPDF is not thread-safe, so all annotation work runs on one worker
+# thread; it keeps the event loop free while documents are annotated
+_annotation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-annotation")
+
 class PDFAnnotationService:
     """
     Service for creating annotated copies of PDFs with highlighted citations.
     Uses PyMuPDF (fitz) for high-performance PDF manipulation.
     """
-    
+
+    async def create_annotated_pdfs(self, jobs: List[Tuple[Path, Path, List[Dict[str, Any]]]]) -> List[bool]:
+        """
+        Annotate several documents without blocking the event loop.
+
+        Args:
+            jobs: (input_path, output_path, citations) per document
+
+        Returns:
+            List[bool]: Success per job, in job order
+        """
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(
+            loop.run_in_executor(_annotation_executor, self.create_annotated_pdf, *job)
+            for job in jobs
+        ))
+
     def create_annotated_pdf(self, input_path: Path, output_path: Path, citations: List[Dict[str, Any]]) -> bool:
         """
         Create a copy of the PDF with highlights for all citations.
-        
+
+        The original is copied byte for byte and the highlights are appended
+        with an incremental save, so large PDFs are not rewritten. Citations
+        are handled per page; repeated citations are highlighted once.
+
         Args:
             input_path: Path to original PDF
             output_path: Path where annotated PDF should be saved
-            citations: List of citation objects (must contain 'page' and 'quote' or 'text_segment')
-            
+            citations: List of citation objects (must contain 'page' and 'bboxes',
+                'quote' or 'text_segment')
+
         Returns:
             bool: True if successful
         """
         try:
-            doc = fitz.open(input_path)
-            
-            for citation in citations:
-                self._highlight_citation(doc, citation)
-                
-            doc.save(output_path)
-            doc.close()
+            shutil.copyfile(input_path, output_path)
+            doc = fitz.open(output_path)
+            try:
+                highlights = 0
+                for page_num, page_citations in self._group_by_page(citations, len(doc)).items():
+                    highlights += self._highlight_page(doc[page_num], page_citations)
+                if highlights:
+                    self._save(doc, Path(output_path))
+            finally:
+                doc.close()
             return True
-            
+
         except Exception as e:
             logger.error(f"Failed to annotate PDF {input_path}: {str(e)}")
             return False
 
-    def _highlight_citation(self, doc, citation: Dict[str, Any]):
-        """Apply highlight to a single citation."""
-        try:
+    @staticmethod
+    def _group_by_page(citations: List[Dict[str, Any]], page_count: int) -> Dict[int, List[Dict[str, Any]]]:
+        """Citations per 0-based page index (pages outside the document are dropped)."""
+        by_page = defaultdict(list)
+        for citation in citations:
             # Get page number (0-based in fitz, usually 1-based in data)
             page_num = citation.get('page', 1) - 1
-            if page_num < 0 or page_num >= len(doc):
-                return
-
-            page = doc[page_num]
-            text_to_find = citation.get('quote') or citation.get('text_segment')
-            
-            if not text_to_find:
-                return
-
-            # Search for text instances
-            # quad=True returns quadrilaterals which is better for multi-line text
-            text_instances = page.search_for(text_to_find, quads=True)
-            
-            # Add highlight annotation for each instance found
-            for quad in text_instances:
-                annot = page.add_highlight_annot(quad)
-                annot.set_colors(stroke=(1, 1, 0))  # Yellow
-                annot.set_opacity(0.5)
-                annot.update()
-                
-        except Exception as e:
-            logger.warning(f"Could not highlight citation on page {citation.get('page')}: {e}")
+            if 0 <= page_num < page_count:
+                by_page[page_num].append(citation)
+        return by_page
+
+    def _highlight_page(self, page, citations: List[Dict[str, Any]]) -> int:
+        """Highlight all citations of one page. Returns the number of annotations added."""
+        added = 0
+        seen_bboxes = set()
+        seen_snippets = set()
+        for citation in citations:
+            try:
+                # Line boxes recorded at ingestion: one annotation over the whole chunk
+                bboxes = citation.get('bboxes')
+                rects = [fitz.Rect(bbox) for bbox in decode_bboxes(bboxes)]
+                if rects:
+                    if bboxes not in seen_bboxes:
+                        seen_bboxes.add(bboxes)
+                        self._add_highlight(page, rects)
+                        added += 1
+                    continue
+
+                # Chunks ingested without boxes: fall back to a text search,
+                # once per distinct snippet on this page
+                text_to_find = citation.get('quote') or citation.get('text_segment')
+
+                if not text_to_find or text_to_find in seen_snippets:
+                    continue
+                seen_snippets.add(text_to_find)
+
+                # Search for text instances
+                # quad=True returns quadrilaterals which is better for multi-line text
+                text_instances = page.search_for(text_to_find, quads=True)
+
+                # Add highlight annotation for each instance found
+                for quad in text_instances:
+                    self._add_highlight(page, quad)
+                    added += 1
+
+            except Exception as e:
+                logger.warning(f"Could not highlight citation on page {citation.get('page')}: {e}")
+        return added
+
+    @staticmethod
+    def _add_highlight(page, area):
+        annot = page.add_highlight_annot(area)
+        annot.set_colors(stroke=(1, 1, 0))  # Yellow
+        annot.set_opacity(0.5)
+        annot.update()
+
+    @staticmethod
+    def _save(doc, output_path: Path):
+        """Append the annotations to the copy; rewrite it only if MuPDF can't."""
+        if doc.can_save_incrementally():
+            doc.save(str(output_path), incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+            return
+        # e.g. the original needed repair when opened
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        doc.save(str(tmp_path))
+        os.replace(tmp_path, output_path)
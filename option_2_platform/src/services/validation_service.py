@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 from dataclasses import dataclass
 
@@ -8,10 +8,9 @@ from src.services.pdf_annotation_service import PDFAnnotationService
 from src.rag.llm_chain import LLMChain, RAGResponse
 from src.rag.config import RAGConfig
 from src.rag.retrieval import RetrievalEngine
-from src.rag.llm_provider import OllamaProvider
 from src.rag.prompt_builder import PromptBuilder
-from src.rag.vector_store import VectorStore
-from src.rag.embeddings import EmbeddingGenerator
+from src.rag.registry import get_component_registry
+from src.rag.criteria_catalog import CompiledCriteriaCatalog, CriterionQuery, catalog_version
 from src.services.project_service import project_service
 
 logger = logging.getLogger(__name__)
@@ -25,22 +24,23 @@ class Criterion:
 class ValidationService:
     def __init__(self):
         self.annotation_service = PDFAnnotationService()
+        self.embedder = None
+        self.criteria_catalog: Optional[CompiledCriteriaCatalog] = None
         self._init_llm_chain()
         
     def _init_llm_chain(self):
         try:
             config = RAGConfig.from_yaml()
-            embedder = EmbeddingGenerator(model_name=config.embedding_model)
-            vector_store = VectorStore(
-                collection_name=config.collection_name,
-                persist_directory=config.vector_store_path,
-                embedding_function=embedder
+            # Reuse the process-wide model, Chroma client and LLM provider
+            registry = get_component_registry()
+            vector_store = registry.get_vector_store(
+                config,
+                persist_directory=config.vector_store_path
             )
             retrieval_engine = RetrievalEngine(vector_store=vector_store, config=config)
-            llm_provider = OllamaProvider(
-                model_name=config.llm_model,
-                base_url=config.llm_base_url
-            )
+            self.config = config
+            self.embedder = vector_store.embedding_function
+            llm_provider = registry.get_llm_provider(config)
             prompt_builder = PromptBuilder(retrieval_engine=retrieval_engine)
             
             self.llm_chain = LLMChain(
@@ -62,6 +62,34 @@ class ValidationService:
             Criterion(id="K004", name="Finanzierung", description="Ist die Finanzierung gesichert und angemessen?")
         ]
 
+    @staticmethod
+    def _question(criterion: Criterion) -> str:
+        return f"Erfüllt das Projekt das Kriterium: {criterion.description}?"
+
+    def _compiled_catalog(self, criteria: List[Criterion]) -> Optional[CompiledCriteriaCatalog]:
+        """
+        Criterion questions with precomputed query embeddings.
+
+        Kept in memory while the catalog version is unchanged; otherwise
+        loaded from (or compiled into) the artifact in criteria_catalog_dir.
+        """
+        queries = [
+            CriterionQuery(criterion.id, self._question(criterion), LLMChain.CITATION_TOP_K)
+            for criterion in criteria
+        ]
+        if self.criteria_catalog is not None and self.criteria_catalog.version == catalog_version(queries):
+            return self.criteria_catalog
+        if self.embedder is None:
+            return None
+        try:
+            self.criteria_catalog = CompiledCriteriaCatalog.compile(
+                queries, self.embedder, self.config.criteria_catalog_dir, name="validation"
+            )
+        except Exception as e:
+            logger.warning(f"Could not compile criteria catalog, encoding questions per run: {e}")
+            return None
+        return self.criteria_catalog
+
     async def validate_project(self, project: Project) -> Dict[str, Any]:
         """
         Run validation on a project's documents using LLM/RAG.
@@ -76,13 +104,25 @@ class ValidationService:
         results = []
         all_citations = []
         
-        for criterion in criteria:
-            question = f"Erfüllt das Projekt das Kriterium: {criterion.description}?"
-            
+        questions = [self._question(criterion) for criterion in criteria]
+        catalog = self._compiled_catalog(criteria)
+        try:
+            # One vector search for the whole catalog, with the stored question vectors
+            retrieved = self.llm_chain.retrieve_for_citations(
+                questions,
+                project_id=project.id,
+                query_embeddings=catalog.embeddings if catalog is not None else None
+            )
+        except Exception as e:
+            logger.warning(f"Batched retrieval failed, retrieving per criterion: {e}")
+            retrieved = [None] * len(questions)
+        
+        for criterion, question, chunks in zip(criteria, questions, retrieved):
             try:
                 rag_response: RAGResponse = self.llm_chain.query_with_citations(
                     question=question,
-                    project_id=project.id
+                    project_id=project.id,
+                    results=chunks
                 )
                 
                 # Simple status parsing
@@ -143,43 +183,41 @@ class ValidationService:
     async def _annotate_documents(self, project: Project, citations: List) -> Dict[str, str]:
         """
         Create annotated copies of documents based on citations.
+        
+        All citations of the run are grouped per document first, so each
+        PDF is copied and saved once; the PDF work runs off the event loop.
         """
         annotated_docs = {}
         
-        # Group citations by document
+        # Group citations by document (criteria often cite the same chunk)
         citations_by_doc = {}
         for cit in citations:
-            # cit is either Citation object or dict if we serialized it? 
-            # It is Citation object from RAGResponse
-            doc_id = cit.doc_id
-            if doc_id not in citations_by_doc:
-                citations_by_doc[doc_id] = []
-            
-            citations_by_doc[doc_id].append({
+            # cit is a Citation object from RAGResponse
+            doc_citations = citations_by_doc.setdefault(cit.doc_id, {})
+            key = (cit.page, cit.bboxes, cit.text_snippet)
+            if key in doc_citations:
+                continue
+            doc_citations[key] = {
                 "page": cit.page,
                 "quote": cit.text_snippet,
+                "bboxes": cit.bboxes,
                 "comment": "RAG Citation"
-            })
-            
-        for doc in project.documents:
+            }
+        
+        # Use document ID for matching if possible, otherwise filename
+        documents = [doc for doc in project.documents if doc.id in citations_by_doc]
+        jobs = []
+        for doc in documents:
             input_path = Path(doc.path)
-            # Use document ID for matching if possible, otherwise filename
-            doc_id = doc.id
-            
-            if doc_id in citations_by_doc:
-                output_dir = input_path.parent
-                output_filename = f"annotated_{input_path.name}"
-                output_path = output_dir / output_filename
-                
-                success = self.annotation_service.create_annotated_pdf(
-                    input_path=input_path,
-                    output_path=output_path,
-                    citations=citations_by_doc[doc_id]
-                )
-                
-                if success:
-                    annotated_docs[doc_id] = str(output_path)
-                    # Also map by filename for easier lookup in frontend
-                    annotated_docs[doc.filename] = str(output_path)
+            output_path = input_path.parent / f"annotated_{input_path.name}"
+            jobs.append((input_path, output_path, list(citations_by_doc[doc.id].values())))
+        
+        results = await self.annotation_service.create_annotated_pdfs(jobs)
+        
+        for doc, (_, output_path, _), success in zip(documents, jobs, results):
+            if success:
+                annotated_docs[doc.id] = str(output_path)
+                # Also map by filename for easier lookup in frontend
+                annotated_docs[doc.filename] = str(output_path)
                     
         return annotated_docs
@@ -3,8 +3,8 @@
 This module provides centralized pytest configuration and fixtures for the test suite.
 
 CURRENT STATUS:
-- No fixtures currently defined
-- Minimal configuration
+- fake_embedding_model: deterministic stand-in for the SentenceTransformer
+  model, so embedding/vector store logic can be tested without a model download
 - Available for expansion as test suite grows
 
 FIXTURE TEMPLATES (for future use):
@@ -38,6 +38,66 @@ FUTURE IMPROVEMENTS:
 - Add database fixtures (ChromaDB mocks)
 - Add project/document fixtures
 """
+import hashlib
+
+import numpy as np
 import pytest
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+from transformers import PreTrainedTokenizerFast
+
+from src.rag.embeddings import EmbeddingGenerator
+
+FAKE_EMBEDDING_MODEL = "fake-test-model"
+
+
+def make_fake_tokenizer() -> PreTrainedTokenizerFast:
+    """Fast tokenizer with one token per word or punctuation run, plus [CLS]/[SEP]."""
+    tokenizer = Tokenizer(models.WordLevel({"[UNK]": 0, "[CLS]": 1, "[SEP]": 2}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 1), ("[SEP]", 2)]
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, unk_token="[UNK]", cls_token="[CLS]", sep_token="[SEP]"
+    )
+
+
+class FakeEmbeddingModel:
+    """Deterministic stand-in for SentenceTransformer that counts encoded texts."""
 
-# Add shared fixtures here
+    name = FAKE_EMBEDDING_MODEL
+
+    def __init__(self, dim: int = 8, max_seq_length: int = 128):
+        self.dim = dim
+        self.encoded = 0
+        self.encode_calls = 0
+        self.tokenizer = make_fake_tokenizer()
+        self.max_seq_length = max_seq_length
+
+    def _vector(self, text: str) -> np.ndarray:
+        # Stable across runs (built-in hash() depends on PYTHONHASHSEED)
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        rng = np.random.default_rng(seed)
+        return rng.random(self.dim, dtype=np.float32)
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        self.encode_calls += 1
+        if isinstance(texts, str):
+            self.encoded += 1
+            return self._vector(texts)
+        self.encoded += len(texts)
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.stack([self._vector(t) for t in texts])
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+
+@pytest.fixture
+def fake_embedding_model():
+    """Register a FakeEmbeddingModel under FAKE_EMBEDDING_MODEL for EmbeddingGenerator."""
+    model = FakeEmbeddingModel()
+    EmbeddingGenerator._model_cache[FAKE_EMBEDDING_MODEL] = model
+    yield model
+    EmbeddingGenerator._model_cache.pop(FAKE_EMBEDDING_MODEL, None)
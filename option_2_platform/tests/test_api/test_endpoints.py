@@ -1,8 +1,15 @@
+import asyncio
+import time
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, patch
 from src.api.main import app
-from src.api.dependencies import get_ingestion_pipeline, get_llm_chain, get_config
+from src.api import dependencies
+from src.api.routers import ingest
+from src.api.dependencies import (
+    get_ingestion_pipeline, get_ingestion_job_queue, get_llm_chain, get_config, get_readiness
+)
+from src.services.ingestion_job_service import IngestionJobQueue
 from src.rag.config import RAGConfig
 
 client = TestClient(app)
@@ -25,6 +32,9 @@ app.dependency_overrides[get_ingestion_pipeline] = override_get_ingestion_pipeli
 app.dependency_overrides[get_llm_chain] = override_get_llm_chain
 app.dependency_overrides[get_config] = override_get_config
 
+mock_job_queue = IngestionJobQueue(lambda: mock_pipeline, max_workers=1)
+app.dependency_overrides[get_ingestion_job_queue] = lambda: mock_job_queue
+
 def test_root():
     response = client.get("/")
     assert response.status_code == 200
@@ -49,17 +59,56 @@ def test_health_check():
 
 def test_upload_document():
     # Setup mock
-    mock_pipeline.ingest_file.return_value = ["chunk1", "chunk2"]
+    mock_pipeline.ingest_file.return_value = {"chunk_count": 2, "chunks_embedded": 2, "success": True}
     
     # Create dummy file
     file_content = b"dummy content"
     files = {"file": ("test.pdf", file_content, "application/pdf")}
     
-    response = client.post("/ingest/upload", files=files)
-    assert response.status_code == 200
+    response = client.post("/ingest/upload", files=files, data={"project_id": "p1"})
+    assert response.status_code == 202
     data = response.json()
-    assert data["success"] is True
-    assert data["chunks_count"] == 2
+    assert data["job_id"]
+    assert data["status_url"] == f"/ingest/jobs/{data['job_id']}"
+    
+    # Poll job until the worker has finished
+    for _ in range(100):
+        job = client.get(data["status_url"]).json()
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.02)
+    assert job["status"] == "completed"
+    assert job["chunks_stored"] == 2
+    assert job["project_id"] == "p1"
+    assert mock_pipeline.ingest_file.call_args.kwargs["project_id"] == "p1"
+    
+    response = client.get("/ingest/jobs")
+    assert response.status_code == 200
+    assert any(j["job_id"] == data["job_id"] for j in response.json())
+
+def test_upload_saved_off_event_loop():
+    loop_threads = []
+    def save(source, file_path):
+        try:
+            asyncio.get_running_loop()
+            loop_threads.append(True)
+        except RuntimeError:
+            loop_threads.append(False)
+    
+    mock_pipeline.ingest_file.return_value = {"chunk_count": 0, "chunks_embedded": 0, "success": True}
+    with patch.object(ingest, "_save_upload", side_effect=save):
+        response = client.post("/ingest/upload", files={"file": ("test.pdf", b"dummy", "application/pdf")})
+    assert response.status_code == 202
+    assert loop_threads == [False]
+
+def test_upload_unsupported_extension():
+    files = {"file": ("notes.txt", b"text", "text/plain")}
+    response = client.post("/ingest/upload", files=files)
+    assert response.status_code == 400
+
+def test_unknown_ingest_job():
+    response = client.get("/ingest/jobs/does-not-exist")
+    assert response.status_code == 404
 
 def test_query_endpoint():
     # Setup mock
@@ -80,3 +129,70 @@ def test_query_empty_question():
     payload = {"question": "   "}
     response = client.post("/query", json=payload)
     assert response.status_code == 400
+
+def test_ready_endpoint_not_ready():
+    app.dependency_overrides[get_readiness] = lambda: {
+        "ready": False,
+        "status": "warming_up",
+        "total_ms": None,
+        "components": {"embedding_model": {"status": "ok", "duration_ms": 1234.5}},
+        "error": None
+    }
+    try:
+        response = client.get("/system/ready")
+    finally:
+        del app.dependency_overrides[get_readiness]
+    assert response.status_code == 503
+    data = response.json()
+    assert data["ready"] is False
+    assert data["components"]["embedding_model"]["duration_ms"] == 1234.5
+
+def test_ready_endpoint_ready():
+    app.dependency_overrides[get_readiness] = lambda: {
+        "ready": True,
+        "status": "ready",
+        "total_ms": 2000.0,
+        "components": {},
+        "error": None
+    }
+    try:
+        response = client.get("/system/ready")
+    finally:
+        del app.dependency_overrides[get_readiness]
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+def test_warm_up_components_records_timings(monkeypatch):
+    fake_chain = MagicMock()
+    fake_chain.llm_provider.test_connection.return_value = {"available": False, "error": "offline"}
+    monkeypatch.setattr(dependencies, "_llm_chain", fake_chain)
+    monkeypatch.setattr(dependencies, "_ingestion_pipeline", MagicMock())
+    monkeypatch.setattr(dependencies, "_startup_state", {
+        "status": "pending", "started_at": None, "finished_at": None, "components": {}, "error": None
+    })
+
+    dependencies.warm_up_components()
+    readiness = dependencies.get_readiness()
+
+    # Ollama being offline does not block readiness
+    assert readiness["ready"] is True
+    assert readiness["status"] == "ready"
+    assert readiness["total_ms"] is not None
+    assert readiness["components"]["ollama_connection"]["available"] is False
+
+def test_warm_up_components_failure(monkeypatch):
+    def failing_chain():
+        raise RuntimeError("model download failed")
+
+    monkeypatch.setattr(dependencies, "_llm_chain", None)
+    monkeypatch.setattr(dependencies, "get_llm_chain", failing_chain)
+    monkeypatch.setattr(dependencies, "_startup_state", {
+        "status": "pending", "started_at": None, "finished_at": None, "components": {}, "error": None
+    })
+
+    dependencies.warm_up_components()
+    readiness = dependencies.get_readiness()
+
+    assert readiness["ready"] is False
+    assert readiness["status"] == "failed"
+    assert "model download failed" in readiness["error"]
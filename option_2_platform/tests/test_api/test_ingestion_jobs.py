@@ -0,0 +1,106 @@
+"""
+Tests for the background ingestion job queue.
+"""
+import threading
+import time
+
+import pytest
+
+from src.services.ingestion_job_service import IngestionJobQueue, JobQueueFullError
+
+
+class FakePipeline:
+    """Reports progress like IngestionPipeline; optionally blocks until released."""
+
+    def __init__(self, fail: bool = False, unchanged: int = 0):
+        self.fail = fail
+        self.unchanged = unchanged
+        self.release = threading.Event()
+        self.release.set()
+
+    def ingest_file(self, file_path, project_id=None, progress_callback=None):
+        self.release.wait(timeout=5)
+        if self.fail:
+            raise ValueError("Unsupported file type: .txt")
+        embedded = 4 - self.unchanged
+        progress_callback("stored", {"pages_parsed": 2, "chunks_total": 4, "chunks_embedded": embedded,
+                                     "chunks_stored": embedded})
+        return {"file_path": file_path, "chunk_count": 4, "chunks_embedded": embedded,
+                "chunks_unchanged": self.unchanged, "success": True}
+
+
+def wait_for(job, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_job_completes_with_progress():
+    queue = IngestionJobQueue(lambda: FakePipeline(), max_workers=1)
+    try:
+        job = wait_for(queue.submit("data/input/antrag.pdf", project_id="p1"))
+
+        assert job.status == "completed"
+        assert job.stage == "completed"
+        assert job.pages_parsed == 2
+        assert job.chunks_total == job.chunks_embedded == job.chunks_stored == 4
+        assert job.started_at is not None and job.finished_at is not None
+        assert queue.get(job.id) is job
+        assert queue.get_stats()["completed"] == 1
+    finally:
+        queue.shutdown()
+
+
+def test_incremental_job_reports_embedded_chunks():
+    queue = IngestionJobQueue(lambda: FakePipeline(unchanged=3), max_workers=1)
+    try:
+        job = wait_for(queue.submit("data/input/antrag.pdf"))
+
+        assert job.chunks_total == 4
+        assert job.chunks_embedded == job.chunks_stored == 1
+    finally:
+        queue.shutdown()
+
+
+def test_job_failure_is_recorded():
+    queue = IngestionJobQueue(lambda: FakePipeline(fail=True), max_workers=1)
+    try:
+        job = wait_for(queue.submit("data/input/notes.txt"))
+
+        assert job.status == "failed"
+        assert "Unsupported file type" in job.error
+    finally:
+        queue.shutdown()
+
+
+def test_pending_job_limit():
+    pipeline = FakePipeline()
+    pipeline.release.clear()
+    queue = IngestionJobQueue(lambda: pipeline, max_workers=1, max_pending_jobs=2)
+    try:
+        first = queue.submit("a.pdf")
+        second = queue.submit("b.pdf")
+        with pytest.raises(JobQueueFullError):
+            queue.submit("c.pdf")
+
+        pipeline.release.set()
+        wait_for(first)
+        wait_for(second)
+        # Finished jobs no longer count against the limit
+        wait_for(queue.submit("c.pdf"))
+        assert [job.status for job in queue.list_jobs()] == ["completed"] * 3
+    finally:
+        queue.shutdown()
+
+
+def test_finished_jobs_are_pruned():
+    queue = IngestionJobQueue(lambda: FakePipeline(), max_workers=1, max_finished_jobs=2)
+    try:
+        jobs = [wait_for(queue.submit(f"{i}.pdf")) for i in range(4)]
+        queue.submit("last.pdf")
+
+        assert queue.get(jobs[0].id) is None
+        assert queue.get(jobs[3].id) is not None
+    finally:
+        queue.shutdown()
@@ -1,5 +1,8 @@
+import multiprocessing
+import fitz
 import pytest
 from pathlib import Path
+import src.parsers.pdf_parser as pdf_parser_module
 from src.parsers.pdf_parser import PDFParser
 from src.parsers.exceptions import CorruptedFileError, UnsupportedFormatError
 
@@ -28,3 +31,48 @@ def test_pdf_parser_invalid_pdf(pdf_parser, tmp_path):
     invalid_pdf.write_text('This is not a PDF')
     with pytest.raises(CorruptedFileError):
         pdf_parser.parse(str(invalid_pdf))
+
+def make_pdf(path, pages):
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        # Leave one page empty, it must be skipped in both modes
+        if page_num != 3:
+            page.insert_text((72, 72), f"Seite {page_num + 1}: Förderantrag Abschnitt {page_num}")
+    doc.save(str(path))
+    doc.close()
+    return path
+
+def test_pdf_parser_parallel_matches_sequential(tmp_path):
+    pdf_path = make_pdf(tmp_path / 'antrag.pdf', pages=9)
+    sequential = PDFParser().parse(str(pdf_path))
+    
+    workers_before = set(multiprocessing.active_children())
+    parallel = PDFParser(max_workers=2, parallel_min_pages=2).parse(str(pdf_path))
+    
+    # The per-parse worker pool is shut down again
+    assert set(multiprocessing.active_children()) <= workers_before
+    assert len(parallel) == len(sequential) == 8
+    assert [d.content for d in parallel] == [d.content for d in sequential]
+    assert [d.metadata["page_number"] for d in parallel] == [1, 2, 3, 5, 6, 7, 8, 9]
+    assert all(d.metadata["total_pages"] == 9 for d in parallel)
+    assert [d.metadata["text_lines"] for d in parallel] == [d.metadata["text_lines"] for d in sequential]
+
+def test_pdf_parser_records_text_lines(pdf_parser, tmp_path):
+    pdf_path = make_pdf(tmp_path / 'antrag.pdf', pages=2)
+    document = pdf_parser.parse(str(pdf_path))[0]
+    
+    # Same text as get_text(); each line span points into it
+    with fitz.open(str(pdf_path)) as doc:
+        assert document.content == doc[0].get_text()
+    (start, end, x0, y0, x1, y1), = document.metadata["text_lines"]
+    assert document.content[start:end] == "Seite 1: Förderantrag Abschnitt 0"
+    assert x0 == pytest.approx(72, abs=1) and y0 < 72 < y1 and x1 > x0
+
+def test_pdf_parser_small_pdf_stays_sequential(tmp_path, monkeypatch):
+    pdf_path = make_pdf(tmp_path / 'kurz.pdf', pages=2)
+    parser = PDFParser(max_workers=4, parallel_min_pages=20)
+    monkeypatch.setattr(pdf_parser_module, "ProcessPoolExecutor", None)
+    documents = parser.parse(str(pdf_path))
+    
+    assert len(documents) == 2
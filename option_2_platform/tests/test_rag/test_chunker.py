@@ -1,7 +1,13 @@
+import random
+
+import fitz
 import pytest
 from src.rag.chunker import Chunker
+from src.rag.exceptions import ChunkingError
 from src.parsers.models import Document
-from src.rag.models import Chunk
+from src.parsers.pdf_parser import PDFParser
+from src.rag.models import Chunk, decode_bboxes
+from tests.conftest import make_fake_tokenizer
 
 GERMAN_TEXT = """
 Dies ist ein deutscher Testtext für das Chunking-System. 
@@ -122,3 +128,175 @@ class TestChunker:
         # "Para1." is 6 chars. 
         assert len(chunks) >= 3
         assert "Para1." in chunks[0].content
+
+
+class LegacyChunker(Chunker):
+    """Previous list/pop(0) based merging, kept as reference for byte-identical output."""
+
+    def _split_text(self, text, separators):
+        separator = separators[-1]
+        new_separators = []
+        for i, sep in enumerate(separators):
+            if sep == "":
+                separator = ""
+                break
+            if sep in text:
+                separator = sep
+                new_separators = separators[i + 1:]
+                break
+        splits = text.split(separator) if separator else list(text)
+        final_chunks = []
+        good_splits = []
+        for s in splits:
+            if len(s) < self.chunk_size:
+                good_splits.append(s)
+            else:
+                if good_splits:
+                    final_chunks.extend(self._merge_splits(good_splits, separator))
+                    good_splits = []
+                if new_separators:
+                    final_chunks.extend(self._split_text(s, new_separators))
+                else:
+                    final_chunks.append(s[:self.chunk_size])
+        if good_splits:
+            final_chunks.extend(self._merge_splits(good_splits, separator))
+        return final_chunks
+
+    def _merge_splits(self, splits, separator):
+        docs = []
+        current_doc = []
+        total = 0
+        separator_len = len(separator)
+        for d in splits:
+            _len = len(d)
+            if total + _len + (separator_len if current_doc else 0) > self.chunk_size:
+                if current_doc:
+                    doc = separator.join(current_doc)
+                    if doc:
+                        docs.append(doc)
+                    while total > self.chunk_overlap or (total + _len + separator_len > self.chunk_size and total > 0):
+                        total -= len(current_doc[0]) + (separator_len if len(current_doc) > 1 else 0)
+                        current_doc.pop(0)
+            current_doc.append(d)
+            total += _len + (separator_len if len(current_doc) > 1 else 0)
+        if current_doc:
+            doc = separator.join(current_doc)
+            if doc:
+                docs.append(doc)
+        return docs
+
+
+CORPORA = [
+    GERMAN_TEXT,
+    "1234567890" * 2,
+    "Übermäßiger Ölkonsum ist schädlich.",
+    "",
+    "Short.",
+    "a" * 200,
+    "Para1.\n\nPara2.\n\nPara3.",
+]
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(100, 20), (50, 10), (12, 4), (10, 0), (7, 7), (2, 5)])
+def test_output_identical_to_legacy_chunker(chunk_size, chunk_overlap):
+    """Linear-time merging produces exactly the chunks of the previous implementation."""
+    for text in CORPORA:
+        expected = [c.content for c in LegacyChunker(chunk_size, chunk_overlap).split(text)]
+        assert [c.content for c in Chunker(chunk_size, chunk_overlap).split(text)] == expected
+
+
+def test_random_texts_identical_to_legacy_chunker():
+    rng = random.Random(42)
+    pieces = ["a", "ß", " ", ". ", "\n", "\n\n", "Förderrichtlinie", "x" * 40]
+    for _ in range(500):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 120)))
+        chunk_size, chunk_overlap = rng.randint(2, 60), rng.randint(0, 60)
+        expected = [c.content for c in LegacyChunker(chunk_size, chunk_overlap).split(text)]
+        assert [c.content for c in Chunker(chunk_size, chunk_overlap).split(text)] == expected
+
+
+def test_long_unstructured_text_chunks_by_offset():
+    """Text without separators is cut into overlapping fixed-size windows."""
+    text = "".join(chr(ord("a") + i % 26) for i in range(10_000))
+    chunks = [c.content for c in Chunker(chunk_size=500, chunk_overlap=50).split(text)]
+
+    assert all(len(chunk) == 500 for chunk in chunks[:-1])
+    assert chunks[1] == text[450:950]
+    assert "".join(chunk[50:] if i else chunk for i, chunk in enumerate(chunks)) == text
+
+
+def test_chunks_record_character_offsets():
+    text = GERMAN_TEXT * 5
+    for chunker in (Chunker(chunk_size=80, chunk_overlap=20),
+                    Chunker(chunk_size=12, chunk_overlap=3, tokenizer=make_fake_tokenizer())):
+        chunks = chunker.split(text)
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert text[chunk.metadata["char_start"]:chunk.metadata["char_end"]] == chunk.content
+        # Repeated text: each chunk is located after its predecessor
+        starts = [c.metadata["char_start"] for c in chunks]
+        assert starts == sorted(set(starts))
+
+
+def test_pdf_chunks_record_line_bboxes(tmp_path):
+    pdf_path = tmp_path / "antrag.pdf"
+    doc = fitz.open()
+    page = doc.new_page()
+    for line in range(12):
+        page.insert_text((72, 72 + 20 * line), f"Zeile {line}: Förderfähige Kosten nach Richtlinie")
+    doc.save(str(pdf_path))
+    doc.close()
+
+    document = PDFParser().parse(str(pdf_path))[0]
+    chunks = Chunker(chunk_size=150, chunk_overlap=0).split(document)
+
+    assert len(chunks) > 2
+    for chunk in chunks:
+        assert "text_lines" not in chunk.metadata
+        boxes = decode_bboxes(chunk.metadata["bboxes"])
+        # Three 49-character lines per chunk, stacked 20 pt apart
+        assert len(boxes) == chunk.content.count("Zeile")
+        assert all(x0 == pytest.approx(72, abs=1) for x0, _, _, _ in boxes)
+    first = decode_bboxes(chunks[1].metadata["bboxes"])[0]
+    assert first[1] < 72 + 20 * 3 < first[3]
+
+
+class TestTokenChunking:
+    """chunk_size/chunk_overlap measured in tokens of the embedding tokenizer."""
+
+    def test_chunks_respect_token_limit(self):
+        tokenizer = make_fake_tokenizer()
+        chunker = Chunker(chunk_size=12, chunk_overlap=3, tokenizer=tokenizer)
+        chunks = chunker.split(GERMAN_TEXT)
+
+        assert len(chunks) > 1
+        counts = chunker._lengths([c.content for c in chunks])
+        assert max(counts) <= 12
+        # Recorded while merging, without tokenizing the chunks again
+        assert [c.metadata["token_count"] for c in chunks] == counts
+        assert chunks[0].metadata["chunk_unit"] == "tokens"
+
+    def test_token_and_char_units_differ(self):
+        """Long compound words: many characters but few tokens."""
+        text = " ".join(["Donaudampfschifffahrtsgesellschaftskapitän"] * 30)
+        by_chars = Chunker(chunk_size=100, chunk_overlap=0).split(text)
+        by_tokens = Chunker(chunk_size=100, chunk_overlap=0, tokenizer=make_fake_tokenizer()).split(text)
+
+        assert len(by_chars) == 15
+        assert [c.content for c in by_tokens] == [text]
+        assert by_chars[0].metadata["chunk_unit"] == "chars"
+
+    def test_unstructured_text_split_at_token_offsets(self):
+        # No separator at all: one token per punctuation/word run
+        text = "a,b,c,d,e,f,g,h,i,j"
+        chunks = Chunker(chunk_size=6, chunk_overlap=2, separators=[""], tokenizer=make_fake_tokenizer()).split(text)
+
+        # 19 tokens, windows of 6 advancing by 4
+        assert [c.content for c in chunks] == ["a,b,c,", "c,d,e,", "e,f,g,", "g,h,i,", "i,j"]
+
+    def test_requires_fast_tokenizer(self):
+        class SlowTokenizer:
+            is_fast = False
+
+        with pytest.raises(ChunkingError):
+            Chunker(tokenizer=SlowTokenizer())
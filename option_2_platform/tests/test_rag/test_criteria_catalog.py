@@ -0,0 +1,87 @@
+"""
+Tests for the compiled criteria catalog (no model download required).
+"""
+import numpy as np
+import pytest
+
+from src.rag.config import RAGConfig
+from src.rag.criteria_catalog import CompiledCriteriaCatalog, CriterionQuery
+from src.rag.embeddings import EmbeddingGenerator
+from src.rag.models import Chunk
+from src.rag.registry import get_component_registry
+from src.rag.retrieval import RetrievalEngine
+
+QUERIES = [
+    CriterionQuery("K001", "Ist das Projekt innovativ?"),
+    CriterionQuery("K002", "Gibt es einen klaren Markt?", top_k=3),
+]
+
+
+@pytest.fixture
+def embedder(fake_embedding_model):
+    return EmbeddingGenerator(model_name=fake_embedding_model.name, use_cache=False)
+
+
+def test_compile_once_then_load(tmp_path, embedder, fake_embedding_model):
+    catalog = CompiledCriteriaCatalog.compile(QUERIES, embedder, str(tmp_path))
+    assert fake_embedding_model.encoded == 2
+    assert catalog.questions == [q.question for q in QUERIES]
+    assert catalog.max_top_k == 5
+
+    # Next process start: read from the artifact, no query encoding
+    loaded = CompiledCriteriaCatalog.compile(QUERIES, embedder, str(tmp_path))
+    assert fake_embedding_model.encoded == 2
+    assert loaded.queries == QUERIES
+    assert loaded.version == catalog.version
+    np.testing.assert_array_equal(loaded.embeddings, catalog.embeddings)
+
+
+def test_rebuilt_on_catalog_or_model_change(tmp_path, embedder, fake_embedding_model):
+    catalog = CompiledCriteriaCatalog.compile(QUERIES, embedder, str(tmp_path))
+
+    changed = [QUERIES[0], CriterionQuery("K002", "Gibt es einen klaren Markt?", top_k=5)]
+    recompiled = CompiledCriteriaCatalog.compile(changed, embedder, str(tmp_path))
+    assert recompiled.version != catalog.version
+    assert fake_embedding_model.encoded == 4
+
+    # Artifact written for another embedding model
+    path = CompiledCriteriaCatalog.path_for(str(tmp_path), "default")
+    CompiledCriteriaCatalog(changed, recompiled.embeddings, recompiled.version, "other-model").save(path)
+    CompiledCriteriaCatalog.compile(changed, embedder, str(tmp_path))
+    assert fake_embedding_model.encoded == 6
+
+    # Unreadable artifact
+    path.write_bytes(b"not an npz file")
+    assert CompiledCriteriaCatalog.load(path) is None
+    CompiledCriteriaCatalog.compile(changed, embedder, str(tmp_path))
+    assert fake_embedding_model.encoded == 8
+    assert CompiledCriteriaCatalog.load(path).model_key == "fake-test-model"
+
+
+def test_retrieval_with_precomputed_embeddings(tmp_path, embedder, fake_embedding_model):
+    config = RAGConfig(embedding_model=fake_embedding_model.name, persist_directory=str(tmp_path / "chroma"),
+                       collection_name="catalog_test", retrieval_mode="dense")
+    vector_store = get_component_registry().get_vector_store(config)
+    try:
+        vector_store.add_chunks([
+            Chunk(content=text, metadata={"project_id": "p1"})
+            for text in ["Innovation und Stand der Technik", "Markt und Verwertung", "Finanzierung"]
+        ])
+        engine = RetrievalEngine(vector_store, config=config)
+        catalog = CompiledCriteriaCatalog.compile(QUERIES, embedder, str(tmp_path / "catalog"))
+        expected = engine.retrieve_many(catalog.questions, top_k=2, metadata_filter={"project_id": "p1"})
+
+        def lookups():
+            stats = vector_store.embedding_function.get_cache_stats()
+            return stats["hits"] + stats["misses"]
+
+        before = lookups()
+        results = engine.retrieve_many(
+            catalog.questions, top_k=2, metadata_filter={"project_id": "p1"}, query_embeddings=catalog.embeddings
+        )
+
+        # Neither encoded nor looked up in the embedding cache
+        assert lookups() == before
+        assert [[r["id"] for r in rs] for rs in results] == [[r["id"] for r in rs] for rs in expected]
+    finally:
+        get_component_registry().clear()
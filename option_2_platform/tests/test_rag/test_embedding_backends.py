@@ -0,0 +1,83 @@
+"""
+Tests for pluggable embedding backends (torch, torch_int8, onnx).
+"""
+import pytest
+import numpy as np
+
+from src.rag.embedding_backends import (
+    ONNXBackend,
+    QuantizedTorchBackend,
+    TorchBackend,
+    get_embedding_backend,
+)
+from src.rag.embeddings import EmbeddingGenerator
+from src.rag.exceptions import EmbeddingError, RAGException
+
+MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+
+PARITY_TEXTS = [
+    "Die IFB Hamburg fördert Innovationsprojekte.",
+    "Antragsberechtigt sind kleine und mittlere Unternehmen mit Sitz in Hamburg.",
+    "Die Förderquote beträgt bis zu 50 % der förderfähigen Kosten nach § 4 Abs. 2.",
+    "Das Wetter ist heute schön.",
+    "Personalkosten | 45.000 EUR | 2025",
+]
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity of two matrices."""
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def load_or_skip(backend: str, **kwargs) -> EmbeddingGenerator:
+    try:
+        return EmbeddingGenerator(MODEL_NAME, use_cache=False, backend=backend, **kwargs)
+    except (RAGException, ImportError) as e:
+        pytest.skip(f"Embedding backend '{backend}' not available: {e}")
+
+
+def test_get_embedding_backend():
+    assert isinstance(get_embedding_backend("torch"), TorchBackend)
+    assert isinstance(get_embedding_backend("torch_int8"), QuantizedTorchBackend)
+    onnx = get_embedding_backend("onnx", onnx_file="onnx/model_qint8_avx2.onnx")
+    assert isinstance(onnx, ONNXBackend)
+    assert onnx.onnx_file == "onnx/model_qint8_avx2.onnx"
+
+    with pytest.raises(EmbeddingError):
+        get_embedding_backend("tensorflow")
+
+
+def test_cache_namespace_separates_backends():
+    torch_key = get_embedding_backend("torch").cache_namespace(MODEL_NAME)
+    int8_key = get_embedding_backend("torch_int8").cache_namespace(MODEL_NAME)
+    onnx_key = get_embedding_backend("onnx").cache_namespace(MODEL_NAME)
+
+    assert torch_key == MODEL_NAME
+    assert len({torch_key, int8_key, onnx_key}) == 3
+
+
+def test_generator_uses_backend_namespace(fake_embedding_model):
+    namespace = f"{fake_embedding_model.name}::torch_int8"
+    EmbeddingGenerator._model_cache[namespace] = fake_embedding_model
+    try:
+        embedder = EmbeddingGenerator(fake_embedding_model.name, backend="torch_int8")
+        assert embedder.model is fake_embedding_model
+        assert embedder._cache.model_name == namespace
+        assert embedder.get_cache_stats()["model_backend"] == "torch_int8"
+    finally:
+        EmbeddingGenerator._model_cache.pop(namespace, None)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("backend,min_cosine", [("torch_int8", 0.97), ("onnx", 0.999)])
+def test_backend_parity_with_torch(backend, min_cosine):
+    """Quantized/ONNX vectors must agree with the full-precision torch model."""
+    reference = load_or_skip("torch").embed_batch_array(PARITY_TEXTS)
+    candidate = load_or_skip(backend).embed_batch_array(PARITY_TEXTS)
+
+    assert candidate.shape == reference.shape
+    similarities = cosine_rows(reference, candidate)
+    print(f"\n{backend} cosine agreement: min={similarities.min():.4f} mean={similarities.mean():.4f}")
+    assert similarities.min() >= min_cosine
@@ -0,0 +1,129 @@
+"""
+Unit tests for embedding cache backends (no model download required).
+"""
+import pytest
+import numpy as np
+
+from src.rag.embedding_cache import (
+    InMemoryEmbeddingCache,
+    SQLiteEmbeddingCache,
+    create_embedding_cache,
+)
+from src.rag.embeddings import EmbeddingGenerator
+from src.rag.exceptions import EmbeddingError
+
+# Name under which the fake_embedding_model fixture (conftest.py) registers itself
+FAKE_MODEL = "fake-test-model"
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_lru_eviction(tmp_path, backend):
+    cache = create_embedding_cache(backend, FAKE_MODEL, str(tmp_path), max_entries=2)
+    cache.put("a", [1.0, 2.0])
+    cache.put("b", [3.0, 4.0])
+    # Touch "a" so that "b" is least recently used
+    assert cache.get("a").tolist() == [1.0, 2.0]
+    cache.put("c", [5.0, 6.0])
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    cache = SQLiteEmbeddingCache(str(tmp_path), FAKE_MODEL)
+    cache.put_many({"k1": [0.5, 0.25], "k2": [1.0, 0.0]})
+    cache.close()
+
+    reopened = SQLiteEmbeddingCache(str(tmp_path), FAKE_MODEL)
+    assert len(reopened) == 2
+    assert reopened.get("k1").tolist() == [0.5, 0.25]
+
+
+def test_sqlite_cache_keyed_by_model(tmp_path):
+    cache_a = SQLiteEmbeddingCache(str(tmp_path), "model-a")
+    cache_b = SQLiteEmbeddingCache(str(tmp_path), "model-b")
+    cache_a.put("same-text", [1.0])
+
+    assert cache_b.get("same-text") is None
+    cache_b.clear()
+    assert len(cache_a) == 1
+
+
+def test_in_memory_cache_unbounded():
+    cache = InMemoryEmbeddingCache(FAKE_MODEL, max_entries=0)
+    cache.put_many({str(i): [float(i)] for i in range(50)})
+    assert len(cache) == 50
+    assert cache.evictions == 0
+
+
+def test_unknown_backend():
+    with pytest.raises(EmbeddingError):
+        create_embedding_cache("redis", FAKE_MODEL)
+
+
+def test_generator_reuses_persistent_cache_after_restart(tmp_path, fake_embedding_model):
+    texts = ["§ 4 Abs. 2 Förderrichtlinie", "Antragsberechtigt sind KMU"]
+    first = EmbeddingGenerator(FAKE_MODEL, cache_backend="sqlite", cache_dir=str(tmp_path))
+    embeddings = first.embed_batch(texts)
+    assert fake_embedding_model.encoded == 2
+
+    # Simulate a restart: new generator instance, same cache directory
+    second = EmbeddingGenerator(FAKE_MODEL, cache_backend="sqlite", cache_dir=str(tmp_path))
+    assert np.allclose(second.embed_batch(texts), embeddings)
+    assert np.allclose(second.embed(texts[0]), embeddings[0])
+    assert fake_embedding_model.encoded == 2
+
+    stats = second.get_cache_stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 0
+    assert stats["size"] == 2
+    assert stats["backend"] == "sqlite"
+
+
+def test_generator_reports_evictions(fake_embedding_model):
+    embedder = EmbeddingGenerator(FAKE_MODEL, cache_max_entries=2)
+    embedder.embed_batch(["a", "b", "c"])
+
+    stats = embedder.get_cache_stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert stats["misses"] == 3
+
+
+def test_cache_entries_are_float32_arrays(fake_embedding_model):
+    embedder = EmbeddingGenerator(FAKE_MODEL)
+    embedder.embed_batch_array(["Förderquote"])
+
+    entry = embedder._cache.get(embedder._get_cache_key("Förderquote"))
+    assert isinstance(entry, np.ndarray)
+    assert entry.dtype == np.float32
+    assert entry.flags.c_contiguous
+    assert not entry.flags.writeable
+
+
+def test_batch_deduplicates_before_encoding(fake_embedding_model):
+    embedder = EmbeddingGenerator(FAKE_MODEL, use_cache=False)
+    texts = ["Seite 1 von 3", "Inhalt", "Seite 1 von 3", "Seite 1 von 3"]
+
+    matrix = embedder.embed_batch_array(texts)
+
+    assert fake_embedding_model.encoded == 2
+    assert matrix.shape == (4, fake_embedding_model.dim)
+    assert np.array_equal(matrix[0], matrix[2])
+    assert np.array_equal(matrix[0], matrix[3])
+    assert embedder.get_cache_stats()["batch_dedup_saved"] == 2
+
+
+def test_length_bucketed_encoding_keeps_order(fake_embedding_model):
+    embedder = EmbeddingGenerator(FAKE_MODEL, use_cache=False, encode_batch_size=2)
+    texts = ["kurz", "ein deutlich längerer Absatz " * 10, "mittel lang", "x", "noch ein langer Text " * 5]
+
+    matrix = embedder.embed_batch_array(texts)
+
+    # 5 unique texts in buckets of 2 -> 3 forward passes
+    assert fake_embedding_model.encode_calls == 3
+    for row, text in zip(matrix, texts):
+        assert np.array_equal(row, fake_embedding_model.encode(text))
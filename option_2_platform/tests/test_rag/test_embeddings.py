@@ -184,14 +184,14 @@ class TestEmbeddingGenerator:
         embeddings1 = embedder.embed_batch(texts)
         
         # Check cache stats after first run
-        # "Text 1", "Text 2", "Text 3" are new -> 3 misses (processed)
-        # "Text 1", "Text 2" are duplicates in the list.
-        # Current implementation processes the batch in one go, so duplicates within the same batch
-        # are NOT found in cache during the initial scan, because cache is updated AFTER embedding.
-        # So hits should be 0 for the first run.
+        # "Text 1", "Text 2", "Text 3" are new -> 3 misses (encoded once each).
+        # The in-batch duplicates of "Text 1" and "Text 2" are deduplicated before
+        # encoding and fanned out, so they count as batch_dedup_saved, not as hits.
         stats = embedder.get_cache_stats()
         assert stats['size'] == 3
-        # assert stats['hits'] >= 2 # This expectation was incorrect for the current implementation
+        assert stats['misses'] == 3
+        assert stats['batch_dedup_saved'] == 2
+        assert embeddings1[0] == embeddings1[3]
         
         # Second batch (everything cached)
         embeddings2 = embedder.embed_batch(texts)
@@ -0,0 +1,210 @@
+"""
+Tests for hybrid (BM25 + dense) retrieval (no model download required).
+"""
+import fitz
+import pytest
+
+from src.rag.config import RAGConfig
+from src.rag.exceptions import RetrievalError
+from src.rag.ingestion import IngestionPipeline
+from src.rag.registry import get_component_registry
+from src.rag.retrieval import RetrievalEngine
+from src.rag.sparse_index import BM25Index
+from src.rag.vector_store import VectorStore, _StoredVersion
+
+PAGES = [
+    "Gemäß § 4 Abs. 2 der Förderrichtlinie sind Personalkosten förderfähig.",
+    "Gemäß § 2 Abs. 4 der Förderrichtlinie sind Sachkosten förderfähig.",
+    "Das Programm PROFI Transfer fördert Kooperationen mit Hochschulen.",
+    "Der Arbeitsplan beschreibt Meilensteine und die Laufzeit des Vorhabens.",
+]
+
+
+def write_pdf(path, pages):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=9)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def make_config(tmp_path, model_name, **overrides):
+    values = dict(
+        embedding_model=model_name,
+        embedding_cache_backend="memory",
+        vector_store_path=str(tmp_path / "chroma"),
+        persist_directory=str(tmp_path / "chroma"),
+        collection_name="hybrid_test",
+        retrieval_mode="hybrid",
+        retrieval_candidates=4,
+    )
+    values.update(overrides)
+    return RAGConfig(**values)
+
+
+@pytest.fixture
+def config(tmp_path, fake_embedding_model):
+    yield make_config(tmp_path, fake_embedding_model.name)
+    get_component_registry().clear()
+
+
+def test_ingestion_maintains_sparse_index(tmp_path, config):
+    pipeline = IngestionPipeline(config)
+    pdf_path = write_pdf(tmp_path / "richtlinie.pdf", PAGES)
+    result = pipeline.ingest_file(str(pdf_path), project_id="p1")
+
+    assert sorted(pipeline.sparse_index.ids()) == sorted(result["chunk_ids"])
+
+    # Changed file: stale chunks leave the index together with Chroma
+    write_pdf(pdf_path, PAGES[:2] + ["Neuer Abschnitt zur Verwertung."])
+    result = pipeline.ingest_file(str(pdf_path), project_id="p1")
+    assert sorted(pipeline.sparse_index.ids()) == sorted(result["chunk_ids"])
+    assert pipeline.sparse_index.search("Meilensteine") == []
+
+
+def test_hybrid_ranks_exact_identifiers_first(tmp_path, config):
+    pipeline = IngestionPipeline(config)
+    pipeline.ingest_file(str(write_pdf(tmp_path / "richtlinie.pdf", PAGES)), project_id="p1")
+    engine = RetrievalEngine(pipeline.vector_store, config=config)
+
+    results = engine.retrieve("§ 2 Abs. 4", top_k=2, metadata_filter={"project_id": "p1"})
+
+    # The fake dense ranking is arbitrary; BM25 rank 1 still keeps the chunk in the fused top 2
+    exact = [r for r in results if "§ 2 Abs. 4" in r["content"]]
+    assert len(exact) == 1
+    assert exact[0]["sparse_score"] == max(r["sparse_score"] or 0.0 for r in results)
+    assert results[0]["fused_score"] >= results[1]["fused_score"]
+    # "score" keeps the cosine scale of dense retrieval, also for BM25-only chunks
+    dense = {r["id"]: r["score"] for r in pipeline.vector_store.query("§ 2 Abs. 4", top_k=10)}
+    assert [r["score"] for r in results] == pytest.approx([dense[r["id"]] for r in results], abs=1e-5)
+    assert all(r["dense_score"] == r["score"] for r in results)
+    assert engine.retrieve("§ 2 Abs. 4", metadata_filter={"project_id": "p2"}) == []
+    assert engine.get_stats()["sparse_searches"] == 2
+
+    sparse_engine = RetrievalEngine(pipeline.vector_store, config=config.model_copy(update={"retrieval_mode": "sparse"}))
+    assert [r["content"] for r in sparse_engine.retrieve("PROFI Transfer")] == [PAGES[2] + "\n"]
+
+
+def test_unsupported_filter_falls_back_to_dense(tmp_path, config):
+    pipeline = IngestionPipeline(config)
+    pipeline.ingest_file(str(write_pdf(tmp_path / "richtlinie.pdf", PAGES)), project_id="p1")
+    engine = RetrievalEngine(pipeline.vector_store, config=config)
+
+    results = engine.retrieve("Personalkosten", top_k=2, metadata_filter={"chunk_index": 0})
+
+    assert len(results) == 2
+    assert engine.get_stats()["dense_fallbacks"] == 1
+    assert engine.get_stats()["sparse_searches"] == 0
+
+
+def test_sparse_index_synced_with_existing_collection(tmp_path, config):
+    # Ingested while retrieval was dense-only: no BM25 index maintained
+    dense_pipeline = IngestionPipeline(config.model_copy(update={"retrieval_mode": "dense"}))
+    assert dense_pipeline.sparse_index is None
+    result = dense_pipeline.ingest_file(str(write_pdf(tmp_path / "richtlinie.pdf", PAGES)), project_id="p1")
+
+    engine = RetrievalEngine(dense_pipeline.vector_store, config=config)
+
+    assert sorted(engine.sparse_index.ids()) == sorted(result["chunk_ids"])
+    assert "PROFI Transfer" in engine.retrieve("PROFI Transfer", top_k=1)[0]["content"]
+
+
+def test_sparse_index_sync_keyed_on_stored_version(tmp_path, config, monkeypatch):
+    pipeline = IngestionPipeline(config)
+    pipeline.ingest_file(str(write_pdf(tmp_path / "richtlinie.pdf", PAGES)), project_id="p1")
+    version = pipeline.vector_store.stored_version()
+    assert version > 0
+    assert pipeline.sparse_index.synced_version() == version
+
+    # Next process: the index reflects every write, the collection is not scanned
+    get_component_registry().clear()
+    with monkeypatch.context() as patch:
+        patch.setattr(VectorStore, "iter_ids", lambda *args, **kwargs: pytest.fail("collection scanned"))
+        IngestionPipeline(config)
+
+    # A write the index missed (dense-only ingestion) is synced on the next open
+    get_component_registry().clear()
+    dense_pipeline = IngestionPipeline(config.model_copy(update={"retrieval_mode": "dense"}))
+    result = dense_pipeline.ingest_file(str(write_pdf(tmp_path / "umwelt.pdf", ["PROFI Umwelt fördert Klimaschutz."])))
+    get_component_registry().clear()
+    reopened = IngestionPipeline(config)
+    assert set(result["chunk_ids"]) <= set(reopened.sparse_index.ids())
+    assert reopened.sparse_index.synced_version() == reopened.vector_store.stored_version()
+
+
+def test_stored_version_advanced_once_per_ingestion(tmp_path, config):
+    sparse_dir = tmp_path / "sparse"
+    pipeline = IngestionPipeline(config.model_copy(
+        update={"ingest_store_batch_size": 1, "sparse_index_dir": str(sparse_dir)}
+    ))
+    pdf_path = write_pdf(tmp_path / "richtlinie.pdf", PAGES)
+
+    # Several micro-batches, one write version
+    pipeline.ingest_file(str(pdf_path), project_id="p1")
+    assert pipeline.vector_store.stored_version() == 1
+    assert pipeline.sparse_index.synced_version() == 1
+
+    # Re-ingestion with added and stale chunks, then deletion
+    write_pdf(pdf_path, PAGES[:2] + ["Neuer Abschnitt zur Verwertung."])
+    pipeline.ingest_file(str(pdf_path), project_id="p1")
+    pipeline.delete_source(str(pdf_path))
+    assert pipeline.vector_store.stored_version() == 3
+    assert pipeline.sparse_index.synced_version() == 3
+
+    # Side files live next to each other, not in Chroma's directory
+    assert (sparse_dir / _StoredVersion.FILENAME).exists()
+    assert (sparse_dir / BM25Index.FILENAME).exists()
+    assert not (tmp_path / "chroma" / _StoredVersion.FILENAME).exists()
+    assert not (tmp_path / "chroma" / BM25Index.FILENAME).exists()
+
+
+@pytest.mark.parametrize("mode", ["dense", "sparse", "hybrid"])
+def test_retrieve_many_matches_single_queries(tmp_path, config, mode):
+    config = config.model_copy(update={"retrieval_mode": mode})
+    pipeline = IngestionPipeline(config)
+    pipeline.ingest_file(str(write_pdf(tmp_path / "richtlinie.pdf", PAGES)), project_id="p1")
+    engine = RetrievalEngine(pipeline.vector_store, config=config)
+    queries = ["§ 4 Abs. 2", "Personalkosten förderfähig", "PROFI Transfer Hochschulen"]
+
+    single = [engine.retrieve(query, top_k=2, metadata_filter={"project_id": "p1"}) for query in queries]
+    dense_searches = engine.get_stats()["dense_searches"]
+    batched = engine.retrieve_many(queries, top_k=2, metadata_filter={"project_id": "p1"})
+
+    assert [[r["id"] for r in results] for results in batched] == [[r["id"] for r in results] for results in single]
+    assert [r["score"] for results in batched for r in results] == pytest.approx(
+        [r["score"] for results in single for r in results]
+    )
+    # One Chroma query for all queries
+    assert engine.get_stats()["dense_searches"] - dense_searches == (0 if mode == "sparse" else 1)
+
+
+@pytest.mark.parametrize("mode", ["dense", "hybrid"])
+def test_similarity_threshold_filters_cosine_scores(tmp_path, config, mode):
+    config = config.model_copy(update={"retrieval_mode": mode})
+    pipeline = IngestionPipeline(config)
+    pipeline.ingest_file(str(write_pdf(tmp_path / "richtlinie.pdf", PAGES)), project_id="p1")
+    unfiltered = RetrievalEngine(pipeline.vector_store, config=config).retrieve("Personalkosten", top_k=4)
+    threshold = sorted(r["score"] for r in unfiltered)[2]
+
+    engine = RetrievalEngine(pipeline.vector_store, config=config.model_copy(update={"similarity_threshold": threshold}))
+    results = engine.retrieve("Personalkosten", top_k=4)
+
+    assert [r["id"] for r in results] == [r["id"] for r in unfiltered if r["score"] >= threshold]
+    assert len(results) == 2
+    assert engine.retrieve_many(["Personalkosten"], top_k=4) == [results]
+
+
+def test_similarity_threshold_not_applied_in_sparse_mode(tmp_path, config, caplog):
+    config = config.model_copy(update={"retrieval_mode": "sparse", "similarity_threshold": 0.99})
+    pipeline = IngestionPipeline(config)
+    pipeline.ingest_file(str(write_pdf(tmp_path / "richtlinie.pdf", PAGES)), project_id="p1")
+    engine = RetrievalEngine(pipeline.vector_store, config=config)
+
+    assert "not applied in sparse" in caplog.text
+    assert [r["content"] for r in engine.retrieve("PROFI Transfer")] == [PAGES[2] + "\n"]
+
+
+def test_unknown_retrieval_mode(tmp_path, config):
+    with pytest.raises(RetrievalError):
+        RetrievalEngine(object(), config=config.model_copy(update={"retrieval_mode": "bm42"}))
@@ -0,0 +1,400 @@
+"""
+Tests for IngestionPipeline (no model download required).
+"""
+import fitz
+import pytest
+
+from src.rag.config import RAGConfig
+from src.rag.ingestion import IngestionPipeline
+from src.rag.registry import get_component_registry
+
+PARAGRAPH = (
+    "Die Hamburgische Investitions- und Förderbank fördert innovative Vorhaben "
+    "kleiner und mittlerer Unternehmen im Programm PROFI. "
+)
+
+
+def make_pdf(path, pages: int = 3, paragraphs: int = 6):
+    """Write a small text PDF with several chunks per page."""
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        text = "\n\n".join(f"Seite {page_num + 1}, Absatz {i}: {PARAGRAPH}" for i in range(paragraphs))
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=9)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def pipeline(tmp_path, fake_embedding_model):
+    config = RAGConfig(
+        embedding_model=fake_embedding_model.name,
+        embedding_cache_backend="memory",
+        vector_store_path=str(tmp_path / "chroma"),
+        collection_name="ingestion_test",
+        chunk_size=200,
+        chunk_overlap=20,
+        ingest_store_batch_size=2,
+    )
+    yield IngestionPipeline(config)
+    get_component_registry().clear()
+
+
+def test_ingest_file_reports_progress(tmp_path, pipeline):
+    pdf_path = make_pdf(tmp_path / "antrag.pdf")
+    events = []
+
+    result = pipeline.ingest_file(
+        str(pdf_path),
+        project_id="p1",
+        progress_callback=lambda stage, counters: events.append((stage, dict(counters)))
+    )
+
+    assert {stage for stage, _ in events} == {"stored"}
+    total = result["chunk_count"]
+    assert total > 2
+    # One progress step per micro-batch (ingest_store_batch_size chunks)
+    assert len(events) == (total + 1) // 2
+
+    stored = [counters["chunks_stored"] for _, counters in events]
+    assert stored == sorted(stored)
+    assert stored[-1] == events[-1][1]["chunks_total"] == total
+    assert events[-1][1]["pages_parsed"] == 3
+    assert pipeline.vector_store.collection.count() == total
+
+
+def test_ingest_file_streams_pages(tmp_path, pipeline):
+    """The first micro-batch is stored before the remaining pages are parsed."""
+    # Without pipelining the stages run in lock-step, so the order is deterministic
+    pipeline.config.ingest_pipelined = False
+    pdf_path = make_pdf(tmp_path / "antrag.pdf")
+    events = []
+
+    result = pipeline.ingest_file(
+        str(pdf_path),
+        progress_callback=lambda stage, counters: events.append(dict(counters))
+    )
+
+    assert events[0]["pages_parsed"] == 1
+    assert events[0]["chunks_stored"] == 2
+
+    # Same chunks as the materializing helpers
+    documents = pipeline._parse_document(pdf_path)
+    assert result["chunk_count"] == len(pipeline._chunk_document(documents))
+
+
+def test_ingest_file_without_callback(tmp_path, pipeline):
+    pdf_path = make_pdf(tmp_path / "antrag.pdf", pages=1)
+    result = pipeline.ingest_file(str(pdf_path))
+
+    assert result["success"] is True
+    assert pipeline.vector_store.collection.count() == result["chunk_count"]
+
+
+def test_pipelined_ingestion_stats(tmp_path, pipeline):
+    pdf_path = make_pdf(tmp_path / "antrag.pdf", pages=4)
+    result = pipeline.ingest_file(str(pdf_path))
+
+    stats = pipeline.get_stats()
+    total = result["chunk_count"]
+    assert stats["config"]["pipelined"] is True
+    assert set(stats["stages"]) == {"parse", "embed", "store"}
+    for stage in stats["stages"].values():
+        assert stage["units"] == total
+        assert stage["max_queue_depth"] <= pipeline.config.ingest_queue_size
+    assert stats["ingestion"]["files"] == 1
+    assert stats["ingestion"]["chunks"] == total
+    assert pipeline.vector_store.collection.count() == total
+
+
+def test_pipelined_matches_sequential(tmp_path, pipeline):
+    pdf_path = make_pdf(tmp_path / "antrag.pdf", pages=4)
+    # Separate stores and no manifest: both runs embed and store every chunk
+    results = {}
+    stored = {}
+    for pipelined in (True, False):
+        run = IngestionPipeline(pipeline.config.model_copy(update={
+            "vector_store_path": str(tmp_path / f"chroma_{pipelined}"),
+            "ingest_pipelined": pipelined,
+            "ingest_incremental": False,
+        }))
+        results[pipelined] = run.ingest_file(str(pdf_path))
+        data = run.vector_store.collection.get(include=["documents", "metadatas"])
+        stored[pipelined] = sorted(zip(data["ids"], data["documents"], [m["chunk_index"] for m in data["metadatas"]]))
+
+    assert not results[True]["skipped"] and not results[False]["skipped"]
+    assert results[True]["chunks_embedded"] == results[True]["chunk_count"] > 0
+    assert results[True]["chunk_ids"] == results[False]["chunk_ids"]
+    assert stored[True] == stored[False]
+
+
+def make_corpus(directory):
+    """Two applications with one PDF each, plus an unreadable file."""
+    for name, pages in (("app_a", 2), ("app_b", 3)):
+        (directory / name).mkdir(parents=True)
+        make_pdf(directory / name / "antrag.pdf", pages=pages)
+    (directory / "app_b" / "kaputt.pdf").write_bytes(b"not a pdf")
+    (directory / "notes.txt").write_text("ignored")
+    return directory
+
+
+def stored_metadata(pipeline):
+    data = pipeline.vector_store.collection.get(include=["metadatas"])
+    return dict(zip(data["ids"], data["metadatas"]))
+
+
+def test_ingest_directory_sequential(tmp_path, pipeline):
+    corpus = make_corpus(tmp_path / "corpus")
+
+    stats = pipeline.ingest_directory(
+        str(corpus),
+        project_id="default",
+        project_ids={"app_a/antrag.pdf": "app-a"}
+    )
+
+    assert stats["files_total"] == 3
+    assert stats["files_succeeded"] == 2
+    assert stats["files_failed"] == 1
+    assert [r["success"] for r in stats["files"]] == [True, True, False]
+    assert stats["chunk_count"] == sum(r["chunk_count"] for r in stats["files"] if r["success"])
+    assert stats["chunks_per_sec"] > 0
+
+    metadata = stored_metadata(pipeline)
+    for chunk_id in stats["files"][0]["chunk_ids"]:
+        assert metadata[chunk_id]["project_id"] == "app-a"
+        # Citation positions are stored as scalar metadata
+        assert metadata[chunk_id]["char_end"] > metadata[chunk_id]["char_start"]
+        assert metadata[chunk_id]["bboxes"].count(",") >= 3
+        assert "text_lines" not in metadata[chunk_id]
+    for chunk_id in stats["files"][1]["chunk_ids"]:
+        assert metadata[chunk_id]["project_id"] == "default"
+
+
+def test_ingest_directory_parallel_matches_sequential(tmp_path, pipeline):
+    corpus = make_corpus(tmp_path / "corpus")
+    project_ids = {"app_a/antrag.pdf": "app-a", "app_b/antrag.pdf": "app-b"}
+
+    parallel = pipeline.ingest_directory(str(corpus), project_ids=project_ids, max_workers=2)
+    parallel_metadata = stored_metadata(pipeline)
+    pipeline.vector_store.collection.delete(ids=list(parallel_metadata))
+    sequential = pipeline.ingest_directory(str(corpus), project_ids=project_ids)
+
+    assert parallel["max_workers"] == 2
+    assert parallel["files_failed"] == 1
+    assert not parallel["files"][2]["success"]
+    for par, seq in zip(parallel["files"][:2], sequential["files"][:2]):
+        assert par["chunk_count"] == seq["chunk_count"] > 0
+        assert par["page_count"] == seq["page_count"]
+
+    # Chunks of both files are stored in shared micro-batches, but ids map back per file
+    for result, project_id in zip(parallel["files"][:2], ["app-a", "app-b"]):
+        for chunk_id in result["chunk_ids"]:
+            assert parallel_metadata[chunk_id]["project_id"] == project_id
+            assert parallel_metadata[chunk_id]["doc_name"] == "antrag.pdf"
+    assert pipeline.get_stats()["ingestion"]["chunks"] == parallel["chunk_count"] + sequential["chunk_count"]
+
+
+def write_pages(path, pages):
+    """Write a PDF with the given page texts."""
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=9)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def page_text(page: int, variant: str = "") -> str:
+    return "\n\n".join(f"Seite {page}{variant}, Absatz {i}: {PARAGRAPH}" for i in range(4))
+
+
+def test_reingest_unchanged_file_is_skipped(tmp_path, pipeline):
+    pdf_path = write_pages(tmp_path / "richtlinie.pdf", [page_text(1), page_text(2)])
+    first = pipeline.ingest_file(str(pdf_path), project_id="p1")
+    second = pipeline.ingest_file(str(pdf_path), project_id="p1")
+
+    assert not first["skipped"] and first["chunks_embedded"] == first["chunk_count"]
+    assert second["skipped"]
+    assert second["chunks_embedded"] == 0
+    assert second["chunk_ids"] == first["chunk_ids"]
+    assert pipeline.vector_store.collection.count() == first["chunk_count"]
+    assert pipeline.get_stats()["ingestion"]["files_skipped"] == 1
+
+
+def test_reingest_changed_file_embeds_only_changed_chunks(tmp_path, pipeline):
+    pdf_path = tmp_path / "richtlinie.pdf"
+    write_pages(pdf_path, [page_text(1), page_text(2), page_text(3)])
+    first = pipeline.ingest_file(str(pdf_path), project_id="p1")
+
+    # Page 2 changes, page 3 is removed
+    write_pages(pdf_path, [page_text(1), page_text(2, " (neu)")])
+    second = pipeline.ingest_file(str(pdf_path), project_id="p1")
+
+    page_ids = lambda result, page: {i for i in result["chunk_ids"] if f"_p{page}_" in i}
+    assert not second["skipped"]
+    assert second["chunks_unchanged"] == len(page_ids(first, 1))
+    assert second["chunks_embedded"] == len(page_ids(second, 2))
+    # Old versions of the changed chunks (new content = new ID) and all of page 3
+    stale = page_ids(first, 3) | (page_ids(first, 2) - page_ids(second, 2))
+    assert second["chunks_deleted"] == len(stale) > len(page_ids(first, 3))
+
+    stored = pipeline.vector_store.collection.get(include=["documents"])
+    assert sorted(stored["ids"]) == sorted(second["chunk_ids"])
+    assert all("Seite 2 (neu)" in doc for i, doc in zip(stored["ids"], stored["documents"]) if "_p2_" in i)
+
+
+def test_reingest_with_new_project_updates_metadata_only(tmp_path, pipeline):
+    pdf_path = write_pages(tmp_path / "richtlinie.pdf", [page_text(1)])
+    first = pipeline.ingest_file(str(pdf_path), project_id="p1")
+    second = pipeline.ingest_file(str(pdf_path), project_id="p2")
+
+    assert not second["skipped"]
+    assert second["chunks_embedded"] == 0
+    assert second["chunks_unchanged"] == first["chunk_count"]
+    metadatas = pipeline.vector_store.collection.get(include=["metadatas"])["metadatas"]
+    assert {meta["project_id"] for meta in metadatas} == {"p2"}
+
+
+def test_reingest_after_collection_cleared(tmp_path, pipeline):
+    pdf_path = write_pages(tmp_path / "richtlinie.pdf", [page_text(1)])
+    first = pipeline.ingest_file(str(pdf_path))
+    pipeline.vector_store.clear_collection()
+
+    second = pipeline.ingest_file(str(pdf_path))
+    assert not second["skipped"]
+    assert second["chunks_embedded"] == first["chunk_count"]
+    assert pipeline.vector_store.collection.count() == first["chunk_count"]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_reingest_edited_file_without_manifest_replaces_chunks(tmp_path, pipeline, max_workers):
+    config = pipeline.config.model_copy(update={"ingest_incremental": False, "retrieval_mode": "hybrid"})
+    pipeline = IngestionPipeline(config)
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    write_pages(corpus / "merkblatt.pdf", [page_text(1, " Merkblatt")])
+    pdf_path = write_pages(corpus / "richtlinie.pdf", [page_text(1), page_text(2)])
+    first = pipeline.ingest_directory(str(corpus), max_workers=max_workers)["files"]
+
+    # One paragraph edited: its chunk gets a new ID, the old one must go
+    write_pages(pdf_path, [page_text(1), page_text(2, " (neu)")])
+    second = pipeline.ingest_directory(str(corpus), max_workers=max_workers)["files"]
+
+    ids = lambda results: {chunk_id for result in results for chunk_id in result["chunk_ids"]}
+    assert [r["chunks_deleted"] for r in second] == [0, len(ids(first) - ids(second))]
+    assert second[1]["chunks_deleted"] > 0
+    assert sorted(pipeline.vector_store.collection.get(include=[])["ids"]) == sorted(ids(second))
+    assert sorted(pipeline.sparse_index.ids()) == sorted(ids(second))
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_embed_error_fails_only_its_file(tmp_path, pipeline, monkeypatch, max_workers):
+    pipeline.config.ingest_store_batch_size = 1
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    write_pages(corpus / "defekt.pdf", [page_text(1, " Defekt")])
+    write_pages(corpus / "richtlinie.pdf", [page_text(1), page_text(2)])
+    embed = pipeline.embedder.embed_batch_array
+
+    def failing_embed(texts):
+        if any("Defekt" in text for text in texts):
+            raise RuntimeError("encoder crashed")
+        return embed(texts)
+
+    monkeypatch.setattr(pipeline.embedder, "embed_batch_array", failing_embed)
+    result = pipeline.ingest_directory(str(corpus), max_workers=max_workers)
+
+    failed, ingested = result["files"]
+    assert not failed["success"] and "encoder crashed" in failed["error"]
+    assert ingested["success"] and ingested["chunk_count"] > 0
+    assert result["files_failed"] == 1
+    assert sorted(pipeline.vector_store.collection.get(include=[])["ids"]) == sorted(ingested["chunk_ids"])
+    assert pipeline.manifest.get(corpus / "defekt.pdf") is None
+
+
+def test_delete_source(tmp_path, pipeline):
+    config = pipeline.config.model_copy(update={"retrieval_mode": "hybrid"})
+    pipeline = IngestionPipeline(config)
+    kept = pipeline.ingest_file(str(write_pages(tmp_path / "merkblatt.pdf", [page_text(1, " Merkblatt")])))
+    pdf_path = write_pages(tmp_path / "richtlinie.pdf", [page_text(1), page_text(2)])
+    result = pipeline.ingest_file(str(pdf_path))
+
+    assert pipeline.delete_source(str(pdf_path)) == result["chunk_count"]
+    assert sorted(pipeline.vector_store.collection.get(include=[])["ids"]) == sorted(kept["chunk_ids"])
+    assert sorted(pipeline.sparse_index.ids()) == sorted(kept["chunk_ids"])
+    assert pipeline.manifest.get(pdf_path) is None
+    # Ingested again from scratch, not skipped as unchanged
+    assert not pipeline.ingest_file(str(pdf_path))["skipped"]
+
+
+def test_ingest_directory_skips_unchanged_files(tmp_path, pipeline):
+    corpus = make_corpus(tmp_path / "corpus")
+    first = pipeline.ingest_directory(str(corpus), max_workers=2)
+
+    write_pages(corpus / "app_a" / "antrag.pdf", [page_text(1, " (neu)")])
+    second = pipeline.ingest_directory(str(corpus), max_workers=2)
+
+    assert first["files_skipped"] == 0
+    assert second["files_skipped"] == 1
+    assert second["files"][1]["skipped"]
+    assert second["chunks_embedded"] == second["files"][0]["chunk_count"]
+    assert pipeline.vector_store.collection.count() == second["chunk_count"]
+
+
+def test_chunk_length_stats_and_truncation(tmp_path, pipeline, fake_embedding_model):
+    fake_embedding_model.max_seq_length = 20
+    pdf_path = write_pages(tmp_path / "richtlinie.pdf", [page_text(1), page_text(2)])
+    result = pipeline.ingest_file(str(pdf_path))
+
+    stats = pipeline.get_stats()["chunks"]
+    assert stats["unit"] == "chars"
+    assert stats["count"] == result["chunk_count"]
+    assert stats["chars"]["max"] <= pipeline.config.chunk_size
+    assert stats["tokens"]["min"] <= stats["tokens"]["p50"] <= stats["tokens"]["p95"] <= stats["tokens"]["max"]
+    # 200-character chunks are longer than 20 tokens
+    assert stats["truncated"] > 0
+    assert stats["truncation_rate"] == pytest.approx(stats["truncated"] / stats["token_sampled"], abs=1e-4)
+
+
+def test_char_mode_token_stats_are_sampled(tmp_path, pipeline, fake_embedding_model, monkeypatch):
+    pipeline.config.ingest_store_batch_size = 1
+    pipeline.config.chunk_stats_sample_every = 3
+    counted = []
+    count_tokens = pipeline.embedder.count_tokens
+    monkeypatch.setattr(pipeline.embedder, "count_tokens", lambda texts: counted.append(len(texts)) or count_tokens(texts))
+    result = pipeline.ingest_file(str(write_pages(tmp_path / "richtlinie.pdf", [page_text(1), page_text(2)])))
+
+    stats = pipeline.get_stats()["chunks"]
+    assert stats["count"] == result["chunk_count"] > 3
+    # One-chunk micro-batches: only every third one is tokenized
+    assert stats["token_sampled"] == sum(counted) == len(range(0, result["chunk_count"], 3))
+
+    pipeline.config.chunk_stats_sample_every = 0
+    counted.clear()
+    pipeline.ingest_file(str(write_pages(tmp_path / "merkblatt.pdf", [page_text(1, " Merkblatt")])))
+    assert counted == []
+
+
+def test_token_chunking_avoids_truncation(tmp_path, fake_embedding_model):
+    fake_embedding_model.max_seq_length = 20
+    config = RAGConfig(
+        embedding_model=fake_embedding_model.name,
+        embedding_cache_backend="memory",
+        vector_store_path=str(tmp_path / "chroma"),
+        collection_name="token_chunks",
+        chunk_size=18,
+        chunk_overlap=2,
+        chunk_unit="tokens",
+    )
+    pipeline = IngestionPipeline(config)
+    try:
+        pipeline.ingest_file(str(write_pages(tmp_path / "richtlinie.pdf", [page_text(1), page_text(2)])))
+        stats = pipeline.get_stats()
+    finally:
+        get_component_registry().clear()
+
+    assert stats["config"]["chunk_unit"] == "tokens"
+    assert stats["chunks"]["tokens"]["max"] <= 20
+    assert stats["chunks"]["truncated"] == 0
+    assert stats["chunks"]["token_sampled"] == stats["chunks"]["count"]
@@ -0,0 +1,43 @@
+"""
+Tests for the ingestion manifest.
+"""
+from src.rag.ingestion_manifest import IngestionManifest, ManifestEntry, hash_chunk, hash_file
+from src.rag.models import Chunk
+
+
+def test_manifest_roundtrip(tmp_path):
+    manifest = IngestionManifest(str(tmp_path), "docs")
+    file_path = tmp_path / "antrag.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test")
+
+    assert manifest.get(file_path) is None
+    entry = ManifestEntry(file_hash=hash_file(file_path), project_id="p1", chunk_hashes={"a_0": "h0", "a_1": "h1"})
+    manifest.put(file_path, entry)
+
+    # Persisted and keyed per collection
+    reopened = IngestionManifest(str(tmp_path), "docs")
+    assert reopened.get(file_path) == entry
+    assert IngestionManifest(str(tmp_path), "other").get(file_path) is None
+
+    reopened.put(file_path, ManifestEntry(file_hash="new", chunk_hashes={"z": "h2", "a": "h3"}))
+    # Chunk order is preserved
+    assert list(reopened.get(file_path).chunk_hashes.items()) == [("z", "h2"), ("a", "h3")]
+    assert len(reopened) == 1
+
+    reopened.remove(file_path)
+    assert reopened.get(file_path) is None
+    manifest.close()
+    reopened.close()
+
+
+def test_hashes_depend_on_content_only(tmp_path):
+    first = Chunk(content="Förderfähige Kosten", metadata={"page_number": 1})
+    moved = Chunk(content="Förderfähige Kosten", metadata={"page_number": 7})
+    assert hash_chunk(first) == hash_chunk(moved)
+    assert hash_chunk(first) != hash_chunk(Chunk(content="Förderfähige Kosten.", metadata={}))
+
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"x" * (3 << 20))
+    before = hash_file(path)
+    path.write_bytes(b"x" * (3 << 20) + b"y")
+    assert hash_file(path) != before
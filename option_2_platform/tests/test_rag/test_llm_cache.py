@@ -0,0 +1,115 @@
+"""
+Tests for the LLM answer cache (no LLM required).
+"""
+import time
+from unittest.mock import MagicMock
+
+from src.rag.config import RAGConfig
+from src.rag.llm_cache import LLMAnswerCache, prompt_fingerprint
+from src.rag.llm_chain import LLMChain
+
+RESULTS = [{"id": "c1", "text": "Die Förderquote beträgt 50 Prozent.", "metadata": {"source": "a.pdf"}}]
+
+
+def make_chain(tmp_path, **overrides):
+    settings = {"llm_cache_enabled": True, "llm_cache_dir": str(tmp_path / "llm_cache"), "llm_temperature": 0.0}
+    config = RAGConfig(**{**settings, **overrides})
+    retrieval = MagicMock()
+    retrieval.retrieve.return_value = RESULTS
+    prompt_builder = MagicMock()
+    prompt_builder.build_prompt_from_results.side_effect = lambda query, results, template_type: f"Prompt: {query}"
+    llm = MagicMock()
+    llm.model_name = "test-model"
+    llm.generate.side_effect = lambda prompt, max_tokens, temperature: f"Antwort auf {prompt} [Quelle 1]"
+    cache = LLMAnswerCache(config.llm_cache_dir, max_entries=config.llm_cache_max_entries,
+                           ttl_seconds=config.llm_cache_ttl_seconds, cache_sampled=config.llm_cache_sampled)
+    return LLMChain(retrieval, llm, prompt_builder, config, answer_cache=cache)
+
+
+def test_fingerprint_covers_generation_parameters():
+    base = prompt_fingerprint("Prompt", "qwen2.5:7b", 0.0, 2000)
+    assert base == prompt_fingerprint("Prompt", "qwen2.5:7b", 0.0, 2000)
+    assert base != prompt_fingerprint("Prompt ", "qwen2.5:7b", 0.0, 2000)
+    assert base != prompt_fingerprint("Prompt", "qwen2.5:3b", 0.0, 2000)
+    assert base != prompt_fingerprint("Prompt", "qwen2.5:7b", 0.2, 2000)
+    assert base != prompt_fingerprint("Prompt", "qwen2.5:7b", 0.0, 1000)
+
+
+def test_repeated_query_served_from_cache(tmp_path):
+    chain = make_chain(tmp_path)
+    first = chain.query("Förderquote?")
+    second = chain.query("Förderquote?")
+    chain.query("Wer ist antragsberechtigt?")
+    chain.query_with_citations("Förderquote?", "p1", results=RESULTS)
+    chain.query_with_citations("Förderquote?", "p1", results=RESULTS)
+
+    assert second["answer"] == first["answer"]
+    assert chain.llm_provider.generate.call_count == 3
+    stats = chain.get_stats()
+    assert stats["llm_calls"] == 3
+    assert stats["answer_cache"]["hits"] == 2
+    assert stats["answer_cache"]["misses"] == 3
+    assert stats["answer_cache"]["hit_rate"] == 0.4
+    assert stats["answer_cache"]["size"] == 3
+
+
+def test_answers_persist_with_saved_seconds(tmp_path):
+    chain = make_chain(tmp_path)
+    chain.llm_provider.generate.side_effect = lambda prompt, max_tokens, temperature: time.sleep(0.05) or "Antwort"
+    chain.query("Förderquote?")
+    chain.answer_cache.close()
+
+    # Next process: same cache file
+    restarted = make_chain(tmp_path)
+    assert restarted.query("Förderquote?")["answer"] == "Antwort"
+    restarted.llm_provider.generate.assert_not_called()
+    assert restarted.get_stats()["answer_cache"]["saved_llm_seconds"] >= 0.05
+
+
+def test_sampled_generation_bypasses_cache(tmp_path):
+    chain = make_chain(tmp_path, llm_temperature=0.7)
+    chain.query("Förderquote?")
+    chain.query("Förderquote?")
+    assert chain.llm_provider.generate.call_count == 2
+    stats = chain.get_stats()["answer_cache"]
+    assert stats["bypassed"] == 2
+    assert stats["size"] == 0
+
+    opted_in = make_chain(tmp_path / "sampled", llm_temperature=0.7, llm_cache_sampled=True)
+    opted_in.query("Förderquote?")
+    opted_in.query("Förderquote?")
+    assert opted_in.llm_provider.generate.call_count == 1
+
+
+def test_citation_queries_cached_with_sampled_chat(tmp_path):
+    # Shipped setup: sampled chat answers, deterministic validation calls
+    chain = make_chain(tmp_path, llm_temperature=0.7)
+    chain.query_with_citations("Förderquote?", "p1", results=RESULTS)
+    chain.query_with_citations("Förderquote?", "p1", results=RESULTS)
+
+    assert chain.llm_provider.generate.call_count == 1
+    assert chain.llm_provider.generate.call_args.kwargs["temperature"] == 0.0
+    assert chain.get_stats()["answer_cache"]["hits"] == 1
+
+
+def test_ttl_and_size_bounds(tmp_path):
+    cache = LLMAnswerCache(str(tmp_path), max_entries=2, ttl_seconds=0.05)
+    cache.put("a", "A", 1.0)
+    cache.put("b", "B", 1.0)
+    time.sleep(0.01)
+    assert cache.get("a") == "A"
+    cache.put("c", "C", 1.0)
+    assert cache.get("b") is None
+    assert cache.get_stats()["evictions"] == 1
+    assert len(cache) == 2
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.get_stats()["expired"] == 1
+    assert len(cache) == 1
+
+
+def test_disabled_by_default():
+    chain = LLMChain(MagicMock(), MagicMock(), MagicMock(), RAGConfig())
+    assert chain.answer_cache is None
+    assert chain.get_stats()["answer_cache"] is None
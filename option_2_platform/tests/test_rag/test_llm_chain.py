@@ -3,6 +3,8 @@ from unittest.mock import Mock, MagicMock, patch
 from src.rag.llm_chain import LLMChain, create_llm_chain
 from src.rag.config import RAGConfig
 from src.rag.response_parser import ResponseParser
+from src.rag.retrieval import RetrievalEngine
+from src.rag.prompt_builder import PromptBuilder
 
 class TestResponseParser:
     
@@ -61,7 +63,7 @@ class TestLLMChain:
         
         # Setup mocks
         retrieval.retrieve.return_value = [{"content": "test", "metadata": {"source": "doc.pdf"}}]
-        prompt_builder.build_query_prompt.return_value = "Prompt"
+        prompt_builder.build_prompt_from_results.return_value = "Prompt"
         llm.generate.return_value = "Answer [Quelle 1]"
         llm.model_name = "test-model"
         
@@ -76,9 +78,57 @@ class TestLLMChain:
         
         # Verify calls
         retrieval.retrieve.assert_called_once()
-        prompt_builder.build_query_prompt.assert_called_once()
+        prompt_builder.build_prompt_from_results.assert_called_once()
+        prompt_builder.build_query_prompt.assert_not_called()
         llm.generate.assert_called_once()
+
+    def test_query_runs_single_retrieval(self):
+        vector_store = MagicMock()
+        vector_store.query.return_value = [
+            {"id": "c1", "score": 0.9, "content": "Förderquote 50%", "metadata": {"source": "richtlinie.pdf"}}
+        ]
+        config = RAGConfig()
+        engine = RetrievalEngine(vector_store=vector_store, config=config)
+        llm = MagicMock()
+        llm.generate.return_value = "Antwort [Quelle 1]"
+        llm.model_name = "test-model"
+        chain = LLMChain(engine, llm, PromptBuilder(engine), config)
+        
+        chain.query("Wie hoch ist die Förderquote?")
+        assert engine.get_stats()["retrievals"] == 1
+        assert vector_store.query.call_count == 1
+        assert "Förderquote 50%" in llm.generate.call_args.kwargs["prompt"]
         
+        chain.query_with_citations("Wie hoch ist die Förderquote?", project_id="p1")
+        assert engine.get_stats()["retrievals"] == 2
+        assert vector_store.query.call_count == 2
+
+    def test_criteria_catalog_runs_one_vector_search(self):
+        vector_store = MagicMock()
+        vector_store.query_many.return_value = [
+            [{"id": "c1", "score": 0.9, "content": "Innovation", "metadata": {"page_number": 2}}],
+            [{"id": "c2", "score": 0.8, "content": "Finanzierung", "metadata": {"page_number": 7}}],
+        ]
+        config = RAGConfig()
+        engine = RetrievalEngine(vector_store=vector_store, config=config)
+        llm = MagicMock()
+        llm.generate.return_value = "Ja."
+        chain = LLMChain(engine, llm, PromptBuilder(engine), config)
+        questions = ["Ist das Projekt innovativ?", "Ist die Finanzierung gesichert?"]
+
+        retrieved = chain.retrieve_for_citations(questions, project_id="p1")
+        responses = [
+            chain.query_with_citations(question, project_id="p1", results=results)
+            for question, results in zip(questions, retrieved)
+        ]
+
+        vector_store.query_many.assert_called_once_with(
+            query_texts=questions, top_k=5, metadata_filter={"project_id": "p1"}
+        )
+        vector_store.query.assert_not_called()
+        assert engine.get_stats()["dense_searches"] == 1
+        assert [r.citations[0].page for r in responses] == [2, 7]
+
     def test_error_handling_no_results(self, mock_components):
         retrieval, llm, prompt_builder, config = mock_components
         chain = LLMChain(retrieval, llm, prompt_builder, config)
@@ -101,17 +151,17 @@ class TestLLMChain:
             chain.query("Question")
 
     @patch('src.rag.llm_chain.RAGConfig')
-    @patch('src.rag.llm_chain.EmbeddingGenerator')
-    @patch('src.rag.llm_chain.VectorStore')
+    @patch('src.rag.llm_chain.get_component_registry')
     @patch('src.rag.llm_chain.RetrievalEngine')
-    @patch('src.rag.llm_chain.OllamaProvider')
     @patch('src.rag.llm_chain.PromptBuilder')
-    def test_factory_function(self, mock_pb, mock_op, mock_re, mock_vs, mock_eg, mock_conf):
+    def test_factory_function(self, mock_pb, mock_re, mock_registry, mock_conf):
         # Setup mocks for factory
         mock_op_instance = Mock()
         mock_op_instance.test_connection.return_value = {"available": True, "model_info": "Test"}
-        mock_op.return_value = mock_op_instance
+        mock_registry.return_value.get_llm_provider.return_value = mock_op_instance
         
         chain = create_llm_chain()
         assert isinstance(chain, LLMChain)
-        mock_op.assert_called_once()
+        assert chain.llm_provider is mock_op_instance
+        mock_registry.return_value.get_llm_provider.assert_called_once()
+        mock_registry.return_value.get_vector_store.assert_called_once()
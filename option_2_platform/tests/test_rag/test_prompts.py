@@ -83,6 +83,15 @@ class TestPromptBuilder:
         # Should fallback to standard
         assert "IFB-Förderrichtlinien" in prompt
         
+    def test_build_prompt_from_results(self, mock_engine):
+        builder = PromptBuilder(mock_engine)
+        results = [{"content": "Vorab geladen", "metadata": {"source": "pre.pdf"}}]
+        prompt = builder.build_prompt_from_results("Query", results, "standard")
+        
+        assert "Vorab geladen" in prompt
+        assert "[Quelle 1: pre.pdf]" in prompt
+        mock_engine.retrieve.assert_not_called()
+        
     def test_german_language(self, mock_engine):
         builder = PromptBuilder(mock_engine)
         prompt = builder.build_query_prompt("Query")
@@ -0,0 +1,120 @@
+"""
+Tests for the retrieval result cache (no model download required).
+"""
+import time
+
+import fitz
+import numpy as np
+import pytest
+
+from src.rag.config import RAGConfig
+from src.rag.ingestion import IngestionPipeline
+from src.rag.query_cache import QueryResultCache, normalize_query, pinned_project
+from src.rag.registry import get_component_registry
+from src.rag.retrieval import RetrievalEngine
+
+RESULTS = [{"id": "c1", "content": "Antragsberechtigt sind KMU.", "metadata": {}, "score": 0.8}]
+
+
+def test_normalize_and_pinned_project():
+    assert normalize_query("  Wer ist\nantragsberechtigt? ") == normalize_query("wer ist antragsberechtigt")
+    assert pinned_project({"project_id": "p1"}) == "p1"
+    assert pinned_project({"project_id": {"$eq": "p1"}}) == "p1"
+    assert pinned_project({"$and": [{"doc_type": "pdf"}, {"project_id": "p1"}]}) == "p1"
+    assert pinned_project({"project_id": {"$in": ["p1", "p2"]}}) is None
+    assert pinned_project(None) is None
+
+
+def test_exact_and_semantic_hits():
+    cache = QueryResultCache(semantic_threshold=0.95)
+    cache.put("scope", "Förderquote?", RESULTS, embedding=np.array([1.0, 0.0, 0.0]))
+
+    assert cache.get("scope", "förderquote") == RESULTS
+    assert cache.get("other scope", "Förderquote?") is None
+    # Near-identical wording (cosine 0.99) hits, a different question does not
+    assert cache.get("scope", "Wie hoch ist die Förderquote?", lambda: np.array([0.99, 0.14, 0.0])) == RESULTS
+    assert cache.get("scope", "Wer ist antragsberechtigt?", lambda: np.array([0.6, 0.8, 0.0])) is None
+    assert cache.get_stats() == {"hits": 1, "semantic_hits": 1, "misses": 2, "evictions": 0, "size": 1}
+
+    # Callers may modify the returned results
+    cache.get("scope", "Förderquote?")[0]["score"] = 0.0
+    assert cache.get("scope", "Förderquote?")[0]["score"] == 0.8
+
+
+def test_exact_hit_does_not_embed():
+    cache = QueryResultCache(semantic_threshold=0.9)
+    cache.put("scope", "Förderquote", RESULTS, embedding=np.ones(3))
+
+    def embed():
+        raise AssertionError("embedding not needed")
+
+    assert cache.get("scope", "Förderquote?", embed) == RESULTS
+
+
+def test_lru_and_ttl():
+    cache = QueryResultCache(max_entries=2, ttl_seconds=0.05)
+    cache.put("scope", "a", RESULTS)
+    cache.put("scope", "b", RESULTS)
+    cache.get("scope", "a")
+    cache.put("scope", "c", RESULTS)
+    assert cache.get("scope", "b") is None
+    assert cache.get("scope", "a") == RESULTS
+    assert cache.get_stats()["evictions"] == 1
+
+    time.sleep(0.06)
+    assert cache.get("scope", "a") is None
+
+
+def write_pdf(path, text):
+    doc = fitz.open()
+    doc.new_page().insert_text((50, 72), text, fontsize=11)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def pipeline(tmp_path, fake_embedding_model):
+    config = RAGConfig(
+        embedding_model=fake_embedding_model.name,
+        vector_store_path=str(tmp_path / "chroma"),
+        persist_directory=str(tmp_path / "chroma"),
+        collection_name="query_cache_test",
+        retrieval_mode="hybrid",
+        query_cache_enabled=True,
+    )
+    yield IngestionPipeline(config)
+    get_component_registry().clear()
+
+
+def test_ingestion_invalidates_affected_entries(tmp_path, pipeline):
+    pipeline.ingest_file(write_pdf(tmp_path / "a.pdf", "Antragsberechtigt sind KMU aus Hamburg."), project_id="p1")
+    pipeline.ingest_file(write_pdf(tmp_path / "b.pdf", "Die Förderquote beträgt 50 Prozent."), project_id="p2")
+    engine = RetrievalEngine(pipeline.vector_store, config=pipeline.config)
+
+    def searches():
+        return engine.get_stats()["dense_searches"]
+
+    first = engine.retrieve("Wer ist antragsberechtigt?", metadata_filter={"project_id": "p1"})
+    engine.retrieve("wer ist antragsberechtigt", metadata_filter={"project_id": "p1"})
+    engine.retrieve("Wer ist antragsberechtigt?")
+    assert searches() == 2
+    assert engine.get_stats()["query_cache"]["hits"] == 1
+
+    # Writes to p2 keep p1's entries, but change unfiltered results
+    pipeline.ingest_file(write_pdf(tmp_path / "c.pdf", "Antragsberechtigt sind auch Hochschulen."), project_id="p2")
+    assert engine.retrieve("Wer ist antragsberechtigt?", metadata_filter={"project_id": "p1"}) == first
+    assert searches() == 2
+    assert len(engine.retrieve("Wer ist antragsberechtigt?")) == 3
+    assert searches() == 3
+
+    # Writes to p1 invalidate p1's entries
+    pipeline.ingest_file(write_pdf(tmp_path / "d.pdf", "Antragsberechtigt sind Startups."), project_id="p1")
+    assert len(engine.retrieve("Wer ist antragsberechtigt?", metadata_filter={"project_id": "p1"})) == 2
+    assert searches() == 4
+
+    # Moving a file to another project invalidates the project it left
+    engine.retrieve("Wer ist antragsberechtigt?", metadata_filter={"project_id": "p1"})
+    pipeline.ingest_file(str(tmp_path / "d.pdf"), project_id="p3")
+    assert len(engine.retrieve("Wer ist antragsberechtigt?", metadata_filter={"project_id": "p1"})) == 1
+    assert searches() == 5
@@ -0,0 +1,64 @@
+"""
+Tests for the shared component registry (no model download required).
+"""
+from src.rag.config import RAGConfig
+from src.rag.ingestion import IngestionPipeline
+from src.rag.registry import ComponentRegistry, get_component_registry
+
+
+def make_config(tmp_path, model_name, **overrides) -> RAGConfig:
+    values = {
+        "embedding_model": model_name,
+        "embedding_cache_backend": "memory",
+        "persist_directory": str(tmp_path / "chroma"),
+        "vector_store_path": str(tmp_path / "chroma"),
+        "collection_name": "registry_test",
+    }
+    values.update(overrides)
+    return RAGConfig(**values)
+
+
+def test_same_config_shares_components(tmp_path, fake_embedding_model):
+    registry = ComponentRegistry()
+    config = make_config(tmp_path, fake_embedding_model.name)
+
+    embedder = registry.get_embedder(config)
+    vector_store = registry.get_vector_store(config)
+
+    # Equal config from a second caller (e.g. ValidationService) gets the same instances
+    other = make_config(tmp_path, fake_embedding_model.name)
+    assert registry.get_embedder(other) is embedder
+    assert registry.get_vector_store(other) is vector_store
+    assert vector_store.embedding_function is embedder
+    assert registry.get_llm_provider(config) is registry.get_llm_provider(other)
+    assert registry.get_stats() == {"embedders": 1, "vector_stores": 1, "llm_providers": 1, "sparse_indexes": 0, "rerankers": 0, "query_caches": 0, "llm_caches": 0}
+
+
+def test_different_settings_get_separate_components(tmp_path, fake_embedding_model):
+    registry = ComponentRegistry()
+    config = make_config(tmp_path, fake_embedding_model.name)
+    other_collection = make_config(tmp_path, fake_embedding_model.name, collection_name="other")
+    other_batch = make_config(tmp_path, fake_embedding_model.name, encode_batch_size=4)
+    other_llm = make_config(tmp_path, fake_embedding_model.name, llm_model="llama3")
+
+    assert registry.get_vector_store(config) is not registry.get_vector_store(other_collection)
+    assert registry.get_embedder(config) is registry.get_embedder(other_collection)
+    assert registry.get_embedder(config) is not registry.get_embedder(other_batch)
+    assert registry.get_llm_provider(config) is not registry.get_llm_provider(other_llm)
+
+    registry.clear()
+    assert registry.get_stats() == {"embedders": 0, "vector_stores": 0, "llm_providers": 0, "sparse_indexes": 0, "rerankers": 0, "query_caches": 0, "llm_caches": 0}
+
+
+def test_ingestion_pipeline_uses_shared_components(tmp_path, fake_embedding_model):
+    config = make_config(tmp_path, fake_embedding_model.name, collection_name="registry_pipeline")
+    registry = get_component_registry()
+    try:
+        first = IngestionPipeline(config)
+        second = IngestionPipeline(config)
+
+        assert first.embedder is second.embedder
+        assert first.vector_store is second.vector_store
+        assert first.vector_store is registry.get_vector_store(config, persist_directory=config.vector_store_path)
+    finally:
+        registry.clear()
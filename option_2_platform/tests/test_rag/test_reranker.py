@@ -0,0 +1,117 @@
+"""
+Tests for cross-encoder re-ranking (no model download required).
+"""
+import time
+
+import numpy as np
+import pytest
+
+from src.rag.config import RAGConfig
+from src.rag.registry import get_component_registry
+from src.rag.reranker import CrossEncoderReranker
+from src.rag.retrieval import RetrievalEngine
+
+FAKE_RERANK_MODEL = "fake-cross-encoder"
+
+
+class FakeCrossEncoder:
+    """Scores a pair by the share of query words found in the chunk."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.pairs = []
+
+    def predict(self, pairs, batch_size=32, **kwargs):
+        time.sleep(self.delay)
+        self.pairs.extend(pairs)
+        scores = []
+        for query, content in pairs:
+            words = query.lower().split()
+            scores.append(sum(word in content.lower() for word in words) / len(words))
+        return np.array(scores, dtype=np.float32)
+
+
+@pytest.fixture
+def fake_cross_encoder():
+    model = FakeCrossEncoder()
+    CrossEncoderReranker._model_cache[FAKE_RERANK_MODEL] = model
+    yield model
+    CrossEncoderReranker._model_cache.pop(FAKE_RERANK_MODEL, None)
+    get_component_registry().clear()
+
+
+def candidates():
+    # Dense order: the best chunk for "personalkosten förderfähig" comes last
+    return [
+        {"id": "c1", "content": "Das Programm fördert Kooperationen.", "metadata": {}, "score": 0.9},
+        {"id": "c2", "content": "Sachkosten sind förderfähig.", "metadata": {}, "score": 0.8},
+        {"id": "c3", "content": "Der Arbeitsplan nennt Meilensteine.", "metadata": {}, "score": 0.7},
+        {"id": "c4", "content": "Personalkosten sind förderfähig.", "metadata": {}, "score": 0.6},
+    ]
+
+
+def test_rerank_orders_and_applies_threshold(fake_cross_encoder):
+    reranker = CrossEncoderReranker(model_name=FAKE_RERANK_MODEL, batch_size=3)
+
+    results = reranker.rerank("personalkosten förderfähig", candidates(), top_k=3, threshold=0.5)
+
+    assert [r["id"] for r in results] == ["c4", "c2"]
+    assert results[0]["rerank_score"] == results[0]["score"] == 1.0
+    assert results[0]["retrieval_score"] == 0.6
+    assert reranker.get_stats()["pairs_scored"] == 4
+    assert reranker.rerank("personalkosten förderfähig", candidates(), top_k=1)[0]["id"] == "c4"
+
+
+def test_scores_cached_per_query_and_chunk(fake_cross_encoder):
+    reranker = CrossEncoderReranker(model_name=FAKE_RERANK_MODEL, cache_max_entries=5)
+
+    reranker.rerank("personalkosten", candidates(), top_k=2)
+    reranker.rerank("personalkosten", candidates(), top_k=2)
+    assert len(fake_cross_encoder.pairs) == 4
+    assert reranker.get_stats()["cache_hits"] == 4
+
+    # Another query scores new pairs; the cache stays bounded (LRU)
+    reranker.rerank("meilensteine", candidates()[:2], top_k=2)
+    assert len(fake_cross_encoder.pairs) == 6
+    assert reranker.get_stats()["cache_size"] == 5
+
+
+def test_time_budget_keeps_retrieval_order(fake_cross_encoder):
+    fake_cross_encoder.delay = 0.05
+    reranker = CrossEncoderReranker(model_name=FAKE_RERANK_MODEL, batch_size=2, time_budget_ms=80)
+
+    results = reranker.rerank("personalkosten förderfähig", candidates(), top_k=2, threshold=0.5)
+
+    # The second batch would end past the budget: dense order, scores untouched
+    assert [r["id"] for r in results] == ["c1", "c2"]
+    assert "rerank_score" not in results[0]
+    assert reranker.get_stats()["budget_fallbacks"] == 1
+    assert reranker.get_stats()["cache_size"] == 2
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.requested_top_k = []
+
+    def query(self, query_text, top_k=5, metadata_filter=None):
+        self.requested_top_k.append(top_k)
+        return candidates()[:top_k]
+
+
+def test_retrieval_engine_overfetches_for_reranking(fake_cross_encoder):
+    config = RAGConfig(
+        retrieval_mode="dense",
+        rerank_enabled=True,
+        rerank_model=FAKE_RERANK_MODEL,
+        rerank_candidates=4,
+        rerank_score_threshold=0.5
+    )
+    vector_store = FakeVectorStore()
+    engine = RetrievalEngine(vector_store, config=config)
+
+    results = engine.retrieve("personalkosten förderfähig", top_k=1)
+
+    assert vector_store.requested_top_k == [4]
+    assert [r["id"] for r in results] == ["c4"]
+    assert engine.get_stats()["rerank"]["reranks"] == 1
+    assert engine.reranker is get_component_registry().get_reranker(config)
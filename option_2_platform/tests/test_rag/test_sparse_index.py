@@ -0,0 +1,128 @@
+"""
+Tests for the BM25 side index (no model download required).
+"""
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from src.rag.exceptions import VectorStoreError
+from src.rag.models import Chunk
+from src.rag.sparse_index import BM25Index, tokenize
+
+TEXTS = {
+    "a": "Nach § 4 Abs. 2 der Förderrichtlinie sind Personalkosten förderfähig.",
+    "b": "Nach § 2 Abs. 4 der Förderrichtlinie sind Sachkosten förderfähig.",
+    "c": "Das Programm PROFI Transfer fördert Kooperationen mit Hochschulen.",
+    "d": "Der Arbeitsplan beschreibt Meilensteine und die Laufzeit des Vorhabens.",
+}
+
+
+def chunk(text, **metadata):
+    return Chunk(content=text, metadata=metadata)
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = BM25Index(str(tmp_path), "sparse_test")
+    index.add(list(TEXTS), [chunk(text, project_id="p1" if key in "ab" else "p2", page_number=i + 1)
+                            for i, (key, text) in enumerate(TEXTS.items())])
+    yield index
+    index.close()
+
+
+def test_tokenize_keeps_identifiers():
+    assert tokenize("Gemäß § 4 Abs. 2 der PROFI-Richtlinie") == [
+        "gemäß", "§", "4", "abs", "2", "profi", "richtlinie",
+        "gemäß_§", "§_4", "4_abs", "abs_2", "2_profi"
+    ]
+
+
+def test_exact_identifiers_rank_first(index):
+    assert [chunk_id for chunk_id, _ in index.search("§ 4 Abs. 2")][:2] == ["a", "b"]
+    assert [chunk_id for chunk_id, _ in index.search("§ 2 Abs. 4")][:2] == ["b", "a"]
+    assert [chunk_id for chunk_id, _ in index.search("PROFI")] == ["c"]
+    assert index.search("Quantencomputer") == []
+
+
+def test_metadata_filters(index):
+    assert [i for i, _ in index.search("förderfähig Programm", metadata_filter={"project_id": "p2"})] == ["c"]
+    assert {i for i, _ in index.search("förderfähig", metadata_filter={"project_id": {"$in": ["p1", "x"]}})} == {"a", "b"}
+    assert [i for i, _ in index.search("förderfähig", metadata_filter={
+        "$and": [{"project_id": "p1"}, {"page_number": {"$ne": 1}}]
+    })] == ["b"]
+    assert index.search("förderfähig", metadata_filter={"project_id": "unbekannt"}) == []
+
+    assert not BM25Index.supports_filter({"chunk_size": 500})
+    assert not BM25Index.supports_filter({"page_number": {"$gt": 3}})
+    with pytest.raises(VectorStoreError):
+        index.search("förderfähig", metadata_filter={"page_number": {"$gt": 3}})
+
+
+def test_upsert_delete_and_reload(tmp_path, index):
+    index.add(["a"], [chunk("Neue Fassung ohne Paragraphen", project_id="p1")])
+    index.delete(["d"])
+    assert len(index) == 3
+    assert index.search("Meilensteine") == []
+    assert [i for i, _ in index.search("§ 4 Abs. 2")] == ["b"]
+
+    reopened = BM25Index(str(tmp_path), "sparse_test")
+    try:
+        assert sorted(reopened.ids()) == ["a", "b", "c"]
+        assert reopened.search("Neue Fassung") == index.search("Neue Fassung")
+        # Other collections in the same file are separate
+        assert len(BM25Index(str(tmp_path), "other")) == 0
+    finally:
+        reopened.close()
+
+
+def test_reloads_changes_from_other_process(tmp_path, index):
+    writer = BM25Index(str(tmp_path), "sparse_test")
+    writer.add(["e"], [chunk("Verwertungsplan mit Patentanmeldung", project_id="p3")])
+    writer.close()
+
+    assert [i for i, _ in index.search("Patentanmeldung")] == ["e"]
+
+
+def reference_bm25(docs, query, k1=1.5, b=0.75):
+    """Textbook BM25 over all documents."""
+    tokenized = {doc_id: Counter(tokenize(text)) for doc_id, text in docs.items()}
+    avg_length = sum(sum(tf.values()) for tf in tokenized.values()) / len(docs)
+    scores = {}
+    for term in set(tokenize(query)):
+        df = sum(1 for tf in tokenized.values() if term in tf)
+        if not df:
+            continue
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for doc_id, tf in tokenized.items():
+            if term in tf:
+                length = sum(tf.values())
+                norm = k1 * (1 - b + b * length / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf[term] * (k1 + 1) / (tf[term] + norm)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def test_scores_match_reference_bm25(tmp_path):
+    rng = random.Random(3)
+    words = ["förderung", "antrag", "kosten", "projekt", "markt", "patent", "§", "4", "abs", "2", "profi"]
+    docs = {
+        f"doc-{i}": " ".join(rng.choices(words, weights=range(len(words), 0, -1), k=rng.randint(3, 40)))
+        for i in range(400)
+    }
+    index = BM25Index(str(tmp_path), "reference")
+    # Small thresholds so dense vectors and the sampled scan are exercised
+    index.DENSE_TERM_FRACTION = 4
+    index.SCAN_SAMPLE = 16
+    ids = list(docs)
+    index.add(ids, [chunk(docs[i]) for i in ids])
+    # Tombstones from updates and deletes must not count
+    index.add(ids[:50], [chunk(docs[i]) for i in ids[:50]])
+    index.delete(ids[-20:])
+    docs = {i: docs[i] for i in ids[:-20]}
+
+    for query in ["förderung kosten", "patent", "§ 4 Abs. 2 PROFI", "markt antrag projekt"]:
+        expected = reference_bm25(docs, query)[:10]
+        actual = index.search(query, top_k=10)
+        assert [score for _, score in actual] == pytest.approx([score for _, score in expected], rel=1e-4)
+    index.close()
@@ -0,0 +1,131 @@
+"""
+Tests for the staged (pipelined) executor.
+"""
+import threading
+import time
+
+import pytest
+
+from src.rag.staged_executor import StagedExecutor
+
+
+def test_stages_preserve_order_and_count_units():
+    executor = StagedExecutor(
+        "source",
+        [("double", lambda x: x * 2), ("inc", lambda x: x + 1)],
+        queue_size=1
+    )
+    assert list(executor.run(range(20))) == [x * 2 + 1 for x in range(20)]
+
+    stats = executor.get_stats()
+    assert list(stats) == ["source", "double", "inc"]
+    assert all(stage["items"] == 20 for stage in stats.values())
+    assert all(stage["max_queue_depth"] <= 1 for stage in stats.values())
+
+
+def test_stages_overlap():
+    """Two stages that each sleep run concurrently, not back to back."""
+    def slow(x):
+        time.sleep(0.05)
+        return x
+
+    executor = StagedExecutor("source", [("a", slow), ("b", slow)], queue_size=2)
+    start = time.perf_counter()
+    assert list(executor.run(range(8))) == list(range(8))
+    elapsed = time.perf_counter() - start
+
+    # Sequential would take 8 * 2 * 0.05 = 0.8s
+    assert elapsed < 0.7
+
+
+def test_stage_error_is_raised_in_consumer():
+    def fail_on_three(x):
+        if x == 3:
+            raise ValueError("bad item")
+        return x
+
+    executor = StagedExecutor("source", [("check", fail_on_three)])
+    results = []
+    with pytest.raises(ValueError, match="bad item"):
+        for item in executor.run(range(100)):
+            results.append(item)
+    assert results == [0, 1, 2]
+
+
+def test_source_error_is_raised_in_consumer():
+    def source():
+        yield 1
+        raise IOError("cannot read page")
+
+    executor = StagedExecutor("source", [("identity", lambda x: x)])
+    with pytest.raises(IOError, match="cannot read page"):
+        list(executor.run(source()))
+
+
+def test_early_exit_stops_threads():
+    executor = StagedExecutor("source", [("identity", lambda x: x)], queue_size=1)
+    before = threading.active_count()
+    for item in executor.run(iter(range(10_000))):
+        if item == 5:
+            break
+    time.sleep(0.3)
+    assert threading.active_count() <= before
+
+
+@pytest.mark.parametrize("fail", [True, False])
+def test_source_closed_when_run_ends_early(fail):
+    """A failing stage or an early exit closes the source generator."""
+    closed = threading.Event()
+
+    def source():
+        try:
+            yield from range(10_000)
+        finally:
+            closed.set()
+
+    def check(x):
+        if fail and x == 3:
+            raise ValueError("bad item")
+        return x
+
+    executor = StagedExecutor("source", [("check", check)], queue_size=1)
+    # Held here, so garbage collection can't be what closes it
+    generator = source()
+    results = []
+    try:
+        for item in executor.run(generator):
+            results.append(item)
+            if item == 5:
+                break
+    except ValueError:
+        pass
+
+    assert results == ([0, 1, 2] if fail else list(range(6)))
+    assert closed.is_set()
+
+
+def test_no_writes_after_run_raises():
+    """run() waits for a slow in-flight store call before raising."""
+    writes = []
+    storing = threading.Event()
+
+    def check(x):
+        if x == 1:
+            # Fail while item 0 is being stored
+            storing.wait()
+            raise ValueError("bad item")
+        return x
+
+    def store(x):
+        storing.set()
+        # Longer than any join timeout the executor might use
+        time.sleep(5.5)
+        writes.append(x)
+        return x
+
+    executor = StagedExecutor("source", [("check", check), ("store", store)])
+    with pytest.raises(ValueError, match="bad item"):
+        list(executor.run(range(10)))
+    written = list(writes)
+    time.sleep(0.3)
+    assert writes == written == [0]
@@ -4,6 +4,7 @@ Unit tests for VectorStore using ChromaDB.
 import pytest
 import tempfile
 import shutil
+import numpy as np
 import sys
 from pathlib import Path
 
@@ -67,7 +68,8 @@ def test_add_single_chunk(vector_store, sample_chunks):
     ids = vector_store.add_chunks([chunk])
     
     assert len(ids) == 1
-    assert ids[0] == "doc1.pdf_0"
+    assert ids[0] == VectorStore.make_chunk_id(chunk)
+    assert ids[0].startswith("doc1.pdf_")
     
     stats = vector_store.get_collection_stats()
     assert stats['count'] == 1
@@ -77,9 +79,9 @@ def test_add_multiple_chunks(vector_store, sample_chunks):
     ids = vector_store.add_chunks(sample_chunks)
     
     assert len(ids) == 3
-    assert "doc1.pdf_0" in ids
-    assert "doc1.pdf_1" in ids
-    assert "doc2.pdf_0" in ids
+    assert len(set(ids)) == 3
+    assert ids == [VectorStore.make_chunk_id(chunk) for chunk in sample_chunks]
+    assert [i.split("_")[0] for i in ids] == ["doc1.pdf", "doc1.pdf", "doc2.pdf"]
     
     stats = vector_store.get_collection_stats()
     assert stats['count'] == 3
@@ -159,3 +161,69 @@ def test_collection_stats(vector_store, sample_chunks):
     vector_store.add_chunks(sample_chunks)
     stats = vector_store.get_collection_stats()
     assert stats['count'] == len(sample_chunks)
+
+def test_numpy_embeddings_roundtrip(temp_db_path, fake_embedding_model, sample_chunks):
+    """Float32 matrices are passed to Chroma without list conversion."""
+    embedder = EmbeddingGenerator(fake_embedding_model.name)
+    store = VectorStore(
+        collection_name="numpy_test",
+        persist_directory=temp_db_path,
+        embedding_function=embedder
+    )
+    store.add_chunks(sample_chunks)
+
+    matrix = embedder.embed_batch_array([c.content for c in sample_chunks])
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (3, fake_embedding_model.dim)
+
+    results = store.query_by_embedding(matrix[2], top_k=1)
+    assert results[0]["content"] == sample_chunks[2].content
+    assert results[0]["score"] == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.fixture
+def fake_store(temp_db_path, fake_embedding_model):
+    return VectorStore(
+        collection_name="upsert_test",
+        persist_directory=temp_db_path,
+        embedding_function=EmbeddingGenerator(fake_embedding_model.name)
+    )
+
+def test_chunk_ids_are_content_addressed(sample_chunks):
+    """IDs depend on source, location and text, not on chunk order or randomness."""
+    chunk = sample_chunks[0]
+    reordered = Chunk(content=chunk.content, metadata={**chunk.metadata, "chunk_id": 7})
+    edited = Chunk(content=chunk.content + " Neu.", metadata=dict(chunk.metadata))
+    other_page = Chunk(content=chunk.content, metadata={**chunk.metadata, "page_number": 2})
+
+    chunk_id = VectorStore.make_chunk_id(chunk)
+    assert VectorStore.make_chunk_id(reordered) == chunk_id
+    assert VectorStore.make_chunk_id(edited) != chunk_id
+    assert VectorStore.make_chunk_id(other_page).startswith("doc1.pdf_p2_")
+    assert VectorStore.make_chunk_id(Chunk(content=chunk.content, metadata={})).startswith("unknown_")
+
+def test_reingest_replaces_in_place(fake_store, sample_chunks):
+    """Adding the same chunks again upserts instead of duplicating."""
+    ids = fake_store.add_chunks(sample_chunks)
+    updated = [Chunk(content=c.content, metadata={**c.metadata, "status": "korrigiert"}) for c in sample_chunks]
+
+    assert fake_store.add_chunks(updated) == ids
+    stored = fake_store.collection.get(include=["metadatas"])
+    assert sorted(stored["ids"]) == sorted(ids)
+    assert {meta["status"] for meta in stored["metadatas"]} == {"korrigiert"}
+
+def test_duplicate_chunks_in_one_batch(fake_store, sample_chunks):
+    """Identical text at the same location is stored once, but every chunk gets its ID."""
+    ids = fake_store.add_chunks([sample_chunks[0], sample_chunks[0], sample_chunks[1]])
+
+    assert len(ids) == 3 and ids[0] == ids[1]
+    assert fake_store.collection.count() == 2
+
+def test_delete_by_source(fake_store, sample_chunks):
+    fake_store.add_chunks(sample_chunks)
+
+    assert fake_store.delete_by_source("doc1.pdf") == 2
+    assert fake_store.collection.get(include=["metadatas"])["metadatas"][0]["source"] == "doc2.pdf"
+    assert fake_store.delete_by_source(["doc1.pdf", "doc2.pdf"]) == 1
+    assert fake_store.collection.count() == 0
+    assert fake_store.delete_by_source([]) == 0
@@ -0,0 +1,94 @@
+import fitz
+
+from src.parsers.pdf_parser import PDFParser
+from src.rag.chunker import Chunker
+from src.rag.models import decode_bboxes
+from src.services.pdf_annotation_service import PDFAnnotationService
+
+
+def make_pdf(path):
+    doc = fitz.open()
+    page = doc.new_page()
+    for line in range(10):
+        page.insert_text((72, 72 + 20 * line), f"Absatz {line}: Die Personalkosten sind förderfähig.")
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def highlights(path):
+    with fitz.open(str(path)) as doc:
+        return [annot.rect for annot in doc[0].annots() if annot.type[1] == "Highlight"]
+
+
+def test_highlight_from_stored_bboxes(tmp_path, monkeypatch):
+    pdf_path = make_pdf(tmp_path / "antrag.pdf")
+    chunk = Chunker(chunk_size=160, chunk_overlap=0).split(PDFParser().parse(str(pdf_path))[0])[1]
+
+    # Stored boxes are drawn directly, the page is never searched
+    monkeypatch.setattr(fitz.Page, "search_for", lambda *args, **kwargs: [])
+    output_path = tmp_path / "annotated.pdf"
+    citation = {"page": 1, "quote": chunk.content[:100], "bboxes": chunk.metadata["bboxes"]}
+    assert PDFAnnotationService().create_annotated_pdf(pdf_path, output_path, [citation])
+
+    rects = highlights(output_path)
+    assert len(rects) == 1
+    # One annotation covering all lines of the chunk
+    lines = [fitz.Rect(bbox) for bbox in decode_bboxes(chunk.metadata["bboxes"])]
+    assert len(lines) == chunk.content.count("Absatz") > 1
+    for line in lines:
+        assert rects[0].contains(fitz.Point((line.x0 + line.x1) / 2, (line.y0 + line.y1) / 2))
+
+
+def test_falls_back_to_text_search_without_bboxes(tmp_path):
+    pdf_path = make_pdf(tmp_path / "antrag.pdf")
+    output_path = tmp_path / "annotated.pdf"
+    citation = {"page": 1, "quote": "Absatz 4: Die Personalkosten"}
+
+    assert PDFAnnotationService().create_annotated_pdf(pdf_path, output_path, [citation])
+    assert len(highlights(output_path)) == 1
+
+
+def test_repeated_citations_searched_once_per_page(tmp_path, monkeypatch):
+    pdf_path = make_pdf(tmp_path / "antrag.pdf")
+    searches = []
+    search_for = fitz.Page.search_for
+
+    def counting_search(page, text, **kwargs):
+        searches.append((page.number, text))
+        return search_for(page, text, **kwargs)
+
+    monkeypatch.setattr(fitz.Page, "search_for", counting_search)
+    citations = [{"page": 1, "quote": "Absatz 2: Die Personalkosten"}] * 4
+    citations += [{"page": 1, "quote": "Absatz 7: Die Personalkosten"}, {"page": 9, "quote": "fehlt"}]
+    output_path = tmp_path / "annotated.pdf"
+
+    assert PDFAnnotationService().create_annotated_pdf(pdf_path, output_path, citations)
+    assert sorted(searches) == [(0, "Absatz 2: Die Personalkosten"), (0, "Absatz 7: Die Personalkosten")]
+    assert len(highlights(output_path)) == 2
+
+
+def test_annotations_appended_incrementally(tmp_path):
+    pdf_path = make_pdf(tmp_path / "antrag.pdf")
+    output_path = tmp_path / "annotated.pdf"
+    citation = {"page": 1, "quote": "Absatz 4: Die Personalkosten"}
+
+    assert PDFAnnotationService().create_annotated_pdf(pdf_path, output_path, [citation])
+    # The original bytes are kept, the highlight is an appended update
+    original = pdf_path.read_bytes()
+    annotated = output_path.read_bytes()
+    assert len(annotated) > len(original)
+    assert annotated.startswith(original)
+
+
+async def test_create_annotated_pdfs_runs_off_event_loop(tmp_path):
+    jobs = []
+    for name in ("a", "b", "c"):
+        pdf_path = make_pdf(tmp_path / f"{name}.pdf")
+        jobs.append((pdf_path, tmp_path / f"annotated_{name}.pdf", [{"page": 1, "quote": "Absatz 1"}]))
+    jobs.append((tmp_path / "fehlt.pdf", tmp_path / "annotated_fehlt.pdf", [{"page": 1, "quote": "Absatz 1"}]))
+
+    results = await PDFAnnotationService().create_annotated_pdfs(jobs)
+
+    assert results == [True, True, True, False]
+    assert all(len(highlights(output_path)) == 1 for _, output_path, _ in jobs[:3])